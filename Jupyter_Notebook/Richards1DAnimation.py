@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 27 09:26:44 2026
+
+This is used to animate the profiles of Richards 1D simulations, e.g. to show
+the dynamics of infiltration.
+
+The frames are split in blocks rendered in parallel: each process reads the
+profiles of its block with a single read from the output file, draws the figure
+once and for each frame only updates the data of the lines and the title.
+Axis limits are fixed for the whole animation. The figures are drawn on an Agg
+canvas without pyplot, so importing this module does not change the backend of
+a notebook. The frames are then encoded in a GIF (Pillow) or in a video
+(ffmpeg, chosen by the extension of the file).
+
+It can be used from the command line:
+
+    python Richards1DAnimation.py output.nc infiltration.gif --variable psi --variable water_heigth --frames 500
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from netCDF4 import Dataset
+
+from Richards1DOutput import readProfiles
+
+
+## frames rendered by each task of the process pool
+FRAMES_PER_TASK = 50
+
+## file name of the frames in the frame folder
+FRAME_NAME = 'frame_{:06d}.png'
+
+
+def frameTimeIndices(nTime,nFrames=None):
+    '''
+    Returns the time indices of the frames: all the time steps or nFrames
+    evenly spaced ones, the first and the last included.
+    '''
+    if nFrames is None or nFrames >= nTime:
+        return np.arange(nTime)
+    return np.unique(np.linspace(0,nTime-1,nFrames).round().astype(int))
+
+
+def _profileGeometry(ncfile,variable):
+    ## coordinates of the profiles of a variable, without the soil surface
+    nCV = ncfile.dimensions['dualDepth'].size-1
+    if 'dualDepth' in ncfile.variables[variable].dimensions:
+        return np.asarray(np.ma.getdata(ncfile.variables['dual_depth'][:]),dtype=float)
+    return np.asarray(np.ma.getdata(ncfile.variables['depth'][0:nCV]),dtype=float)
+
+
+def profileLimits(ncfile,variables,timeIndex,chunkSize=1000):
+    '''
+    Computes the range of each variable over the frames, to fix the x axis of
+    the animation. Profiles are read in chunks of frames.
+
+    return:
+
+    limits: dictionary variable: [min, max]
+    '''
+    limits = {}
+    for variable in variables:
+        nPoints = np.size(_profileGeometry(ncfile,variable))
+        low = np.inf
+        high = -np.inf
+        for start in range(0,np.size(timeIndex),chunkSize):
+            profiles = readProfiles(ncfile.variables[variable],timeIndex[start:start+chunkSize],cache=False)[:,0:nPoints]
+            low = min(low,np.nanmin(profiles))
+            high = max(high,np.nanmax(profiles))
+        margin = 0.05*(high-low) if high > low else 0.05*max(abs(high),1e-12)
+        limits[variable] = [low-margin,high+margin]
+    return limits
+
+
+def buildFrameTemplate(ncfile,variables,limits,labelSize,titleSize,axisTicksSize,lineWidth,figureSizeHeigth,figureSizeWidth):
+    '''
+    Draws the figure used for all the frames: one panel for each variable with
+    fixed axis limits and an empty line.
+
+    return:
+
+    fig: the matplotlib figure, on an Agg canvas and not managed by pyplot
+
+    lines: list of Line2D, one for each variable
+
+    title: the figure title
+    '''
+    fig = Figure(figsize=(figureSizeWidth,figureSizeHeigth))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(1,len(variables),sharey=True,squeeze=False)
+    lines = []
+    depth = ncfile.variables['depth']
+    for ax,variable in zip(axes[0],variables):
+        var = ncfile.variables[variable]
+        coordinates = _profileGeometry(ncfile,variable)
+        [line] = ax.plot(np.full(np.size(coordinates),np.nan),coordinates,linewidth=lineWidth,color='b',marker='.')
+        lines.append(line)
+        ax.set_xlim(limits[variable])
+        ax.set_ylim(coordinates.min(),coordinates.max())
+        ax.set_xlabel(var.long_name + '  [' +var.units +']',fontsize=labelSize)
+        ax.tick_params(axis='both', which='major', labelsize=axisTicksSize)
+        ax.grid()
+    axes[0][0].set_ylabel(depth.long_name + '  [' +depth.units +']',fontsize=labelSize)
+    title = fig.suptitle('',fontsize=titleSize)
+    return [fig,lines,title]
+
+
+def renderFrames(outputFileName,variables,timeIndex,frameNumbers,frameDir,limits,settings):
+    '''
+    Renders a block of frames to PNG files.
+
+    timeIndex: time indices of the frames of the block
+    frameNumbers: numbers of the frames, used in the file names
+
+    return:
+
+    list of the PNG files
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    try:
+        profiles = [readProfiles(ncfile.variables[variable],timeIndex,cache=False) for variable in variables]
+        dates = pd.to_datetime(np.asarray(ncfile.variables['time'][np.asarray(timeIndex).tolist()]),unit='s',utc=True).strftime('%Y-%m-%d %H:%M')
+        [fig,lines,title] = buildFrameTemplate(ncfile,variables,limits,settings['labelSize'],settings['titleSize'],
+                                               settings['axisTicksSize'],settings['lineWidth'],
+                                               settings['figureSizeHeigth'],settings['figureSizeWidth'])
+    finally:
+        ncfile.close()
+
+    fileNames = []
+    for i,number in enumerate(frameNumbers):
+        for line,values in zip(lines,profiles):
+            line.set_xdata(values[i,0:np.size(line.get_ydata())])
+        title.set_text('Date: '+dates[i])
+        fileName = os.path.join(frameDir,FRAME_NAME.format(number))
+        fig.savefig(fileName,dpi=settings['dpi'])
+        fileNames.append(fileName)
+    return fileNames
+
+
+def _renderFrames(arguments):
+    return renderFrames(*arguments)
+
+
+def _quantizedFrames(frameFileNames,palette):
+    ## frames read one at a time, each file is closed before the next one is opened
+    from PIL import Image
+    for frameFileName in frameFileNames:
+        with Image.open(frameFileName) as frame:
+            quantized = frame.convert('RGB').quantize(palette=palette)
+        yield quantized
+
+
+def encodeFrames(frameFileNames,animationFileName,fps=10):
+    '''
+    Encodes the frames in a GIF with Pillow, or in a video with ffmpeg for
+    any other extension (.mp4, .webm, ...).
+    '''
+    if animationFileName.lower().endswith('.gif'):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ImportError('Pillow is needed to write GIF animations: pip install Pillow')
+        ## a single palette for all the frames keeps the GIF small
+        with Image.open(frameFileNames[0]) as frame:
+            first = frame.convert('RGB').quantize(colors=256)
+        first.save(animationFileName,save_all=True,append_images=_quantizedFrames(frameFileNames[1:],first),
+                   duration=int(1000/fps),loop=0,optimize=False)
+    else:
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError('ffmpeg is needed to write '+animationFileName+', use a .gif file name to write a GIF with Pillow')
+        pattern = os.path.join(os.path.dirname(frameFileNames[0]),FRAME_NAME.replace('{:06d}','%06d'))
+        subprocess.run([ffmpeg,'-y','-loglevel','error','-framerate',str(fps),'-i',pattern,
+                        '-vf','pad=ceil(iw/2)*2:ceil(ih/2)*2','-pix_fmt','yuv420p',animationFileName],check=True)
+    print('*** SUCCESS writing!  '+animationFileName)
+    return
+
+
+def animateProfiles(outputFileName,animationFileName,variables=['psi'],nFrames=None,fps=10,nWorkers=None,frameDir=None,
+                    labelSize=14,titleSize=16,axisTicksSize=12,lineWidth=1.0,figureSizeHeigth=6,figureSizeWidth=6,dpi=80):
+    '''
+    Animates the profiles of one or more variables of an output file.
+
+    variables: names of the variables, one panel for each of them
+    nFrames: number of frames, evenly spaced over the simulation, by default all the time steps
+    nWorkers: number of processes, if None the number of CPUs
+    frameDir: folder where the PNG frames are kept, if None they are written
+        to a temporary folder that is deleted at the end
+
+    return:
+
+    number of frames
+    '''
+    if not animationFileName.lower().endswith('.gif') and shutil.which('ffmpeg') is None:
+        ## fail before rendering the frames
+        raise RuntimeError('ffmpeg is needed to write '+animationFileName+', use a .gif file name to write a GIF with Pillow')
+
+    settings = {'labelSize': labelSize, 'titleSize': titleSize, 'axisTicksSize': axisTicksSize, 'lineWidth': lineWidth,
+                'figureSizeHeigth': figureSizeHeigth, 'figureSizeWidth': figureSizeWidth*len(variables), 'dpi': dpi}
+
+    ncfile = Dataset(outputFileName,'r')
+    timeIndex = frameTimeIndices(ncfile.dimensions['time'].size,nFrames)
+    limits = profileLimits(ncfile,variables,timeIndex)
+    ncfile.close()
+
+    temporary = frameDir is None
+    if temporary:
+        frameDir = tempfile.mkdtemp(prefix='frames_')
+    else:
+        os.makedirs(frameDir,exist_ok=True)
+
+    try:
+        frameNumbers = np.arange(np.size(timeIndex))
+        arguments = [(outputFileName,variables,timeIndex[start:start+FRAMES_PER_TASK],frameNumbers[start:start+FRAMES_PER_TASK],
+                      frameDir,limits,settings) for start in range(0,np.size(timeIndex),FRAMES_PER_TASK)]
+        if nWorkers == 1 or len(arguments) == 1:
+            blocks = [_renderFrames(a) for a in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+                blocks = list(executor.map(_renderFrames,arguments))
+        encodeFrames([f for block in blocks for f in block],animationFileName,fps)
+    finally:
+        if temporary:
+            shutil.rmtree(frameDir,ignore_errors=True)
+
+    return np.size(timeIndex)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Animate the profiles of a Richards 1D output file')
+    parser.add_argument('outputFileName', help='output NetCDF file')
+    parser.add_argument('animationFileName', help='animation file, .gif or a video format supported by ffmpeg')
+    parser.add_argument('--variable', dest='variables', action='append', default=None,
+                        help='variable to animate, can be given more than once (default psi)')
+    parser.add_argument('--frames', dest='nFrames', type=int, default=None, help='number of frames')
+    parser.add_argument('--fps', type=int, default=10, help='frames per second')
+    parser.add_argument('--workers', dest='nWorkers', type=int, default=None, help='number of processes')
+    parser.add_argument('--frame-dir', dest='frameDir', default=None, help='keep the PNG frames in this folder')
+    parser.add_argument('--dpi', type=int, default=80, help='resolution of the frames')
+    args = parser.parse_args(argv)
+
+    animateProfiles(args.outputFileName,args.animationFileName,args.variables or ['psi'],args.nFrames,args.fps,
+                    args.nWorkers,args.frameDir,dpi=args.dpi)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Nov  1 10:12:37 2026
+
+This is used to see when the nested Newton of Richards1DSolver.py struggles:
+it reads the convergence variables of the output files (outer and inner
+iterations, norm of the residual and number of control volumes in the non
+convex region psi > psiStar at each output time step) and summarizes them, to
+choose newtonTolerance, timeDelta and nestedNewton for a site.
+
+The values of each output time step are the sums (iterations) or the maximum
+(residual, non convex control volumes) over the time steps of the scheme
+in tTimestep. Output files written by the OMS component do not have these
+variables.
+
+    convergence = readConvergence('output.nc')
+    summary = convergenceSummary(convergence,tolerance=1e-11)
+    summary['worstSteps']
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DSolver import OUTPUT_CONVERGENCE_VARIABLES
+
+
+def readConvergence(outputFileName):
+    '''
+    Reads the convergence variables of an output file of Richards1DSolver.py.
+
+    return:
+
+    convergence: dataframe indexed by time (unix convention) with columns
+        outerIterations, innerIterations, newtonResidual [m], nonConvexCells
+        and topBC, the boundary condition of the time step
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+    missing = [name for name in OUTPUT_CONVERGENCE_VARIABLES if name not in ncfile.variables]
+    if missing:
+        ncfile.close()
+        raise ValueError(outputFileName+' has no convergence variables ('+', '.join(missing)+
+                         '), it was not written by Richards1DSolver.py')
+
+    convergence = {name: ncfile.variables[name][:] for name in OUTPUT_CONVERGENCE_VARIABLES}
+    convergence['topBC'] = ncfile.variables['topBC'][:]
+    time = ncfile.variables['time'][:]
+    ncfile.close()
+
+    return pd.DataFrame(convergence,index=pd.Index(time,name='time'))
+
+
+def convergenceSummary(convergence,tolerance=None,nWorst=10):
+    '''
+    Summarizes the convergence of a run.
+
+    convergence: dataframe of readConvergence
+    tolerance: newtonTolerance of the run, to count the time steps that did not converge
+    nWorst: number of time steps with the most inner iterations that are returned
+
+    return:
+
+    summary: dictionary with the totals and the mean, 95th percentile and
+        maximum per output time step of the iterations, the maximum residual,
+        the maximum and mean number of non convex control volumes, the
+        fraction of time steps with non convex control volumes, the number of
+        time steps with residual >= tolerance (if tolerance is given) and the
+        dataframe of the worst time steps (worstSteps)
+    '''
+    summary = {'outputSteps': len(convergence)}
+    for name in ['outerIterations','innerIterations']:
+        values = convergence[name].to_numpy()
+        summary[name] = int(np.sum(values))
+        summary[name+'Mean'] = float(np.mean(values)) if np.size(values) else 0.0
+        summary[name+'P95'] = float(np.percentile(values,95)) if np.size(values) else 0.0
+        summary[name+'Max'] = int(np.max(values)) if np.size(values) else 0
+    summary['newtonResidualMax'] = float(convergence['newtonResidual'].max()) if len(convergence) else 0.0
+    summary['nonConvexCellsMax'] = int(convergence['nonConvexCells'].max()) if len(convergence) else 0
+    summary['nonConvexCellsMean'] = float(convergence['nonConvexCells'].mean()) if len(convergence) else 0.0
+    summary['nonConvexFraction'] = float(np.mean(convergence['nonConvexCells'] > 0)) if len(convergence) else 0.0
+    if tolerance is not None:
+        summary['nonConvergedSteps'] = int(np.sum(convergence['newtonResidual'] >= tolerance))
+    summary['worstSteps'] = convergence.sort_values(['innerIterations','outerIterations'],ascending=False).head(nWorst)
+    return summary
+
+
+def _convergenceSummary(arguments):
+    [outputFileName,tolerance] = arguments
+    summary = convergenceSummary(readConvergence(outputFileName),tolerance,nWorst=0)
+    del summary['worstSteps']
+    return summary
+
+
+def convergenceSummaryBatch(outputFileNames,tolerance=None,nWorkers=None):
+    '''
+    Runs convergenceSummary on a batch of output files in parallel, to compare
+    runs with different newtonTolerance, timeDelta or nestedNewton.
+
+    nWorkers: number of processes, if None the number of CPUs
+
+    return:
+
+    summary: dataframe indexed by output file name, one column for each value
+        of convergenceSummary except worstSteps
+    '''
+    arguments = [(outputFileName,tolerance) for outputFileName in outputFileNames]
+    if nWorkers == 1 or len(arguments) == 1:
+        results = [_convergenceSummary(a) for a in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            results = list(executor.map(_convergenceSummary,arguments))
+
+    return pd.DataFrame(results,index=pd.Index(list(outputFileNames),name='outputFileName'))
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 15:21:09 2026
+
+This is used to track the wetting front and the water table of Richards 1D
+simulations at every time step.
+
+The functions work on matrices of water suction (time, control volume) and
+locate threshold crossings along the soil column with a linear interpolation
+between the centroids of two adjacent control volumes. Positions are given
+with the same coordinate of the variable depth of the output file: zero at
+the soil surface and positive upward.
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DWaterBalance import timeChunks, controlVolumeLengths
+
+
+def _firstTrue(mask):
+    ## index of the first True along the last axis and whether there is one
+    index = np.argmax(mask,axis=-1)
+    found = np.take_along_axis(mask,index[...,None],axis=-1)[...,0]
+    return [index,found]
+
+
+def _crossing(values,depths,lower,threshold):
+    ## position where values is equal to threshold between the control volumes lower and lower+1
+    rows = np.arange(values.shape[0])
+    v0 = values[rows,lower]
+    v1 = values[rows,lower+1]
+    with np.errstate(divide='ignore',invalid='ignore'):
+        weight = np.where(v1 != v0,(threshold-v0)/(v1-v0),0.5)
+    return depths[lower]+np.clip(weight,0,1)*(depths[lower+1]-depths[lower])
+
+
+def waterTableDepth(psi,depths,surface=0.0):
+    '''
+    Computes the position of the water table: the top of the saturated zone
+    (psi >= 0) that starts at the bottom of the soil column.
+
+    psi: matrix (time, control volume) of water suction, control volumes from the
+        bottom to the top of the soil column, without the soil surface
+    depths: coordinates of the control volumes centroids
+    surface: coordinate of the soil surface
+
+    return:
+
+    vector with the position of the water table at each time, nan if the
+    bottom control volume is not saturated.
+    '''
+    psi = np.atleast_2d(psi)
+    depths = np.asarray(depths)
+    [first,found] = _firstTrue(psi < 0)
+
+    position = np.full(psi.shape[0],np.nan)
+    ## water table between two centroids
+    inside = found & (first > 0)
+    if np.any(inside):
+        position[inside] = _crossing(psi[inside],depths,first[inside]-1,0.0)
+    ## saturated soil column: hydrostatic extrapolation above the last centroid
+    position[~found] = np.minimum(depths[-1]+psi[~found,-1],surface)
+
+    return position
+
+
+def saturatedThickness(psi,deltaZ):
+    '''
+    Computes the total thickness of the saturated control volumes (psi >= 0),
+    including perched saturated zones.
+    '''
+    return np.dot(np.atleast_2d(psi) >= 0,np.asarray(deltaZ))
+
+
+def wettingFrontDepth(psi,depths,psiReference,threshold=0.01):
+    '''
+    Computes the position of the wetting front: the deepest point of the zone,
+    connected to the soil surface, where water suction increased by more than
+    threshold with respect to psiReference.
+
+    psi: matrix (time, control volume) of water suction, control volumes from the
+        bottom to the top of the soil column, without the soil surface
+    depths: coordinates of the control volumes centroids
+    psiReference: reference water suction, usually the initial condition
+    threshold: increase of water suction [m] that identifies the wetted soil
+
+    return:
+
+    vector with the position of the wetting front at each time, nan if the
+    top control volume is not wetted, the bottom centroid if the whole
+    soil column is wetted.
+    '''
+    change = np.atleast_2d(psi)-np.asarray(psiReference)
+    depths = np.asarray(depths)
+    nCV = np.size(depths)
+    ## scan from the top to the bottom
+    [first,found] = _firstTrue(change[:,::-1] <= threshold)
+    lower = nCV-1-first
+
+    position = np.full(change.shape[0],np.nan)
+    inside = found & (first > 0)
+    if np.any(inside):
+        position[inside] = _crossing(change[inside],depths,lower[inside],threshold)
+    position[~found] = depths[0]
+
+    return position
+
+
+def arrivalTime(frontDepth,time,depth):
+    '''
+    Returns the first time at which the wetting front reaches depth, None
+    if it never does.
+    '''
+    reached = np.asarray(frontDepth) <= depth
+    if not np.any(reached):
+        return None
+    return time[np.argmax(reached)]
+
+
+def trackFronts(outputFileName,threshold=0.01,chunkSize=10000):
+    '''
+    Computes wetting front, water table and saturated thickness for every time
+    step of an output file, reading psi in chunks of time steps.
+
+    The wetting front is computed with respect to the initial condition psiIC.
+
+    return:
+
+    fronts: dataframe indexed by time (unix convention) with columns
+        wettingFront, waterTable [m] (positions) and saturatedThickness [m]
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+
+    time = ncfile.variables['time'][:]
+    deltaZ = controlVolumeLengths(ncfile.variables['dual_depth'][:])
+    nCV = np.size(deltaZ)
+    depths = ncfile.variables['depth'][0:nCV]
+    surface = ncfile.variables['dual_depth'][nCV]
+    psiIC = ncfile.variables['psiIC'][0:nCV]
+
+    wettingFront = np.empty(np.size(time))
+    waterTable = np.empty(np.size(time))
+    thickness = np.empty(np.size(time))
+    for start,stop in timeChunks(np.size(time),chunkSize):
+        psi = ncfile.variables['psi'][start:stop,0:nCV]
+        wettingFront[start:stop] = wettingFrontDepth(psi,depths,psiIC,threshold)
+        waterTable[start:stop] = waterTableDepth(psi,depths,surface)
+        thickness[start:stop] = saturatedThickness(psi,deltaZ)
+    ncfile.close()
+
+    return pd.DataFrame({'wettingFront': wettingFront,
+                         'waterTable': waterTable,
+                         'saturatedThickness': thickness},
+                        index=pd.Index(time,name='time'))
+
+
+def _trackFronts(arguments):
+    return trackFronts(*arguments)
+
+
+def trackFrontsBatch(outputFileNames,threshold=0.01,chunkSize=10000,nWorkers=None):
+    '''
+    Runs trackFronts on a batch of output files in parallel.
+
+    nWorkers: number of processes, if None the number of CPUs
+
+    return:
+
+    fronts: dataframe indexed by output file name and time, see trackFronts
+    '''
+    arguments = [(outputFileName,threshold,chunkSize) for outputFileName in outputFileNames]
+    if nWorkers == 1 or len(arguments) == 1:
+        results = [_trackFronts(a) for a in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            results = list(executor.map(_trackFronts,arguments))
+
+    return pd.concat(results,keys=list(outputFileNames),names=['outputFileName','time'])
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:40:02 2026
+
+This is used to read the grid NetCDF files created with RichardsMeshGen
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import numpy as np
+
+from netCDF4 import Dataset
+
+from Richards1DSWRC import detectSWRCModel
+
+
+## variables defined on the control volumes centroids plus the soil surface (dimension z)
+GRID_VARIABLES_Z = ['eta', 'etaDual', 'z', 'zDual', 'psiIC', 'spaceDelta', 'et']
+
+## variables defined on the control volumes (dimension zz)
+GRID_VARIABLES_ZZ = ['deltaZ', 'thetaS', 'thetaR', 'Ks', 'alphaSpecificStorage', 'betaSpecificStorage',
+                     'par1SWRC', 'par2SWRC', 'par3SWRC', 'par4SWRC', 'par5SWRC', 'par6SWRC', 'par7SWRC', 'par8SWRC']
+
+
+def readRichardsGridNetCDF(fileName):
+    '''
+    Reads all the variables of a grid NetCDF file in memory.
+
+    return:
+
+    grid: dictionary containing one numpy array for each variable of the grid file
+        and the name of the SWRC model ('swrcModel'), detected from the long_name
+        of par1SWRC.
+    '''
+    ncfile = Dataset(fileName,'r')
+    ncfile.set_auto_mask(False)
+
+    grid = {}
+    for name in GRID_VARIABLES_Z + GRID_VARIABLES_ZZ:
+        grid[name] = np.array(ncfile.variables[name][:], dtype=float)
+
+    grid['swrcModel'] = detectSWRCModel(ncfile.variables['par1SWRC'].long_name)
+    ncfile.close()
+
+    return grid
+
+
+def initialPonding(psiIC):
+    '''
+    Height [m] of the water ponding at the soil surface in the initial
+    condition: the positive part of psiIC at the soil surface (last element).
+    It is the ponding the solver starts from and the one of the initial
+    storage of the water balance.
+    '''
+    return max(float(psiIC[-1]),0.0)
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 08:47:55 2026
+
+This is used to compute the water budget of each soil layer of a Richards 1D
+simulation at every time step.
+
+The layers are those defined in the RichardsMeshGen input .csv file (rows of
+Type 'L'). For each layer and time step:
+
+    storageChange = inflow - outflow + sourceSink
+
+where inflow and outflow are the water volumes [m] crossing the top and the
+bottom interfaces of the layer, and sourceSink is the residual (evapotranspiration
+and numerical error).
+
+The output file is read in chunks of time steps: only the water content and the
+Darcy velocities at the layer interfaces are read, so that multi-year outputs
+are never loaded in memory.
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DSWRC import computeWaterContent, layerSWRCParameters
+from Richards1DWaterBalance import timeChunks, timeStepLengths, controlVolumeLengths
+
+
+## quantities computed for each layer
+BUDGET_QUANTITIES = ['storage', 'storageChange', 'inflow', 'outflow', 'sourceSink']
+
+
+def layerIndices(data,depths):
+    '''
+    Computes the control volumes belonging to each soil layer.
+
+    data: pandas dataframe of the RichardsMeshGen input .csv file
+    depths: coordinates of the control volumes centroids, from the bottom to the
+        top of the soil column (depth in the output file, without the soil surface)
+
+    return:
+
+    layers: dataframe with one row for each layer, from the bottom to the top of the
+        soil column, with the coordinates of the layer top and bottom and the
+        index of the first control volume (firstCV) and of the control volume
+        after the last one (lastCV).
+    '''
+    coordLayer = np.asarray(data['eta'][data['Type'] == 'L'], dtype=float)
+    ## from the bottom to the top
+    bottoms = coordLayer[:0:-1]
+    tops = coordLayer[-2::-1]
+    firstCV = np.searchsorted(depths,bottoms,side='right')
+    lastCV = np.searchsorted(depths,tops,side='right')
+    if np.any(lastCV <= firstCV):
+        raise ValueError('There are layers without control volumes: check that the .csv file is the one used to create the grid')
+
+    return pd.DataFrame({'top': tops, 'bottom': bottoms, 'firstCV': firstCV, 'lastCV': lastCV})
+
+
+def iterLayerBudget(outputFileName,data,chunkSize=10000):
+    '''
+    Computes the water budget of each soil layer, one chunk of time steps at a time.
+
+    outputFileName: output NetCDF file of Richards 1D
+    data: pandas dataframe of the RichardsMeshGen input .csv file used to create the grid
+    chunkSize: number of time steps read at once
+
+    yields:
+
+    [time, budget] for each chunk, where budget is a dictionary with one
+    matrix (time, layer) for each quantity in BUDGET_QUANTITIES, layers are
+    ordered from the bottom to the top of the soil column. Volumes are in [m].
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+
+    time = ncfile.variables['time'][:]
+    dt = timeStepLengths(time)
+    deltaZ = controlVolumeLengths(ncfile.variables['dual_depth'][:])
+    nCV = np.size(deltaZ)
+    layers = layerIndices(data,ncfile.variables['depth'][0:nCV])
+    firstCV = layers['firstCV'].values
+    ## interfaces bounding the layers: the bottom interface of each layer and the top of the last one
+    interfaces = np.append(firstCV,layers['lastCV'].values[-1])
+
+    ## water stored in each layer at the initial condition
+    parameters = layerSWRCParameters(data)
+    ## parameters are from the top to the bottom, control volumes from the bottom to the top
+    cvLayer = np.repeat(np.arange(len(layers))[::-1],(layers['lastCV']-layers['firstCV']).values)
+    cvParameters = {k: np.asarray(v)[cvLayer] for k,v in parameters.items() if k != 'swrcModel'}
+    thetaIC = computeWaterContent(ncfile.variables['psiIC'][firstCV[0]:interfaces[-1]],parameters['swrcModel'],
+                                  cvParameters['thetaS'],cvParameters['thetaR'],
+                                  cvParameters['par1SWRC'],cvParameters['par2SWRC'],cvParameters['par3SWRC'],
+                                  cvParameters['par4SWRC'],cvParameters['par5SWRC'],
+                                  cvParameters['alphaSpecificStorage'],cvParameters['betaSpecificStorage'])
+    volume = deltaZ[firstCV[0]:interfaces[-1]]
+    offsets = firstCV-firstCV[0]
+    previousStorage = np.add.reduceat(thetaIC*volume,offsets)
+
+    try:
+        for start,stop in timeChunks(np.size(time),chunkSize):
+            theta = ncfile.variables['water_heigth'][start:stop,firstCV[0]:interfaces[-1]]
+            storage = np.add.reduceat(theta*volume,offsets,axis=1)
+            storageChange = np.diff(np.vstack([previousStorage,storage]),axis=0)
+            previousStorage = storage[-1]
+
+            ## Darcy velocities are positive upward
+            q = ncfile.variables['darcyVelocities'][start:stop,interfaces]*dt[start:stop,None]
+            qBottom = q[:,0:-1]
+            qTop = q[:,1:]
+            inflow = np.maximum(qBottom,0)+np.maximum(-qTop,0)
+            outflow = np.maximum(-qBottom,0)+np.maximum(qTop,0)
+
+            yield [time[start:stop], {'storage': storage,
+                                      'storageChange': storageChange,
+                                      'inflow': inflow,
+                                      'outflow': outflow,
+                                      'sourceSink': storageChange-inflow+outflow}]
+    finally:
+        ncfile.close()
+
+
+def computeLayerBudget(outputFileName,data,chunkSize=10000):
+    '''
+    Computes the water budget of each soil layer at every time step.
+
+    return:
+
+    layerBudget: dataframe indexed by time (unix convention), with two levels of
+        columns: the quantity (BUDGET_QUANTITIES) and the layer number, 0 is the top layer
+        as in the .csv file. Volumes are in [m].
+
+    layers: dataframe describing the layers, see layerIndices, ordered as the columns
+        of layerBudget.
+    '''
+    chunks = list(iterLayerBudget(outputFileName,data,chunkSize))
+    time = np.concatenate([c[0] for c in chunks])
+
+    columns = {}
+    for quantity in BUDGET_QUANTITIES:
+        ## layers from the top to the bottom, as in the .csv file
+        values = np.vstack([c[1][quantity] for c in chunks])[:,::-1]
+        for layer in range(values.shape[1]):
+            columns[(quantity,layer)] = values[:,layer]
+
+    layerBudget = pd.DataFrame(columns,index=pd.Index(time,name='time'))
+    layerBudget.columns = pd.MultiIndex.from_tuples(layerBudget.columns,names=['quantity','layer'])
+
+    ncfile = Dataset(outputFileName,'r')
+    nCV = ncfile.dimensions['depth'].size-1
+    layers = layerIndices(data,ncfile.variables['depth'][0:nCV])[::-1].reset_index(drop=True)
+    ncfile.close()
+
+    return [layerBudget,layers]
+
+
+def intervalLayerBudget(layerBudget,intervalEdges):
+    '''
+    Aggregates the budget of each layer over time intervals using cumulative sums.
+
+    layerBudget: first output of computeLayerBudget
+    intervalEdges: increasing times (unix convention) bounding the intervals, an
+        interval includes the time steps ending after its first edge and up to its last one.
+
+    return:
+
+    intervalBudget: dataframe indexed by the end of each interval, with the same
+        columns of layerBudget. storage is the value at the end of the interval,
+        the other quantities are the totals over the interval.
+    '''
+    time = layerBudget.index.values
+    edges = np.searchsorted(time,np.asarray(intervalEdges),side='right')-1
+
+    intervals = {}
+    for quantity in BUDGET_QUANTITIES:
+        values = layerBudget[quantity].values
+        if quantity == 'storage':
+            intervals[quantity] = values[edges[1:]]
+        else:
+            cumulative = np.vstack([np.zeros(values.shape[1]),np.cumsum(values,axis=0)])
+            intervals[quantity] = cumulative[edges[1:]+1]-cumulative[edges[0:-1]+1]
+
+    columns = {(quantity,layer): intervals[quantity][:,layer]
+               for quantity in BUDGET_QUANTITIES for layer in range(intervals[quantity].shape[1])}
+    intervalBudget = pd.DataFrame(columns,index=pd.Index(np.asarray(intervalEdges)[1:],name='time'))
+    intervalBudget.columns = pd.MultiIndex.from_tuples(intervalBudget.columns,names=['quantity','layer'])
+
+    return intervalBudget
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Nov  3 09:51:18 2026
+
+This is used to choose the number of control volumes N of the layers of a
+RichardsMeshGen input .csv file.
+
+From the .csv file a family of grids is written, with N of every layer
+multiplied by the refinement factors, and the same simulation is run with
+Richards1DSolver.py on each of them, in parallel. For each grid the key
+outputs at every time step
+
+    - bottomFlux: cumulative flux through the bottom, positive if inflow [m]
+    - infiltration: cumulative flux through the soil surface, positive downward [m]
+    - waterTable: position of the water table [m], see Richards1DFrontTracking
+
+are compared with those of the finest grid, and the coarsest grid whose
+maximum differences are within the tolerances is recommended. The water table
+is compared only at the time steps where it exists on both grids: when the
+soil column saturates or drains one time step earlier on one grid its
+position would jump by the whole soil column. The fraction of time steps
+where it exists on one grid only is compared separately (waterTablePresence).
+A grid where the Newton method did not converge at some time step
+(nonConvergedSteps, see Richards1DSolver.runRichards1D) is not recommended.
+
+It can be used from the command line:
+
+    python Richards1DMeshConvergence.py ../data/RichardMeshGen_input/Clay_noPonding_VG.csv --top TestAll_05.csv --start "2017-01-01 00:00" --end "2017-01-02 00:00"
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DSWRC import detectSWRCModelFromColumns
+from Richards1DSolver import runRichards1D
+from Richards1DWaterBalance import timeStepLengths
+from Richards1DFrontTracking import waterTableDepth
+from RichardsMeshGenCommon import meshCellNumbers
+
+
+## RichardsMeshGen module of each SWRC model
+MESHGEN_MODULES = {'Van Genuchten': 'RichardsMeshGenVanGenuchten',
+                   'Brooks Corey': 'RichardsMeshGenBrooksCorey',
+                   'Kosugi': 'RichardsMeshGenKosugi',
+                   'Romano': 'RichardsMeshGenRomano'}
+
+## factors multiplying N of every layer
+REFINEMENT_FACTORS = [0.25, 0.5, 1, 2, 4]
+
+## maximum differences from the finest grid of the key outputs [m] and fraction of time
+## steps with a water table on one grid only [-]
+TOLERANCES = {'bottomFlux': 1e-3, 'infiltration': 1e-3, 'waterTable': 1e-2, 'waterTablePresence': 0.05}
+
+KEY_OUTPUTS = list(TOLERANCES.keys())
+
+
+def readMeshData(meshFileName):
+    '''
+    Reads a RichardsMeshGen input .csv file, N is an integer with -999 for
+    the bottom of the soil column.
+    '''
+    data = pd.read_csv(meshFileName)
+    data['N'] = data['N'].fillna(-999).astype(int)
+    return data
+
+
+def refinedMeshData(data,factor):
+    '''
+    Returns a copy of data with N of every layer multiplied by factor, at
+    least 1.
+    '''
+    refined = data.copy()
+    n = np.asarray(refined['N'])
+    refined['N'] = np.append(np.maximum(np.rint(n[0:-1]*factor),1).astype(int),n[-1])
+    return refined
+
+
+def writeRefinedGrid(data,factor,gridFileName,icType='hydrostatic',swrcModel=None,mode='uniform'):
+    '''
+    Writes the grid NetCDF of data refined by factor with the functions of
+    the RichardsMeshGen module of its SWRC model.
+
+    mode: mesh mode of buildData, see RichardsMeshGenCommon
+
+    return:
+
+    N of the layers of the grid written
+    '''
+    if swrcModel is None:
+        swrcModel = detectSWRCModelFromColumns(data.columns)
+    meshGen = __import__(MESHGEN_MODULES[swrcModel])
+    data = refinedMeshData(data,factor)
+    [eta,etaDual,deltaZ,spaceDelta,z,zDual] = meshGen.buildData(data,mode)
+    data = data.assign(N=meshCellNumbers(data,mode,swrcModel=swrcModel))
+    eta = np.asarray(eta)
+    psiIC = meshGen.setInitialCondition(data,eta,z,icType)
+    parameters = meshGen.setParameters(data,eta)
+    meshGen.writeGridNetCDF(eta,etaDual,z,zDual,spaceDelta,deltaZ,psiIC,*parameters,gridFileName,
+                            'Mesh convergence, N x '+str(factor),'','','',pd.Timestamp.now().strftime('%Y-%m-%d'),
+                            'Richards1DMeshConvergence')
+    return np.asarray(data['N'])[0:-1].tolist()
+
+
+def keyOutputs(outputFileName):
+    '''
+    Computes the key outputs of a run at every time step.
+
+    return:
+
+    outputs: dataframe indexed by time (unix convention) with columns
+        bottomFlux, infiltration [m] (cumulative) and waterTable [m], nan
+        when there is no water table
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+    time = ncfile.variables['time'][:]
+    dualDepths = ncfile.variables['dual_depth'][:]
+    nCV = np.size(dualDepths)-1
+    depths = ncfile.variables['depth'][0:nCV]
+    darcy = ncfile.variables['darcyVelocities'][:]
+    psi = ncfile.variables['psi'][:,0:nCV]
+    ncfile.close()
+
+    dt = timeStepLengths(time)
+    return pd.DataFrame({'bottomFlux': np.cumsum(darcy[:,0]*dt),
+                         'infiltration': np.cumsum(-darcy[:,nCV]*dt),
+                         'waterTable': waterTableDepth(psi,depths,dualDepths[nCV])},
+                        index=pd.Index(time,name='time'))
+
+
+def keyOutputErrors(outputs,reference):
+    '''
+    Computes the differences of the key outputs of a run from those of the
+    reference run.
+
+    return:
+
+    dictionary with the maximum absolute difference of bottomFlux,
+    infiltration and waterTable, this one over the time steps where both runs
+    have a water table (0 if there are none), and waterTablePresence, the
+    fraction of time steps where only one of them has a water table
+    '''
+    errors = {}
+    for name in ['bottomFlux','infiltration']:
+        errors[name] = float(np.max(np.abs(outputs[name].to_numpy()-reference[name].to_numpy())))
+    waterTable = outputs['waterTable'].to_numpy()
+    referenceWaterTable = reference['waterTable'].to_numpy()
+    both = ~np.isnan(waterTable) & ~np.isnan(referenceWaterTable)
+    errors['waterTable'] = float(np.max(np.abs(waterTable[both]-referenceWaterTable[both]))) if np.any(both) else 0.0
+    errors['waterTablePresence'] = float(np.mean(np.isnan(waterTable) != np.isnan(referenceWaterTable)))
+    return errors
+
+
+def _runLevel(arguments):
+    [data,factor,workDir,icType,swrcModel,mode,solverOptions] = arguments
+    gridFileName = os.path.join(workDir,'grid_'+str(factor)+'.nc')
+    outputFileName = os.path.join(workDir,'output_'+str(factor)+'.nc')
+    nLayers = writeRefinedGrid(data,factor,gridFileName,icType,swrcModel,mode)
+    statistics = runRichards1D(gridFileName,outputFileName,**solverOptions)
+    level = {'factor': factor, 'N': nLayers, 'nCells': int(np.sum(nLayers)), 'gridFileName': gridFileName,
+             'outputFileName': outputFileName}
+    level.update(statistics)
+    return [level,keyOutputs(outputFileName)]
+
+
+def meshConvergenceStudy(meshFileName,topBCFileName,bottomBCFileName,startDate,endDate,factors=REFINEMENT_FACTORS,
+                         icType='hydrostatic',tolerances=TOLERANCES,swrcModel=None,mode='uniform',nWorkers=None,
+                         workDir=None,**solverOptions):
+    '''
+    Runs a simulation on the grids of meshFileName refined by factors and
+    compares the key outputs with those of the finest grid.
+
+    solverOptions: other parameters of runRichards1D (topBCType, bottomBCType, tTimestep, ...)
+    workDir: folder of the grids and of the outputs, if None a temporary
+        folder that is removed at the end
+    nWorkers: number of processes, if None the number of CPUs. With more than
+        one process the wall times include the contention of the processes
+
+    return:
+
+    results: dataframe with one row for each factor: N of the layers,
+        nCells, the statistics of the run (wallTime, timeSteps, ...), the
+        maximum difference from the finest grid of each key output and
+        whether they are all within the tolerances and the Newton method
+        converged at every time step (passed)
+    '''
+    data = readMeshData(meshFileName)
+    removeWorkDir = workDir is None
+    if removeWorkDir:
+        workDir = tempfile.mkdtemp(prefix='meshConvergence')
+    solverOptions.update({'topBCFileName': topBCFileName, 'bottomBCFileName': bottomBCFileName,
+                          'startDate': startDate, 'endDate': endDate})
+    arguments = [(data,factor,workDir,icType,swrcModel,mode,solverOptions) for factor in sorted(factors)]
+    try:
+        if nWorkers == 1 or len(arguments) == 1:
+            runs = [_runLevel(a) for a in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+                runs = list(executor.map(_runLevel,arguments))
+    finally:
+        if removeWorkDir:
+            shutil.rmtree(workDir,ignore_errors=True)
+
+    reference = runs[-1][1]
+    rows = []
+    for level,outputs in runs:
+        ## a run with time steps split because the Newton method did not converge
+        ## did not use the timeDelta of the study
+        level['passed'] = level['nonConvergedSteps'] == 0
+        for name,error in keyOutputErrors(outputs,reference).items():
+            level[name+'Error'] = error
+            level['passed'] &= error <= tolerances[name]
+        level['reference'] = level is runs[-1][0]
+        rows.append(level)
+    return pd.DataFrame(rows)
+
+
+def recommendedGrid(results):
+    '''
+    return:
+
+    the row of results of the coarsest grid, other than the finest one, within
+    the tolerances, None if there is none
+    '''
+    passed = results[results['passed'] & ~results['reference']]
+    if len(passed) == 0:
+        return None
+    return passed.loc[passed['nCells'].idxmin()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mesh convergence study of a RichardsMeshGen input .csv file')
+    parser.add_argument('meshFileName', help='RichardsMeshGen input .csv file')
+    parser.add_argument('--top', dest='topBCFileName', required=True, help='.csv time series of the top boundary condition')
+    parser.add_argument('--bottom', dest='bottomBCFileName', default=None, help='.csv time series of the bottom boundary condition')
+    parser.add_argument('--start', dest='startDate', required=True, help='start date yyyy-MM-dd HH:mm')
+    parser.add_argument('--end', dest='endDate', required=True, help='end date yyyy-MM-dd HH:mm')
+    parser.add_argument('--top-bc-type', dest='topBCType', default='Top Neumann')
+    parser.add_argument('--bottom-bc-type', dest='bottomBCType', default='Bottom Free Drainage')
+    parser.add_argument('--t-timestep', dest='tTimestep', type=int, default=300, help='time step of the time series [s]')
+    parser.add_argument('--time-delta', dest='timeDelta', type=float, default=300, help='time step of the numerical scheme [s]')
+    parser.add_argument('--factors', type=float, nargs='+', default=REFINEMENT_FACTORS, help='factors multiplying N')
+    parser.add_argument('--ic-type', dest='icType', default='hydrostatic', help='icType of setInitialCondition')
+    parser.add_argument('--mode', default='uniform', help='mesh mode of buildData')
+    for name,value in TOLERANCES.items():
+        parser.add_argument('--tolerance-'+name, dest=name, type=float, default=value, help='maximum difference of '+name+(' [-]' if name == 'waterTablePresence' else ' [m]'))
+    parser.add_argument('--workers', dest='nWorkers', type=int, default=None, help='number of processes')
+    parser.add_argument('--work-dir', dest='workDir', default=None, help='folder where grids and outputs are kept')
+    parser.add_argument('--summary', default=None, help='write the results to this .csv file')
+    args = vars(parser.parse_args(argv))
+
+    tolerances = {name: args.pop(name) for name in TOLERANCES}
+    summary = args.pop('summary')
+    results = meshConvergenceStudy(tolerances=tolerances,**args)
+
+    columns = ['factor','N','nCells','wallTime','nonConvergedSteps']+[name+'Error' for name in KEY_OUTPUTS]+['passed']
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(results[columns])
+    if summary is not None:
+        results.to_csv(summary,index=False)
+    recommended = recommendedGrid(results)
+    if recommended is None:
+        print('No grid coarser than the finest one is within the tolerances')
+        return 1
+    print('Recommended N: '+str(recommended['N'])+' ('+str(recommended['nCells'])+' control volumes)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 09:02:36 2026
+
+This is used to compare Richards 1D simulations with measurements taken by
+sensors at given depths.
+
+The observation operator is computed once for a grid: for each sensor it
+stores the two control volumes whose centroids (or interfaces, for fluxes)
+bracket the sensor and the weights of the linear interpolation. Extracting
+the simulated values at the sensors is then a single gather and weighted
+sum on the last axis of an array of any shape: (control volume),
+(time, control volume) or (run, time, control volume).
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from netCDF4 import Dataset
+
+from Richards1DWaterBalance import timeChunks
+
+
+## variables defined at the control volumes interfaces (dimension dualDepth)
+DUAL_VARIABLES = ['darcyVelocities', 'darcyVelocitiesCapillary', 'darcyVelocitiesGravity',
+                  'poreVelocities', 'celerities', 'kinematicRatio']
+
+
+def measurementPoints(data):
+    '''
+    Returns the coordinates and the measured water suction of the measurement
+    points (rows of Type 'M') of a RichardsMeshGen input .csv file.
+    '''
+    measurements = data[data['Type'] == 'M']
+    return [np.asarray(measurements['eta'],dtype=float),np.asarray(measurements['psi'],dtype=float)]
+
+
+def buildObservationOperator(sensorDepths,coordinates):
+    '''
+    Computes the interpolation indices and weights from the grid onto the sensors.
+
+    sensorDepths: coordinates of the sensors, zero at the soil surface and positive upward
+    coordinates: increasing coordinates of the points where the variable is defined
+        (depth or dual_depth of the output file, without the soil surface for depth)
+
+    return:
+
+    operator: dictionary with
+        sensorDepths: coordinates of the sensors
+        index: matrix (sensor, 2) of the bracketing points
+        weight: matrix (sensor, 2) of the interpolation weights
+        start, stop: range of points needed by the sensors, to read only this slab
+            from the output file
+    Sensors outside the grid take the value of the closest point.
+    '''
+    sensorDepths = np.atleast_1d(np.asarray(sensorDepths,dtype=float))
+    coordinates = np.asarray(coordinates,dtype=float)
+
+    lower = np.clip(np.searchsorted(coordinates,sensorDepths,side='right')-1,0,np.size(coordinates)-2)
+    upper = lower+1
+    weight = (sensorDepths-coordinates[lower])/(coordinates[upper]-coordinates[lower])
+    weight = np.clip(weight,0,1)
+
+    index = np.column_stack([lower,upper])
+    return {'sensorDepths': sensorDepths,
+            'index': index,
+            'weight': np.column_stack([1-weight,weight]),
+            'start': int(index.min()),
+            'stop': int(index.max())+1}
+
+
+def outputObservationOperator(outputFileName,sensorDepths,variable='psi'):
+    '''
+    Builds the observation operator of the sensors for a variable of an output file,
+    using depth or dual_depth according to the variable.
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+    nCV = ncfile.dimensions['dualDepth'].size-1
+    if variable in DUAL_VARIABLES:
+        coordinates = ncfile.variables['dual_depth'][:]
+    else:
+        coordinates = ncfile.variables['depth'][0:nCV]
+    ncfile.close()
+
+    return buildObservationOperator(sensorDepths,coordinates)
+
+
+def applyObservationOperator(operator,values,offset=0):
+    '''
+    Interpolates values onto the sensors.
+
+    values: array whose last axis runs over the points of the grid, or over
+        the slab operator['start']:operator['stop'] if offset = operator['start']
+
+    return:
+
+    array with the same leading axes of values and one element for each sensor on the last axis
+    '''
+    return np.sum(np.take(values,operator['index']-offset,axis=-1)*operator['weight'],axis=-1)
+
+
+def observe(outputFileName,operator,variable='psi',chunkSize=10000):
+    '''
+    Extracts the simulated values of a variable at the sensors for all the time
+    steps of an output file. Only the slab of the grid around the sensors is read,
+    in chunks of time steps.
+
+    return:
+
+    time: times of the output file (unix convention)
+
+    observed: matrix (time, sensor)
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+    time = ncfile.variables['time'][:]
+    start = operator['start']
+    stop = operator['stop']
+
+    observed = np.empty((np.size(time),np.size(operator['sensorDepths'])))
+    for t0,t1 in timeChunks(np.size(time),chunkSize):
+        slab = ncfile.variables[variable][t0:t1,start:stop]
+        observed[t0:t1] = applyObservationOperator(operator,slab,start)
+    ncfile.close()
+
+    return [time,observed]
+
+
+def _observe(arguments):
+    return observe(*arguments)[1]
+
+
+def observeRuns(outputFileNames,operator,variable='psi',chunkSize=10000,nWorkers=None):
+    '''
+    Extracts the simulated values at the sensors for a batch of output files,
+    that must share the grid and the time steps, in parallel.
+
+    return:
+
+    observed: array (run, time, sensor)
+    '''
+    arguments = [(outputFileName,operator,variable,chunkSize) for outputFileName in outputFileNames]
+    if nWorkers == 1 or len(arguments) == 1:
+        results = [_observe(a) for a in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            results = list(executor.map(_observe,arguments))
+
+    return np.stack(results)
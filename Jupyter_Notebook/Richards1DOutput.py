@@ -11,6 +11,7 @@ from netCDF4 import Dataset
 
 
 import os
+from collections import OrderedDict
 
 ## pandas
 import pandas as pd
@@ -18,31 +19,11 @@ import pandas as pd
 ## numpy
 import numpy as np
 
-## plotting
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.transforms as transforms
-import matplotlib.gridspec as gridspec
-import matplotlib.patches as mpatches
-import matplotlib.transforms as transforms
-import matplotlib.ticker as mtick
-import matplotlib.dates as mdates
-## to convert unix time to human readable date
-import time
-import datetime
-import pytz
- 
-# Standard imports 
-from bokeh.io import output_notebook, show
-from bokeh.plotting import figure
-from bokeh.layouts import gridplot
-from bokeh.models.widgets import Panel, Tabs
-from bokeh.io import output_file, show
-from bokeh.plotting import figure
-from bokeh.models import BoxSelectTool
-from bokeh.models import HoverTool
-
-output_notebook()
+from Richards1DProfiler import startPhase, stopPhase
+from RichardsNotebook import outputNotebook
+
+## matplotlib and bokeh are imported by the functions that plot, so that reading
+## and aggregating the output does not pay for the plotting libraries
 
 
 def readRichardsOutputNetCDF(fileName):
@@ -94,33 +75,186 @@ def readRichardsOutputNetCDF(fileName):
     
     bottomBC = ncfile.variables['bottomBC']
 
-    ## creates a vector with human readable dates
-    datesHuman = [datetime.datetime.fromtimestamp(t,tz=pytz.UTC).strftime("%Y-%m-%d %H:%M") for t in time[:]]
+    ## creates a vector of dates, converting the whole time vector at once
+    datesIndex = pd.to_datetime(np.asarray(time[:]),unit='s',utc=True)
+    dates = list(datesIndex)
 
-    ## creates a vector of dates
-    dates = [pd.Timestamp(datetime.datetime.fromtimestamp(t,tz=pytz.UTC)) for t in time]
+    ## creates a vector with human readable dates
+    datesHuman = list(datesIndex.strftime("%Y-%m-%d %H:%M"))
     
     ## create a dataframe for boundary condition timeseries, this will simplify plotting
-    topBC_DF = pd.DataFrame(np.column_stack([dates, topBC]), 
-                                   columns=['Dates', 'topBC'])
-    topBC_DF.topBC=topBC_DF.topBC.astype(float)
-    
-    topBC_DF=topBC_DF.set_index("Dates")
-    
+    topBC_DF = pd.DataFrame({'topBC': np.asarray(topBC[:],dtype=float)},
+                            index=pd.Index(datesIndex,name='Dates'))
     
-    bottomBC_DF = pd.DataFrame(np.column_stack([dates, bottomBC]), 
-                                   columns=['Dates', 'bottomBC'])
-    bottomBC_DF.bottomBC=bottomBC_DF.bottomBC.astype(float)
-    
-    bottomBC_DF=bottomBC_DF.set_index("Dates")
+    bottomBC_DF = pd.DataFrame({'bottomBC': np.asarray(bottomBC[:],dtype=float)},
+                               index=pd.Index(datesIndex,name='Dates'))
     
     return [ncfile,depths,dualDepths,time,psi,theta,iC,darcyVelocities,darcyVelocitiesCapillary,darcyVelocitiesGravity,celerities,kinematicRatio,error,runOff,dates,datesHuman,topBC_DF,bottomBC_DF]
 
 
 
-def showInitialCondition(iC,depths,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+## reducer used by aggregateOutput for each output variable:
+## 'mean' for state variables and velocities, 'total' for fluxes, that are
+## multiplied by the time step length and summed, 'sum' for variables that are
+## already volumes or heights over the time step. topBC and bottomBC are summed
+## when they are heights in mm and averaged when they are water suction (_reducer)
+AGGREGATION_REDUCERS = {'psi': 'mean',
+                        'water_heigth': 'mean',
+                        'darcyVelocities': 'total',
+                        'darcyVelocitiesCapillary': 'total',
+                        'darcyVelocitiesGravity': 'total',
+                        'poreVelocities': 'mean',
+                        'celerities': 'mean',
+                        'kinematicRatio': 'mean',
+                        'error': 'sum',
+                        'topBC': 'sum',
+                        'bottomBC': 'mean',
+                        'runOff': 'total'}
+
+
+def _reducer(variable,name):
+    ## topBC and bottomBC are heights [mm] over the time step (Neumann) or water suction [m] (Dirichlet)
+    if name in ['topBC','bottomBC']:
+        return 'sum' if getattr(variable,'units','mm') == 'mm' else 'mean'
+    return AGGREGATION_REDUCERS.get(name,'mean')
+
+
+def timeBins(time,frequency):
+    '''
+    Assigns each output time to a time bin.
+
+    time: times in unix convention [s]
+    frequency: 'hour', 'day', 'month', 'year' or the bin length in seconds.
+        Bins are aligned to UTC.
+
+    return:
+
+    binStart: time (unix convention) at the beginning of each bin that contains
+        at least one output time
+
+    binIndex: index of the bin of each output time
+    '''
+    time = np.asarray(time,dtype=np.int64)
+    if frequency in ['month','year']:
+        unit = 'M' if frequency == 'month' else 'Y'
+        binTime = time.astype('datetime64[s]').astype('datetime64['+unit+']').astype('datetime64[s]').astype(np.int64)
+    else:
+        seconds = {'hour': 3600, 'day': 86400}.get(frequency,frequency)
+        binTime = (time//int(seconds))*int(seconds)
+
+    [binStart,binIndex] = np.unique(binTime,return_inverse=True)
+    return [binStart,binIndex]
+
+
+def aggregateOutput(ncfile,frequency,variables=None,chunkSize=10000):
+    '''
+    Aggregates the output variables over time bins (hourly, daily, monthly, ...).
+
+    The file is read in chunks of time steps, each chunk is reduced with
+    np.add.reduceat over the runs of time steps that belong to the same bin.
+
+    ncfile: output NetCDF file, as returned by readRichardsOutputNetCDF
+    frequency: see timeBins
+    variables: names of the variables to aggregate, by default all the variables in
+        AGGREGATION_REDUCERS
+    chunkSize: number of time steps read at once
+
+    return:
+
+    binStart: time (unix convention) at the beginning of each bin
+
+    aggregated: dictionary with the aggregated values of each variable.
+        State variables are averaged, fluxes [m/s] are integrated over time [m],
+        error and the boundary conditions in mm are summed.
+    '''
+    if variables is None:
+        variables = [v for v in AGGREGATION_REDUCERS if v in ncfile.variables]
+
+    time = np.asarray(ncfile.variables['time'][:],dtype=np.int64)
+    nTime = np.size(time)
+    dt = np.empty(nTime)
+    dt[1:] = np.diff(time)
+    dt[0] = dt[1] if nTime > 1 else 0
+    [binStart,binIndex] = timeBins(time,frequency)
+    counts = np.bincount(binIndex)
+    reducers = {name: _reducer(ncfile.variables[name],name) for name in variables}
+
+    aggregated = {}
+    for name in variables:
+        shape = (np.size(binStart),)+ncfile.variables[name].shape[1:]
+        aggregated[name] = np.zeros(shape)
+
+    for start in range(0,nTime,chunkSize):
+        stop = min(start+chunkSize,nTime)
+        chunkBins = binIndex[start:stop]
+        ## first time step of each run of time steps in the same bin
+        runStarts = np.flatnonzero(np.diff(chunkBins,prepend=-1))
+        runBins = chunkBins[runStarts]
+        for name in variables:
+            values = np.ma.getdata(ncfile.variables[name][start:stop]).astype(float)
+            if reducers[name] == 'total':
+                values = values*dt[start:stop].reshape((-1,)+(1,)*(values.ndim-1))
+            aggregated[name][runBins] += np.add.reduceat(values,runStarts,axis=0)
+
+    for name in variables:
+        if reducers[name] == 'mean':
+            aggregated[name] /= counts.reshape((-1,)+(1,)*(aggregated[name].ndim-1))
+
+    return [binStart,aggregated]
+
+
+def writeAggregatedNetCDF(ncfile,binStart,aggregated,frequency,outputFileName):
+    '''
+    Writes the output of aggregateOutput to a NetCDF file with the same structure
+    of the Richards 1D output file. The time of each record is the beginning of
+    its bin, the reducer is described by the attribute cell_methods.
+    '''
+    outfile = Dataset(outputFileName,'w')
+    for attribute in ncfile.ncattrs():
+        outfile.setncattr(attribute,ncfile.getncattr(attribute))
+    outfile.aggregation = 'output aggregated over time bins: '+str(frequency)
+
+    outfile.createDimension('depth',ncfile.dimensions['depth'].size)
+    outfile.createDimension('dualDepth',ncfile.dimensions['dualDepth'].size)
+    outfile.createDimension('time',np.size(binStart))
+
+    names = ['depth','dual_depth','psiIC']+list(aggregated.keys())
+    for name in names:
+        variable = ncfile.variables[name]
+        newVariable = outfile.createVariable(name,'f8',variable.dimensions)
+        for attribute in variable.ncattrs():
+            newVariable.setncattr(attribute,variable.getncattr(attribute))
+        reducer = _reducer(variable,name)
+        if name in aggregated:
+            newVariable.cell_methods = 'time: '+('sum' if reducer in ['total','sum'] else 'mean')
+            if reducer == 'total':
+                newVariable.units = 'm'
+            newVariable[:] = aggregated[name]
+        else:
+            newVariable[:] = variable[:]
+
+    dataTime = outfile.createVariable('time','i4',('time',))
+    for attribute in ncfile.variables['time'].ncattrs():
+        dataTime.setncattr(attribute,ncfile.variables['time'].getncattr(attribute))
+    dataTime.long_name = 'beginning of the time bin'
+    dataTime[:] = binStart
+
+    outfile.close()
+    print ('*** SUCCESS writing!  '+outputFileName)
+    return
+
+
+def plotInitialCondition(iC,depths,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    '''
+    Plots the initial condition as water suction and hydraulic head.
 
-    plt.figure(figsize=(figureSizeHeigth,figureSizeWidth))
+    return:
+
+    fig: the matplotlib figure
+    '''
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(figureSizeHeigth,figureSizeWidth))
 
     plt.plot(iC,depths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize, color='b')
     plt.plot(iC+depths[:]-depths[0],depths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize, color='g')
@@ -136,346 +270,838 @@ def showInitialCondition(iC,depths,ncfile,labelSize,titleSize,legendSize,axisTic
     plt.xticks(fontsize=axisTicksSize)
     plt.yticks(fontsize=axisTicksSize)
     plt.grid()
+    return fig
+
+
+def showInitialCondition(iC,depths,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    import matplotlib.pyplot as plt
+
+    plotInitialCondition(iC,depths,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc)
     plt.show()
     return
 
 
-def showWaterSuction(timeIndex,date,psi,depths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+## maximum number of profiles listed in the legend, above it a colorbar is drawn
+MAX_LEGEND_ENTRIES = 30
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    #color = ['b','g','r']
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
 
-    for i in range(0,len(timeIndex)):
-        plt.plot(psi[timeIndex[i]],depths[:], linewidth=lineWidth,linestyle=lineStyle, marker=markerType, markersize=markerSize) 
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
-    plt.title('Water suction', fontsize=titleSize)
-    
-    # use variable attributes to label axis
-    plt.xlabel(ncfile.variables['psi'].long_name + '  [' +ncfile.variables['psi'].units +']',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.grid()
-    plt.show()
+## maximum memory [bytes] of the profiles kept by readProfiles and derivedProfiles
+PROFILE_CACHE_BYTES = 256*2**20
+
+## derived quantities: variable of the output file they are computed from, axis label
+DERIVED_QUANTITIES = {'hydraulicHead': ['psi', 'Hydraulic head [m]'],
+                      'saturation': ['water_heigth', 'Saturation $\\theta/\\theta_s$ [$-$]'],
+                      'effectiveWaterContent': ['water_heigth', 'Effective water content $S_e$ [$-$]'],
+                      'cumulativeDarcyFlux': ['darcyVelocities', 'Cumulative Darcy flux [m]']}
+
+## least recently used first
+_profileCache = OrderedDict()
+_profileCacheInfo = {'hits': 0, 'misses': 0, 'bytes': 0}
+
+
+def _fileKey(dataset):
+    ## identifies an output file, the modification time invalidates the profiles of a rewritten file
+    try:
+        fileName = os.path.abspath(dataset.filepath())
+        return (fileName,os.path.getmtime(fileName))
+    except (ValueError,OSError):
+        return ('<memory>',id(dataset))
+
+
+def _cacheGet(key):
+    if key in _profileCache:
+        _profileCache.move_to_end(key)
+        _profileCacheInfo['hits'] += 1
+        return _profileCache[key]
+    _profileCacheInfo['misses'] += 1
+    return None
+
+
+def _cachePut(key,profiles):
+    ## cached profiles are shared between the callers and must not be modified
+    profiles.setflags(write=False)
+    if profiles.nbytes > PROFILE_CACHE_BYTES:
+        return profiles
+    _profileCache[key] = profiles
+    _profileCacheInfo['bytes'] += profiles.nbytes
+    while _profileCacheInfo['bytes'] > PROFILE_CACHE_BYTES:
+        [oldKey,old] = _profileCache.popitem(last=False)
+        _profileCacheInfo['bytes'] -= old.nbytes
+    return profiles
+
+
+def clearProfileCache():
+    '''
+    Empties the cache of readProfiles and derivedProfiles.
+    '''
+    _profileCache.clear()
+    _profileCacheInfo.update({'hits': 0, 'misses': 0, 'bytes': 0})
     return
 
 
-def showHydraulicHead(timeIndex,date,psi,depths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc):
-   
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    #color = ['b','g', 'r']
+def setProfileCacheSize(nBytes):
+    '''
+    Sets the maximum memory [bytes] of the cache, least recently used profiles
+    are evicted. 0 disables the cache.
+    '''
+    global PROFILE_CACHE_BYTES
+    PROFILE_CACHE_BYTES = nBytes
+    while _profileCache and _profileCacheInfo['bytes'] > PROFILE_CACHE_BYTES:
+        [oldKey,old] = _profileCache.popitem(last=False)
+        _profileCacheInfo['bytes'] -= old.nbytes
+    return
+
+
+def profileCacheInfo():
+    '''
+    return:
+
+    info: dictionary with the number of hits and misses, the number of cached
+        entries and their memory [bytes]
+    '''
+    return {'hits': _profileCacheInfo['hits'], 'misses': _profileCacheInfo['misses'],
+            'entries': len(_profileCache), 'bytes': _profileCacheInfo['bytes']}
+
+
+def readProfiles(variable,timeIndex,cache=True):
+    '''
+    Reads the profiles of variable at all the requested time indices with a
+    single read from the NetCDF file.
+
+    The profiles are kept in a cache shared by all the plotting functions, so
+    that figures of the same time steps read the file once. Cached profiles
+    are read-only.
+
+    cache: if False the cache is neither used nor filled, e.g. for reads in chunks
+
+    return:
+
+    profiles: matrix (len(timeIndex), points), in the same order of timeIndex
+    '''
+    timeIndex = np.asarray(timeIndex,dtype=int).ravel()
+    if cache:
+        key = (_fileKey(variable.group()),variable.name,timeIndex.tobytes())
+        profiles = _cacheGet(key)
+        if profiles is not None:
+            return profiles
+    [uniqueIndex,inverse] = np.unique(timeIndex,return_inverse=True)
+    startPhase('reading')
+    try:
+        profiles = np.ma.getdata(variable[uniqueIndex.tolist(),:])
+    finally:
+        stopPhase()
+    profiles = np.asarray(profiles,dtype=float)[inverse]
+    if cache:
+        return _cachePut(key,profiles)
+    return profiles
+
+
+def _cumulativeFlux(variable,time,timeIndex,chunkSize=10000):
+    ## fluxes cumulated over the time steps up to each time index, read in chunks up to the last one
+    from Richards1DWaterBalance import timeChunks, timeStepLengths
+
+    dt = timeStepLengths(np.ma.getdata(time[:]))
+    [uniqueIndex,inverse] = np.unique(timeIndex,return_inverse=True)
+    cumulated = np.empty((np.size(uniqueIndex),variable.shape[1]))
+    total = np.zeros(variable.shape[1])
+    for start,stop in timeChunks(int(uniqueIndex[-1])+1,chunkSize):
+        fluxes = np.asarray(np.ma.getdata(variable[start:stop,:]),dtype=float)*dt[start:stop,np.newaxis]
+        partial = total+np.cumsum(fluxes,axis=0)
+        inChunk = (uniqueIndex >= start) & (uniqueIndex < stop)
+        cumulated[inChunk] = partial[uniqueIndex[inChunk]-start]
+        total = partial[-1]
+    return cumulated[inverse]
+
+
+def derivedProfiles(ncfile,quantity,timeIndex,grid=None):
+    '''
+    Computes the profiles of a quantity derived from the output variables at
+    the requested time indices. Profiles are computed once and cached with the
+    profiles read by readProfiles.
+
+    quantity: one of DERIVED_QUANTITIES
+        hydraulicHead: psi + depth - depth[0] [m]
+        saturation: theta/thetaS [-]
+        effectiveWaterContent: (theta-thetaR)/(thetaS-thetaR) [-]
+        cumulativeDarcyFlux: Darcy flux cumulated from the first time step [m]
+    grid: grid as read by readRichardsGridNetCDF, needed by saturation and
+        effectiveWaterContent. Points that are not control volumes are NaN.
+
+    return:
+
+    profiles: matrix (len(timeIndex), points), in the same order of timeIndex
+    '''
+    if quantity not in DERIVED_QUANTITIES:
+        raise ValueError('Derived quantity not available: '+str(quantity)+'. Available quantities: '+', '.join(DERIVED_QUANTITIES))
+    timeIndex = np.asarray(timeIndex,dtype=int).ravel()
+    variable = ncfile.variables[DERIVED_QUANTITIES[quantity][0]]
+
+    gridKey = None
+    if quantity in ['saturation','effectiveWaterContent']:
+        if grid is None:
+            raise ValueError('The grid is needed to compute '+quantity)
+        gridKey = (grid['thetaS'].tobytes(),grid['thetaR'].tobytes())
+    key = (_fileKey(ncfile),quantity,timeIndex.tobytes(),gridKey)
+    profiles = _cacheGet(key)
+    if profiles is not None:
+        return profiles
+
+    if quantity == 'hydraulicHead':
+        depths = np.asarray(np.ma.getdata(ncfile.variables['depth'][:]),dtype=float)
+        profiles = _hydraulicHead(readProfiles(variable,timeIndex),depths)
+    elif quantity == 'cumulativeDarcyFlux':
+        profiles = _cumulativeFlux(variable,ncfile.variables['time'],timeIndex)
+    else:
+        theta = readProfiles(variable,timeIndex)
+        nCV = np.size(grid['thetaS'])
+        profiles = np.full(theta.shape,np.nan)
+        if quantity == 'saturation':
+            profiles[:,0:nCV] = theta[:,0:nCV]/grid['thetaS']
+        else:
+            profiles[:,0:nCV] = (theta[:,0:nCV]-grid['thetaR'])/(grid['thetaS']-grid['thetaR'])
+    return _cachePut(key,profiles)
+
+
+def drawProfiles(ax,profiles,coordinates,date,legendSize,lineWidth,lineStyle,markerSize,markerType,legendLoc):
+    '''
+    Draws the profiles (one for each row of profiles) as a single LineCollection,
+    colored with the nipy_spectral colormap as the other plots of this module.
+    Markers, if any, are drawn with a single scatter.
+    '''
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    nProfiles = profiles.shape[0]
+    coordinates = np.asarray(coordinates,dtype=float)
     colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
+    colors = colormap(np.linspace(0, 0.9, nProfiles))
 
-    for i in range(0,len(timeIndex)):
-        plt.plot(np.round(psi[timeIndex[i]]+depths[:]-depths[0],4),depths[:], linewidth=lineWidth,linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
-    plt.title('Hydraulic head', fontsize=titleSize)
+    segments = np.stack([profiles,np.broadcast_to(coordinates,profiles.shape)],axis=-1)
+    ax.add_collection(LineCollection(segments,colors=colors,linewidths=lineWidth,linestyles=lineStyle))
+    if markerType not in [None,'','None',' ']:
+        ax.scatter(profiles.ravel(),np.tile(coordinates,nProfiles),c=np.repeat(colors,profiles.shape[1],axis=0),
+                   s=markerSize**2,marker=markerType)
+    ax.autoscale_view()
+
+    if date is None or len(date) == 0:
+        return
+    if len(date) <= MAX_LEGEND_ENTRIES:
+        handles = [Line2D([],[],color=c,linewidth=lineWidth,linestyle=lineStyle,marker=markerType,markersize=markerSize)
+                   for c in colors]
+        ax.legend(handles,date,ncol=1, loc=legendLoc,
+               columnspacing=1.0, labelspacing=0.0,
+               handletextpad=0.0, handlelength=1.5,
+               fancybox=True, shadow=True, fontsize=legendSize)
+    else:
+        from matplotlib.colors import ListedColormap
+        scalarMappable = plt.cm.ScalarMappable(cmap=ListedColormap(colors),norm=plt.Normalize(-0.5,nProfiles-0.5))
+        colorbar = plt.colorbar(scalarMappable,ax=ax)
+        ticks = np.unique(np.linspace(0,nProfiles-1,5).astype(int))
+        colorbar.set_ticks(ticks)
+        colorbar.set_ticklabels([date[i] for i in ticks])
+        colorbar.ax.tick_params(labelsize=legendSize)
+
+
+def plotProfiles(timeIndex,date,variable,ncfile,title,xLabel,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat=None,transform=None,grid=None):
+    '''
+    Plots the profiles of an output variable at the requested time indices.
+
+    variable: name of the variable or the NetCDF variable itself. It is plotted
+        against depth or dual_depth according to its dimensions. It can also be
+        the name of one of DERIVED_QUANTITIES, see derivedProfiles.
+    title: title of the plot
+    xLabel: label of the x axis, if None it is the long_name and units of the variable
+    xFormat: format string of the x axis ticks, e.g. '%.1e'
+    transform: function f(profiles, coordinates) applied to the profiles before plotting
+    grid: grid as read by readRichardsGridNetCDF, for the derived quantities that need it
+
+    return:
+
+    fig: the matplotlib figure
+    '''
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mtick
+
+    quantity = None
+    if isinstance(variable,str) and variable in DERIVED_QUANTITIES:
+        quantity = variable
+        variable = DERIVED_QUANTITIES[quantity][0]
+        if xLabel is None:
+            xLabel = DERIVED_QUANTITIES[quantity][1]
+    if isinstance(variable,str):
+        variable = ncfile.variables[variable]
+    if 'dualDepth' in variable.dimensions:
+        coordinates = ncfile.variables['dual_depth'][:]
+    else:
+        coordinates = ncfile.variables['depth'][:]
+    coordinates = np.asarray(np.ma.getdata(coordinates),dtype=float)
+
+    if quantity is None:
+        profiles = readProfiles(variable,timeIndex)
+    else:
+        profiles = derivedProfiles(ncfile,quantity,timeIndex,grid)
+    if transform is not None:
+        profiles = transform(profiles,coordinates)
+    if xLabel is None:
+        xLabel = variable.long_name + '  [' +variable.units +']'
+
+    fig, ax = plt.subplots(figsize=(figureSizeWidth,figureSizeHeigth))
+    drawProfiles(ax,profiles,coordinates,date,legendSize,lineWidth,lineStyle,markerSize,markerType,legendLoc)
+    ax.set_title(title, fontsize=titleSize)
     
     # use variable attributes to label axis
-    plt.xlabel('Hydraulic head [m]',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.gca().xaxis.set_major_formatter(mtick.FormatStrFormatter('%.3f'))
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.grid()
+    ax.set_xlabel(xLabel,fontsize=labelSize)
+    ax.set_ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
+    if xFormat is not None:
+        ax.xaxis.set_major_formatter(mtick.FormatStrFormatter(xFormat))
+    ax.tick_params(axis='both', which='major', labelsize=axisTicksSize)
+    ax.grid()
+    return fig
+
+
+def showProfiles(timeIndex,date,variable,ncfile,title,xLabel,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat=None,transform=None,grid=None):
+    '''
+    Shows the profiles of an output variable at the requested time indices, see plotProfiles.
+    '''
+    import matplotlib.pyplot as plt
+
+    plotProfiles(timeIndex,date,variable,ncfile,title,xLabel,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat,transform,grid)
     plt.show()
     return
 
-def showWaterContent(timeIndex,date,theta,depths,data,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
 
-    fig, ax=plt.subplots(figsize=(figureSizeWidth,figureSizeHeigth))
-    figsize=(20,20)
-    #color = ['b','g','r']
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
+def _hydraulicHead(psi,depths):
+    return np.round(psi+depths-depths[0],4)
 
-    for i in range(0,len(timeIndex)):
-        ax.plot(theta[timeIndex[i],0:depths[:].shape[0]-2],depths[0:depths[:].shape[0]-2], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
 
-    #for n in range(0,len(timeIndex)):  
-    #    waterLevel=theta[timeIndex[n],depths[:].shape[0]-1]
-    #    ax.axhline(y=waterLevel, linewidth=lineWidth)
-    
+def showWaterSuction(timeIndex,date,psi,depths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    showProfiles(timeIndex,date,psi,ncfile,'Water suction',None,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc)
+    return
 
-    # convert time value in a human readable date to title the plot
-    plt.title('Water content',fontsize=titleSize)
-    # use variable attributes to label axis
-    plt.xlabel('$\\theta$ [$-$]',fontsize=labelSize )
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.tick_params(axis='both', which='major', labelsize=axisTicksSize)
-    
-    #plt.ylim(depths[0]-0.1,waterLevel+0.1)
-    #trans = transforms.blended_transform_factory(
-    #   ax.get_yticklabels()[0].get_transform(), ax.transData)
-    #ax.text(-0.08,waterLevel, "{:.2f}".format(waterLevel), color="deepskyblue", transform=trans, 
-    #   ha="right", va="center",fontsize=axisTicksSize)
-    for n in range(0,len(timeIndex)):
-        for i in range(1,np.size(data.index)-1):
-            if data['Type'][i] == 'L':
-                c = 'black'
-                l = 'layer'
-                plt.plot([np.min(theta[timeIndex[n],0:np.size(theta[timeIndex[n],])-1])-0.001,np.max(theta[timeIndex[n],])+0.001], [data['eta'][i],data['eta'][i]], color=c,linewidth=lineWidth-2)
-         
-    plt.grid()
-    plt.show()
+
+def showHydraulicHead(timeIndex,date,psi,depths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc):
+    showProfiles(timeIndex,date,'hydraulicHead',ncfile,'Hydraulic head','Hydraulic head [m]',labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,
+                 xFormat='%.3f')
     return
 
+def layerBoundaries(data):
+    '''
+    Returns the coordinates of the boundaries between the soil layers: the rows of
+    Type 'L' of the RichardsMeshGen input .csv file, except the soil surface and the bottom.
+    '''
+    inner = data.iloc[1:np.size(data.index)-1]
+    return np.asarray(inner['eta'][inner['Type'] == 'L'],dtype=float)
 
-def showDarcyVelocities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
-    for i in range(0,len(timeIndex)):
-        plt.plot(velocities[timeIndex[i]],dualDepths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
+def plotWaterContent(timeIndex,date,theta,depths,data,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc):
+    '''
+    Plots the water content profiles at the requested time indices and the
+    boundaries of the soil layers defined in data.
 
-    plt.title('Darcy flux',fontsize=titleSize)
-    # use variable attributes to label axis
-    plt.xlabel(ncfile.variables['darcyVelocities'].long_name + '  [' +ncfile.variables['darcyVelocities'].units +']',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.gca().xaxis.set_major_formatter(mtick.FormatStrFormatter('%.1e'))
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.legend(date, loc=3)
-    plt.grid()
-    plt.show()
-    return
+    return:
 
-def showCapillaryVelocities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    fig: the matplotlib figure
+    '''
+    import matplotlib.pyplot as plt
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
-    for i in range(0,len(timeIndex)):
-        plt.plot(velocities[timeIndex[i]],dualDepths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
+    if isinstance(theta,str):
+        theta = ncfile.variables[theta]
+    nPoints = depths[:].shape[0]-2
+    coordinates = np.asarray(np.ma.getdata(depths[0:nPoints]),dtype=float)
+    profiles = readProfiles(theta,timeIndex)
+
+    fig, ax = plt.subplots(figsize=(figureSizeWidth,figureSizeHeigth))
+    drawProfiles(ax,profiles[:,0:nPoints],coordinates,date,legendSize,lineWidth,lineStyle,markerSize,markerType,legendLoc)
+
+    ## layer boundaries: the extent of theta is computed once over all the profiles
+    boundaries = layerBoundaries(data)
+    if np.size(boundaries) > 0:
+        ax.hlines(boundaries,np.min(profiles[:,0:-1])-0.001,np.max(profiles)+0.001,color='black',linewidth=max(lineWidth-2,0.5))
 
-    plt.title('Fluxes due to capillary gradient',fontsize=titleSize)
+    ax.set_title('Water content',fontsize=titleSize)
     # use variable attributes to label axis
-    plt.xlabel(ncfile.variables['darcyVelocitiesCapillary'].long_name + '  [' +ncfile.variables['darcyVelocitiesCapillary'].units +']',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.gca().xaxis.set_major_formatter(mtick.FormatStrFormatter('%.1e'))
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.legend(date, loc=3)
-    plt.grid()
+    ax.set_xlabel('$\\theta$ [$-$]',fontsize=labelSize )
+    ax.set_ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
+    ax.tick_params(axis='both', which='major', labelsize=axisTicksSize)
+    ax.grid()
+    return fig
+
+
+def showWaterContent(timeIndex,date,theta,depths,data,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    import matplotlib.pyplot as plt
+
+    plotWaterContent(timeIndex,date,theta,depths,data,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc)
     plt.show()
     return
 
-def showGravityVelocities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
-    for i in range(0,len(timeIndex)):
-        plt.plot(velocities[timeIndex[i]],dualDepths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
+def showDarcyVelocities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    showProfiles(timeIndex,date,velocities,ncfile,'Darcy flux',None,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat='%.1e')
+    return
 
-    plt.title('Fluxes due to gravity gradient',fontsize=titleSize)
-    # use variable attributes to label axis
-    plt.xlabel(ncfile.variables['darcyVelocitiesGravity'].long_name + '  [' +ncfile.variables['darcyVelocitiesGravity'].units +']',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.gca().xaxis.set_major_formatter(mtick.FormatStrFormatter('%.1e'))
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.legend(date, loc=3)
-    plt.grid()
-    plt.show()
+def showCapillaryVelocities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    showProfiles(timeIndex,date,velocities,ncfile,'Fluxes due to capillary gradient',None,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat='%.1e')
+    return
+
+def showGravityVelocities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    showProfiles(timeIndex,date,velocities,ncfile,'Fluxes due to gravity gradient',None,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat='%.1e')
     return
 
 def showPoreVelocities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    showProfiles(timeIndex,date,velocities,ncfile,'Pore velocities',None,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat='%.1e')
+    return
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
-    for i in range(0,len(timeIndex)):
-        plt.plot(velocities[timeIndex[i]],dualDepths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
+def showCelerities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    showProfiles(timeIndex,date,velocities,ncfile,'Celerity',None,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat='%.1e')
+    return
 
-    plt.title('Fluxes due to gravity gradient',fontsize=titleSize)
-    # use variable attributes to label axis
-    plt.xlabel(ncfile.variables['poreVelocities'].long_name + '  [' +ncfile.variables['poreVelocities'].units +']',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.gca().xaxis.set_major_formatter(mtick.FormatStrFormatter('%.1e'))
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.legend(date, loc=3)
-    plt.grid()
-    plt.show()
+def showKinematicRatio(timeIndex,date,kinematicRatio, dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+    showProfiles(timeIndex,date,kinematicRatio,ncfile,'Kinematic ratio',None,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,legendLoc,xFormat='%.1e')
     return
 
-def showCelerities(timeIndex,date,velocities,dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
+def decimateMinMax(variable,nBins,start=0,stop=None,column=None,transform=None,chunkSize=100000):
+    '''
+    Downsamples a time series with the min/max method: the time steps from start
+    to stop are divided in nBins bins (one for each pixel of the plot) and only
+    the minimum and the maximum of each bin are kept. The drawn line is then
+    indistinguishable from the full one at that resolution.
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
-    for i in range(0,len(timeIndex)):
-        plt.plot(velocities[timeIndex[i]],dualDepths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
+    The variable is read in chunks of time steps, so that the whole series is
+    never loaded in memory.
 
-    plt.title('Celerity',fontsize=titleSize)
-    # use variable attributes to label axis
-    plt.xlabel(ncfile.variables['celerities'].long_name + '  [' +ncfile.variables['celerities'].units +']',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.gca().xaxis.set_major_formatter(mtick.FormatStrFormatter('%.1e'))
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.legend(date, loc=3)
-    plt.grid()
+    variable: NetCDF variable with time as first dimension
+    column: index along the second dimension for 2D variables, e.g. 0 for the
+        bottom control volume of psi
+    transform: function applied to the values before decimation, e.g. np.abs
+
+    return:
+
+    index: time indices of the selected values, in increasing order
+
+    values: selected values
+    '''
+    if stop is None:
+        stop = variable.shape[0]
+    nSteps = stop-start
+    if nSteps <= 2*nBins:
+        values = variable[start:stop] if column is None else variable[start:stop,column]
+        values = np.asarray(np.ma.getdata(values),dtype=float)
+        if transform is not None:
+            values = transform(values)
+        return [np.arange(start,stop),values]
+
+    minValue = np.full(nBins,np.inf)
+    maxValue = np.full(nBins,-np.inf)
+    ## first time step of each bin, kept by the bins whose values are all NaN
+    minIndex = start+(np.arange(nBins,dtype=np.int64)*nSteps+nBins-1)//nBins
+    maxIndex = minIndex.copy()
+    for chunkStart in range(start,stop,chunkSize):
+        chunkStop = min(chunkStart+chunkSize,stop)
+        values = variable[chunkStart:chunkStop] if column is None else variable[chunkStart:chunkStop,column]
+        values = np.asarray(np.ma.getdata(values),dtype=float)
+        if transform is not None:
+            values = transform(values)
+        index = np.arange(chunkStart,chunkStop)
+        bins = (index-start)*nBins//nSteps
+        ## first element of each run of time steps in the same bin
+        runStarts = np.flatnonzero(np.diff(bins,prepend=-1))
+        runBins = bins[runStarts]
+        runLength = np.diff(np.append(runStarts,np.size(bins)))
+        for reduce,best,bestIndex in [(np.fmin,minValue,minIndex),(np.fmax,maxValue,maxIndex)]:
+            chunkBest = reduce.reduceat(values,runStarts)
+            ## first time step of each run where the extreme value is reached
+            hits = np.flatnonzero(values == np.repeat(chunkBest,runLength))
+            [hitRuns,first] = np.unique(np.searchsorted(runStarts,hits,side='right')-1,return_index=True)
+            position = runStarts.copy()
+            position[hitRuns] = hits[first]
+            if reduce is np.fmin:
+                better = chunkBest < best[runBins]
+            else:
+                better = chunkBest > best[runBins]
+            best[runBins[better]] = chunkBest[better]
+            bestIndex[runBins[better]] = index[position[better]]
+
+    index = np.unique(np.concatenate([minIndex,maxIndex]))
+    values = variable[index.tolist()] if column is None else variable[index.tolist(),column]
+    values = np.asarray(np.ma.getdata(values),dtype=float)
+    if transform is not None:
+        values = transform(values)
+    return [index,values]
+
+
+def _axisWidth(ax):
+    ## width of the axes in pixels
+    return max(int(ax.get_window_extent().width),100)
+
+
+def plotTimeSeries(ax,variable,time,column=None,transform=None,useDates=True,chunkSize=100000,**kwargs):
+    '''
+    Plots a time series of a NetCDF variable downsampled to the width of the
+    axes, see decimateMinMax. When the x limits change (zoom and pan in an
+    interactive backend) the visible part of the series is read again at the
+    resolution of the new view.
+
+    time: NetCDF variable time (unix convention)
+    useDates: if True the x axis shows dates, otherwise the unix time
+    kwargs: passed to ax.plot
+
+    return:
+
+    line: the matplotlib Line2D
+    '''
+    import matplotlib.dates as mdates
+
+    unixTime = np.asarray(np.ma.getdata(time[:]),dtype=np.int64)
+    if useDates:
+        x = mdates.date2num(unixTime.astype('datetime64[s]'))
+    else:
+        x = unixTime.astype(float)
+
+    [index,values] = decimateMinMax(variable,_axisWidth(ax),0,np.size(x),column,transform,chunkSize)
+    [line] = ax.plot(x[index],values,**kwargs)
+    if useDates:
+        ax.xaxis_date()
+
+    def update(axes):
+        [x0,x1] = axes.get_xlim()
+        start = max(int(np.searchsorted(x,x0,side='left'))-1,0)
+        stop = min(int(np.searchsorted(x,x1,side='right'))+1,np.size(x))
+        if stop-start < 2:
+            return
+        [index,values] = decimateMinMax(variable,_axisWidth(axes),start,stop,column,transform,chunkSize)
+        line.set_data(x[index],values)
+        axes.figure.canvas.draw_idle()
+
+    ax.callbacks.connect('xlim_changed',update)
+    return line
+
+
+def showTimeSeries(variable,time,ncfile,column=None,title=None,labelSize=16,titleSize=18,axisTicksSize=14,lineWidth=0.8,figureSizeHeigth=6,figureSizeWidth=14,transform=None,logScale=False):
+    '''
+    Shows the time series of an output variable, e.g. topBC or psi at the
+    bottom control volume (column=0), downsampled to the width of the figure.
+    '''
+    import matplotlib.pyplot as plt
+
+    if isinstance(variable,str):
+        variable = ncfile.variables[variable]
+    fig, ax = plt.subplots(figsize=(figureSizeWidth,figureSizeHeigth))
+    plotTimeSeries(ax,variable,time,column,transform,True,linewidth=lineWidth)
+    if logScale:
+        ax.set_yscale('log')
+    ax.set_title(variable.long_name if title is None else title,fontsize=titleSize)
+    ax.set_ylabel(variable.long_name + '  [' +variable.units +']',fontsize=labelSize )
+    ax.tick_params(axis='both', which='major', labelsize=axisTicksSize)
+    ax.grid()
     plt.show()
     return
 
-def showKinematicRatio(timeIndex,date,kinematicRatio, dualDepths,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth, legendLoc):
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
-    colormap = plt.cm.nipy_spectral
-    plt.gca().set_prop_cycle("color",[colormap(i) for i in np.linspace(0, 0.9, len(timeIndex))])
-    for i in range(0,len(timeIndex)):
-        plt.plot(kinematicRatio[timeIndex[i]],dualDepths[:], linewidth=lineWidth, linestyle=lineStyle, marker=markerType, markersize=markerSize)
-    plt.legend(date,ncol=1, loc=legendLoc, 
-           columnspacing=1.0, labelspacing=0.0,
-           handletextpad=0.0, handlelength=1.5,
-           fancybox=True, shadow=True)
-    plt.setp(plt.gca().get_legend().get_texts(), fontsize=legendSize)
+def plotError(error,time,ncfile,labelSize,titleSize,axisTicksSize,lineWidth,figureSizeHeigth,figureSizeWidth):
+    '''
+    Plots the absolute value of the volume error of the solver over time.
+
+    return:
+
+    fig: the matplotlib figure
+    '''
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(figureSizeWidth,figureSizeHeigth))
 
-    plt.title('Kinematic ratio',fontsize=titleSize)
+    ## the absolute value of the error is downsampled to the width of the figure
+    plotTimeSeries(ax,error,time,transform=np.abs,useDates=False,color='b',linewidth=lineWidth)
+    ax.set_yscale('log')
+    ax.set_title('Error over time',fontsize = titleSize)
     # use variable attributes to label axis
-    plt.xlabel(ncfile.variables['kinematicRatio'].long_name + '  [' +ncfile.variables['kinematicRatio'].units +']',fontsize=labelSize)
-    plt.ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
-    plt.gca().xaxis.set_major_formatter(mtick.FormatStrFormatter('%.1e'))
-    plt.xticks(fontsize=axisTicksSize)
-    plt.yticks(fontsize=axisTicksSize)
-    plt.legend(date, loc=3)
-    plt.grid()
-    plt.show()
-    return
+    ax.set_ylabel(ncfile.variables['error'].long_name + '  [' +ncfile.variables['error'].units +']',fontsize = labelSize )
+    ax.tick_params(axis='both', which='major', labelsize=axisTicksSize)
+    ax.grid()
+    return fig
+
 
 def showError(error,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,figureSizeHeigth1,figureSizeWidth1):
+    import matplotlib.pyplot as plt
 
-    plt.figure(figsize=(figureSizeWidth,figureSizeHeigth))
+    plotError(error,time,ncfile,labelSize,titleSize,axisTicksSize,lineWidth,figureSizeHeigth,figureSizeWidth)
+    plt.show()
+    return
 
-    plt.plot(time[:],abs(error[:]),'b',linewidth=lineWidth,)
-    plt.semilogy()
-    # convert time value in a human readable date to title the plot
-    plt.title('Error over time',fontsize = titleSize)
-    # use variable attributes to label axis
-    #plt.xlabel(ncfile.variables['error'].long_name + '  [' +ncfile.variables['error'].units +']' )
-    plt.ylabel(ncfile.variables['error'].long_name + '  [' +ncfile.variables['error'].units +']',fontsize = labelSize )
-    plt.tick_params(axis='both', which='major', labelsize=axisTicksSize)
     
-    plt.grid()
+## number of values read at once by binTimeDepth
+BIN_CHUNK_VALUES = 2000000
+
+
+def binTimeDepth(ncfile,variable,nTimeBins,nDepthBins,statistic='mean',chunkSize=None):
+    '''
+    Aggregates a (time, depth) variable on a regular grid of time and depth bins,
+    e.g. one bin for each pixel of an image. The file is read in chunks of time
+    steps: in each chunk the values are reduced over the runs of time steps
+    that fall in the same time bin and then over the control volumes that fall
+    in the same depth bin, so that the whole variable is never loaded in memory.
+
+    variable: name of a variable with dimensions (time, depth) or (time, dualDepth);
+        for depth only the control volumes are used, not the soil surface
+    statistic: 'mean' or 'max'
+    chunkSize: number of time steps read at once, by default about BIN_CHUNK_VALUES values
+
+    return:
+
+    timeEdges: edges of the time bins (unix convention)
+
+    depthEdges: edges of the depth bins [m]
+
+    binned: matrix (depth bin, time bin), nan where a bin contains no values
+    '''
+    if statistic not in ['mean','max']:
+        raise ValueError('statistic must be mean or max, not '+str(statistic))
+    var = ncfile.variables[variable]
+    nCV = ncfile.dimensions['dualDepth'].size-1
+    if 'dualDepth' in var.dimensions:
+        coordinates = np.asarray(np.ma.getdata(ncfile.variables['dual_depth'][:]),dtype=float)
+    else:
+        coordinates = np.asarray(np.ma.getdata(ncfile.variables['depth'][0:nCV]),dtype=float)
+    nPoints = np.size(coordinates)
+    time = np.asarray(np.ma.getdata(ncfile.variables['time'][:]),dtype=float)
+    nTime = np.size(time)
+    if chunkSize is None:
+        chunkSize = max(BIN_CHUNK_VALUES//nPoints,1)
+
+    timeEdges = np.linspace(time[0],time[-1],nTimeBins+1)
+    depthEdges = np.linspace(coordinates.min(),coordinates.max(),nDepthBins+1)
+    timeBin = np.clip(np.searchsorted(timeEdges,time,side='right')-1,0,nTimeBins-1)
+    depthBin = np.clip(np.searchsorted(depthEdges,coordinates,side='right')-1,0,nDepthBins-1)
+    ## control volumes are sorted by coordinate, so each depth bin is a run of control volumes
+    order = np.argsort(coordinates,kind='stable')
+    depthBin = depthBin[order]
+    depthStarts = np.flatnonzero(np.diff(depthBin,prepend=-1))
+    depthBins = depthBin[depthStarts]
+    pointsPerBin = np.bincount(depthBin,minlength=nDepthBins)
+
+    total = np.zeros((nTimeBins,nDepthBins))
+    count = np.zeros((nTimeBins,nDepthBins))
+    maximum = np.full((nTimeBins,nDepthBins),-np.inf)
+    for start in range(0,nTime,chunkSize):
+        stop = min(start+chunkSize,nTime)
+        values = np.asarray(np.ma.getdata(var[start:stop,0:nPoints]),dtype=float)[:,order]
+        chunkBins = timeBin[start:stop]
+        runStarts = np.flatnonzero(np.diff(chunkBins,prepend=-1))
+        runBins = chunkBins[runStarts]
+        ## time bins are different in each run of the chunk, so the updates do not overlap
+        if statistic == 'mean':
+            reduced = np.add.reduceat(np.add.reduceat(values,runStarts,axis=0),depthStarts,axis=1)
+            total[np.ix_(runBins,depthBins)] += reduced
+            stepsPerRun = np.diff(np.append(runStarts,stop-start))
+            count[np.ix_(runBins,depthBins)] += np.outer(stepsPerRun,pointsPerBin[depthBins])
+        else:
+            reduced = np.maximum.reduceat(np.maximum.reduceat(values,runStarts,axis=0),depthStarts,axis=1)
+            maximum[np.ix_(runBins,depthBins)] = np.fmax(maximum[np.ix_(runBins,depthBins)],reduced)
+
+    if statistic == 'mean':
+        binned = np.full((nTimeBins,nDepthBins),np.nan)
+        np.divide(total,count,out=binned,where=count > 0)
+    else:
+        binned = np.where(np.isneginf(maximum),np.nan,maximum)
+
+    return [timeEdges,depthEdges,binned.T]
+
+
+def plotHovmoller(ncfile,variable,statistic='mean',nTimeBins=None,nDepthBins=None,labelSize=16,titleSize=18,axisTicksSize=14,
+                  figureSizeHeigth=8,figureSizeWidth=16,cmap='viridis',chunkSize=None):
+    '''
+    Plots the time-depth (Hovmoller) diagram of a variable as a single image,
+    see binTimeDepth.
+
+    return:
+
+    fig: the matplotlib figure
+    '''
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
+    fig, ax = plt.subplots(figsize=(figureSizeWidth,figureSizeHeigth))
+    extent = ax.get_window_extent()
+    ## by default one bin for each pixel, but not more bins than time steps and control volumes
+    if nTimeBins is None:
+        nTimeBins = min(max(int(extent.width),10),ncfile.dimensions['time'].size)
+    if nDepthBins is None:
+        nDepthBins = min(max(int(extent.height),10),ncfile.dimensions['dualDepth'].size-1)
+
+    [timeEdges,depthEdges,binned] = binTimeDepth(ncfile,variable,nTimeBins,nDepthBins,statistic,chunkSize)
+    dateEdges = mdates.date2num(timeEdges.astype(np.int64).astype('datetime64[s]'))
+    image = ax.imshow(binned,origin='lower',aspect='auto',interpolation='nearest',cmap=cmap,
+                      extent=[dateEdges[0],dateEdges[-1],depthEdges[0],depthEdges[-1]])
+    ax.xaxis_date()
+
+    var = ncfile.variables[variable]
+    colorbar = fig.colorbar(image,ax=ax)
+    colorbar.set_label(var.long_name + '  [' +var.units +']',fontsize=labelSize)
+    colorbar.ax.tick_params(labelsize=axisTicksSize)
+    ax.set_title(var.long_name+' ('+statistic+')',fontsize=titleSize)
+    ax.set_ylabel(ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']',fontsize=labelSize )
+    ax.tick_params(axis='both', which='major', labelsize=axisTicksSize)
+    return fig
+
+
+def showHovmoller(ncfile,variable,statistic='mean',nTimeBins=None,nDepthBins=None,labelSize=16,titleSize=18,axisTicksSize=14,
+                  figureSizeHeigth=8,figureSizeWidth=16,cmap='viridis'):
+    '''
+    Shows the time-depth (Hovmoller) diagram of a variable, see plotHovmoller.
+    '''
+    import matplotlib.pyplot as plt
+
+    plotHovmoller(ncfile,variable,statistic,nTimeBins,nDepthBins,labelSize,titleSize,axisTicksSize,figureSizeHeigth,figureSizeWidth,cmap)
     plt.show()
     return
 
-    
-def show(timeIndex,psi,theta,velocities,depths,dualDepths,data,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,figureSizeHeigth1,figureSizeWidth1):
 
-    ## https://bokeh.pydata.org/en/latest/docs/user_guide/tools.html#built-in-tools
-    date = datetime.datetime.fromtimestamp(time[timeIndex])
-    hover = HoverTool(tooltips=[
-            ("(x,y)", "($x, $y)"),
-            ])
+## maximum number of time steps and of values of each variable embedded in the time slider of show
+MAX_SLIDER_STEPS = 2000
+MAX_SLIDER_VALUES = 1000000
 
-    p1 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots")
-    
-    p1.scatter(psi[timeIndex,:], depths[:], color="blue")
-    p1.xaxis.axis_label = ncfile.variables['psi'].long_name + '  [' +ncfile.variables['psi'].units +']'
-    p1.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p1.yaxis.axis_label = ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']'
-    p1.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p1.title.text = 'Date: '+date.strftime('%Y-%m-%d %H:%M')
-    p1.title.align = "center"
-    p1.title.text_font_size = str(titleSize) + "px"
-    tab1 = Panel(child=p1, title="Water suction")
-    
-    p2 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots")
-    
-    p2.scatter(psi[timeIndex,:]+depths[:]-depths[0], depths[:], color="blue")
-    p2.xaxis.axis_label = 'Hydraulic head [m]'
-    p2.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p2.yaxis.axis_label = ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']'
-    p2.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p2.title.text = 'Date: '+date.strftime('%Y-%m-%d %H:%M')
-    p2.title.align = "center"
-    p2.title.text_font_size = str(titleSize) + "px"
-    tab2 = Panel(child=p2, title="Hydraulic head")
-    
-    p3 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots")
-    p3.scatter(theta[timeIndex,0:depths[:].shape[0]-2],depths[0:depths[:].shape[0]-2], color="red",legend='\u03B8 ')
-    p3.line([theta[timeIndex,0:depths[:].shape[0]-2].min(),theta[timeIndex,0:depths[:].shape[0]-2].max()], [theta[timeIndex,depths[:].shape[0]-1],theta[timeIndex,depths[:].shape[0]-1]], color="deepskyblue",line_width=lineWidth, legend='Total water level')
-    for i in range(1,np.size(data.index)-1):
-        if data['Type'][i] == 'L':
-            c = 'black'
-            l = 'layer'
-            p3.line([np.min(theta[timeIndex,0:np.size(theta[timeIndex,])-1])-0.001,np.max(theta[timeIndex,])+0.001], [data['eta'][i],data['eta'][i]], color=c,line_width=lineWidth-2,legend='Layer')
 
+def sliderTimeIndices(nTime,timeIndex=0,nPoints=1,maxSteps=MAX_SLIDER_STEPS,maxValues=MAX_SLIDER_VALUES):
+    '''
+    Returns the time indices browsed by the time slider of show: all the time
+    steps if they are at most maxSteps and their profiles (nPoints values each)
+    have at most maxValues values, otherwise evenly spaced ones. timeIndex
+    is always included.
+    '''
+    maxSteps = max(min(maxSteps,maxValues//max(nPoints,1)),1)
+    stride = max(int(np.ceil(nTime/maxSteps)),1)
+    return np.union1d(np.arange(0,nTime,stride),[int(timeIndex)])
+
+
+_SLIDER_CODE = """
+const i = cb_obj.value;
+const d = source.data;
+const n = d['depth'].length;
+const psi = slices.data['psi'];
+const theta = slices.data['theta'];
+let thetaMin = Infinity;
+let thetaMax = -Infinity;
+for (let k = 0; k < n; k++) {
+    d['psi'][k] = psi[i*n+k];
+    d['head'][k] = psi[i*n+k]+d['depth'][k]-d['depth'][0];
+    if (k < n-2) {
+        d['theta'][k] = theta[i*n+k];
+        thetaMin = Math.min(thetaMin, theta[i*n+k]);
+        thetaMax = Math.max(thetaMax, theta[i*n+k]);
+    }
+}
+level.data = {'x': [thetaMin, thetaMax], 'y': [theta[i*n+n-1], theta[i*n+n-1]]};
+const m = dualSource.data['dualDepth'].length;
+const velocity = dualSlices.data['velocity'];
+for (let k = 0; k < m; k++) {
+    dualSource.data['velocity'][k] = velocity[i*m+k];
+}
+source.change.emit();
+dualSource.change.emit();
+for (const p of plots) {
+    p.title.text = 'Date: '+dates[i];
+}
+"""
+
+
+def buildInteractiveView(timeIndex,psi,theta,velocities,depths,dualDepths,data,time,ncfile,labelSize,titleSize,legendSize,lineWidth,timeIndices=None):
+    '''
+    Builds the bokeh view of show: water suction, hydraulic head, water content
+    and Darcy velocities with a time slider that works without a bokeh server.
+
+    The profiles at the time steps of the slider are read once and embedded as
+    compact float32 arrays. All the tabs share one ColumnDataSource with the
+    profiles of the selected time step, the slider copies a slice of the arrays
+    into it. Glyphs are drawn with the WebGL backend.
+
+    timeIndices: time indices browsed by the slider, by default see sliderTimeIndices
+
+    return:
+
+    bokeh layout
+    '''
+    from bokeh.plotting import figure
+    from bokeh.layouts import column
+    from bokeh.models import ColumnDataSource, CustomJS, HoverTool, Slider
+    from bokeh.models.widgets import Panel, Tabs
+
+    if timeIndices is None:
+        timeIndices = sliderTimeIndices(time.shape[0],timeIndex,depths.shape[0])
+    timeIndices = np.asarray(timeIndices,dtype=int)
+    position = int(np.argmin(np.abs(timeIndices-int(timeIndex))))
+    dates = list(pd.to_datetime(np.asarray(time[timeIndices.tolist()]),unit='s',utc=True).strftime('%Y-%m-%d %H:%M'))
+
+    depth = np.asarray(np.ma.getdata(depths[:]),dtype=float)
+    dualDepth = np.asarray(np.ma.getdata(dualDepths[:]),dtype=float)
+    nPoints = np.size(depth)
+    psiSlices = readProfiles(psi,timeIndices).astype(np.float32)
+    thetaSlices = readProfiles(theta,timeIndices).astype(np.float32)
+    velocitySlices = readProfiles(velocities,timeIndices).astype(np.float32)
+    slices = ColumnDataSource(data={'psi': psiSlices.ravel(), 'theta': thetaSlices.ravel()})
+    dualSlices = ColumnDataSource(data={'velocity': velocitySlices.ravel()})
+
+    ## profiles of the selected time step
+    psiNow = psiSlices[position].astype(float)
+    thetaNow = thetaSlices[position].astype(float)
+    thetaNow[nPoints-2:] = np.nan
+    source = ColumnDataSource(data={'depth': depth, 'psi': psiNow, 'head': psiNow+depth-depth[0], 'theta': thetaNow})
+    dualSource = ColumnDataSource(data={'dualDepth': dualDepth, 'velocity': velocitySlices[position].astype(float)})
+    level = ColumnDataSource(data={'x': [np.nanmin(thetaNow),np.nanmax(thetaNow)],
+                                   'y': [float(thetaSlices[position,nPoints-1])]*2})
+
+    ## layers are drawn over the range of water content of all the time steps
+    boundaries = layerBoundaries(data)
+    thetaRange = [float(thetaSlices[:,0:nPoints-2].min())-0.001,float(thetaSlices.max())+0.001]
+    layers = ColumnDataSource(data={'x0': [thetaRange[0]]*np.size(boundaries), 'x1': [thetaRange[1]]*np.size(boundaries),
+                                    'y': boundaries})
+
+    depthLabel = ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']'
+    plots = []
+
+    def profileFigure(x,xLabel,tabTitle,profileSource,y,color,**kwargs):
+        hover = HoverTool(tooltips=[("(x,y)", "($x, $y)")])
+        p = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
+                   output_backend="webgl")
+        p.scatter(x=x, y=y, source=profileSource, color=color, **kwargs)
+        p.xaxis.axis_label = xLabel
+        p.xaxis.axis_label_text_font_size = str(labelSize) + "px"
+        p.yaxis.axis_label = depthLabel
+        p.yaxis.axis_label_text_font_size = str(labelSize) + "px"
+        p.title.text = 'Date: '+dates[position]
+        p.title.align = "center"
+        p.title.text_font_size = str(titleSize) + "px"
+        plots.append(p)
+        return Panel(child=p, title=tabTitle)
+
+    tab1 = profileFigure('psi',psi.long_name + '  [' +psi.units +']',"Water suction",source,'depth',"blue")
+    tab2 = profileFigure('head','Hydraulic head [m]',"Hydraulic head",source,'depth',"blue")
+    tab3 = profileFigure('theta','\u03B8 [-]',"Water content and water depth",source,'depth',"red",legend_label='\u03B8 ')
+    p3 = plots[-1]
+    p3.line(x='x', y='y', source=level, color="deepskyblue", line_width=lineWidth, legend_label='Total water level')
+    if np.size(boundaries) > 0:
+        p3.segment(x0='x0', y0='y', x1='x1', y1='y', source=layers, color='black', line_width=max(lineWidth-2,1), legend_label='Layer')
     p3.legend.location = "bottom_right"
     p3.legend.label_text_font_size = str(legendSize) + "px"
     p3.legend.click_policy="hide"
-    #p3.xaxis.axis_label = '\u03B8 [-]'
-    p3.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p3.yaxis.axis_label = ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']'
-    p3.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p3.title.text = 'Date: '+date.strftime('%Y-%m-%d %H:%M')
-    p3.title.align = "center"
-    p3.title.text_font_size = str(titleSize) + "px"
-    tab3 = Panel(child=p3, title="Water content and water depth")
-
-    p4 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-           title="Mouse over the dots")
-    
-    p4.scatter(velocities[timeIndex], dualDepths[:], color="black")
-    p4.xaxis.axis_label = ncfile.variables['velocities'].long_name + '  [' +ncfile.variables['velocities'].units +']'
-    p4.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p4.yaxis.axis_label = ncfile.variables['depth'].long_name + '  [' +ncfile.variables['depth'].units +']'
-    p4.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p4.title.text = 'Date: '+date.strftime('%Y-%m-%d %H:%M')
-    p4.title.align = "center"
-    p4.title.text_font_size = str(titleSize) + "px"
-    tab4 = Panel(child=p4, title="Darcy velocities")
-    
-    tabs = Tabs(tabs=[ tab1, tab2, tab3, tab4 ])
-    show(tabs)
-    return
\ No newline at end of file
+    tab4 = profileFigure('velocity',velocities.long_name + '  [' +velocities.units +']',"Darcy velocities",dualSource,'dualDepth',"black")
+
+    slider = Slider(start=0, end=max(np.size(timeIndices)-1,1), value=position, step=1, title='Time step', width=600)
+    slider.js_on_change('value', CustomJS(args=dict(source=source, dualSource=dualSource, level=level, slices=slices,
+                                                    dualSlices=dualSlices, plots=plots, dates=dates),
+                                          code=_SLIDER_CODE))
+
+    return column(slider, Tabs(tabs=[ tab1, tab2, tab3, tab4 ]))
+
+
+def show(timeIndex,psi,theta,velocities,depths,dualDepths,data,time,ncfile,labelSize,titleSize,legendSize,axisTicksSize,lineWidth,lineStyle,markerSize,markerType,figureSizeHeigth,figureSizeWidth,figureSizeHeigth1,figureSizeWidth1,timeIndices=None):
+    '''
+    Shows the profiles at timeIndex in bokeh tabs, with a time slider to
+    browse the other time steps, see buildInteractiveView.
+    '''
+    from bokeh.io import show
+    outputNotebook()
+
+    ## https://bokeh.pydata.org/en/latest/docs/user_guide/tools.html#built-in-tools
+    show(buildInteractiveView(timeIndex,psi,theta,velocities,depths,dualDepths,data,time,ncfile,
+                              labelSize,titleSize,legendSize,lineWidth,timeIndices))
+    return
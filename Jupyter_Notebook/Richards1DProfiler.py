@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 31 09:47:12 2026
+
+This is used to see where the time of a run goes: the solver
+(Richards1DSolver.py) and the I/O modules report into per-phase timers and
+counters, that can be exported as JSON or, for a run of the solver, as
+additional variables of the output NetCDF (one time series for each phase).
+
+Phases are exclusive: when a phase starts inside another one the time of the
+outer phase is paused, so that the times of the phases add up to the wall time
+of the profiled code. Phases are started and stopped with
+
+    startPhase('assembly')
+    ...
+    stopPhase()
+
+and events are counted with count('linearSolves'). The profiler is off by
+default: then these functions return immediately, at the cost of a function
+call.
+
+    enableProfiling()
+    runRichards1D(...)
+    writeProfileJSON('profile.json')
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import json
+import time
+
+
+## phases reported by the solver and by the I/O modules
+PHASES = ['gridReading', 'bcReading', 'closure', 'interfaceConductivity', 'assembly', 'newton', 'linearSolve',
+          'fluxes', 'buffering', 'writing', 'reading']
+
+## counters reported by the solver
+COUNTERS = ['timeSteps', 'outerIterations', 'innerIterations', 'linearSolves', 'nonConvergedSteps', 'closureEvaluations',
+            'waterContentEvaluations', 'capacityEvaluations']
+
+_enabled = False
+
+## phase: [time [s], calls]
+_timers = {}
+_counters = {}
+## phases started and not stopped, and time of the last start or stop
+_stack = []
+_lastTime = [0.0]
+
+
+def enableProfiling(enabled=True):
+    '''
+    Switches the profiler on or off, the timers and counters are kept.
+
+    return:
+
+    the previous state
+    '''
+    global _enabled
+    previous = _enabled
+    _enabled = enabled
+    return previous
+
+
+def isProfiling():
+    return _enabled
+
+
+def resetProfiler():
+    '''
+    Clears timers and counters.
+    '''
+    _timers.clear()
+    _counters.clear()
+    del _stack[:]
+    return
+
+
+def startPhase(phase):
+    '''
+    Starts timing a phase, pausing the phase that is running.
+    '''
+    if not _enabled:
+        return
+    now = time.perf_counter()
+    if _stack:
+        _timers[_stack[-1]][0] += now-_lastTime[0]
+    timer = _timers.get(phase)
+    if timer is None:
+        timer = _timers[phase] = [0.0, 0]
+    timer[1] += 1
+    _stack.append(phase)
+    _lastTime[0] = now
+    return
+
+
+def stopPhase():
+    '''
+    Stops timing the last phase started, the phase that it paused restarts.
+    '''
+    if not _enabled or not _stack:
+        return
+    now = time.perf_counter()
+    _timers[_stack.pop()][0] += now-_lastTime[0]
+    _lastTime[0] = now
+    return
+
+
+def count(counter,n=1):
+    '''
+    Adds n to a counter.
+    '''
+    if not _enabled:
+        return
+    _counters[counter] = _counters.get(counter,0)+n
+    return
+
+
+def phaseTimes():
+    '''
+    return:
+
+    dictionary phase: time [s], with all the PHASES
+    '''
+    times = {phase: 0.0 for phase in PHASES}
+    for phase,timer in _timers.items():
+        times[phase] = timer[0]
+    return times
+
+
+def profileReport():
+    '''
+    return:
+
+    dictionary with the time [s], the number of calls and the fraction of the
+    total time of each phase, the counters and the total time
+    '''
+    total = sum(timer[0] for timer in _timers.values())
+    phases = {}
+    for phase,timer in sorted(_timers.items(),key=lambda item: -item[1][0]):
+        phases[phase] = {'time': timer[0], 'calls': timer[1], 'fraction': timer[0]/total if total > 0 else 0.0}
+    return {'phases': phases, 'counters': dict(_counters), 'totalTime': total}
+
+
+def writeProfileJSON(fileName):
+    '''
+    Writes profileReport to a .json file.
+    '''
+    with open(fileName,'w') as f:
+        json.dump(profileReport(),f,indent=2)
+    print('*** SUCCESS writing!  '+fileName)
+    return
+
+
+def printProfile():
+    '''
+    Prints the time of each phase and the counters.
+    '''
+    report = profileReport()
+    print('{:24s} {:>10s} {:>10s} {:>8s}'.format('phase','time [s]','calls','%'))
+    for phase,values in report['phases'].items():
+        print('{:24s} {:10.3f} {:10d} {:8.1f}'.format(phase,values['time'],values['calls'],100*values['fraction']))
+    print('{:24s} {:10.3f}'.format('total',report['totalTime']))
+    for counter,value in report['counters'].items():
+        print('{:24s} {:10d}'.format(counter,value))
+    return
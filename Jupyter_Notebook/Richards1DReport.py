@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 10:37:52 2026
+
+This is used to produce the figures of Richards 1D simulations without a
+notebook, e.g. in a nightly job that processes the output of many sites.
+
+For each output file the standard set of figures (initial condition, water
+suction, hydraulic head, water content, Darcy fluxes and error) is rendered to
+PNG, together with an HTML page of the run. The non-interactive Agg backend is
+selected by main() and in the worker processes, not when the module is
+imported, so a notebook keeps its backend. Runs are processed in parallel and an index.html page links all of them.
+
+It can be used from the command line:
+
+    python Richards1DReport.py output1.nc output2.nc --mesh mesh.csv --report-dir report
+
+the exit status is 1 if the report of at least one file could not be produced.
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import html
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DOutput import plotInitialCondition, plotProfiles, plotWaterContent, plotError
+
+
+## plot settings, the same used in the notebooks
+PLOT_SETTINGS = {'labelSize': 20,
+                 'titleSize': 22,
+                 'legendSize': 16,
+                 'axisTicksSize': 18,
+                 'lineWidth': 1.0,
+                 'lineStyle': '-',
+                 'markerSize': 4,
+                 'markerType': 'o',
+                 'figureSizeHeigth': 13,
+                 'figureSizeWidth': 15,
+                 'dpi': 80}
+
+## figures of the report: name and title
+REPORT_FIGURES = [('initialCondition', 'Initial condition'),
+                  ('waterSuction', 'Water suction'),
+                  ('hydraulicHead', 'Hydraulic head'),
+                  ('waterContent', 'Water content'),
+                  ('darcyVelocities', 'Darcy flux'),
+                  ('error', 'Error over time')]
+
+
+def reportTimeIndices(nTime,nProfiles=6):
+    '''
+    Returns nProfiles time indices evenly spaced over the simulation, the
+    first and the last time steps included.
+    '''
+    return np.unique(np.linspace(0,nTime-1,min(nProfiles,nTime)).astype(int))
+
+
+def renderFigures(ncfile,data,figureDir,nProfiles=6,settings=PLOT_SETTINGS):
+    '''
+    Renders the figures of REPORT_FIGURES for an open output file.
+
+    data: pandas dataframe of the RichardsMeshGen input .csv file, used to draw
+        the layers in the water content plot, or None
+    figureDir: folder where the PNG files are written
+
+    return:
+
+    figures: list of [name, title, PNG file name]
+    '''
+    s = settings
+    common = (s['labelSize'],s['titleSize'],s['legendSize'],s['axisTicksSize'],s['lineWidth'],s['lineStyle'],
+              s['markerSize'],s['markerType'],s['figureSizeHeigth'],s['figureSizeWidth'])
+    if data is None:
+        data = pd.DataFrame({'Type': [], 'eta': []})
+
+    time = ncfile.variables['time']
+    timeIndex = reportTimeIndices(time.shape[0],nProfiles)
+    date = list(pd.to_datetime(np.asarray(time[timeIndex.tolist()]),unit='s',utc=True).strftime("%Y-%m-%d %H:%M"))
+
+    builders = {'initialCondition': lambda: plotInitialCondition(ncfile.variables['psiIC'][:],ncfile.variables['depth'],ncfile,*common,'upper left'),
+                'waterSuction': lambda: plotProfiles(timeIndex,date,'psi',ncfile,'Water suction',None,*common,'lower left'),
+                'hydraulicHead': lambda: plotProfiles(timeIndex,date,'hydraulicHead',ncfile,'Hydraulic head','Hydraulic head [m]',*common,'upper left',
+                                                      xFormat='%.3f'),
+                'waterContent': lambda: plotWaterContent(timeIndex,date,'water_heigth',ncfile.variables['depth'],data,ncfile,*common,'upper right'),
+                'darcyVelocities': lambda: plotProfiles(timeIndex,date,'darcyVelocities',ncfile,'Darcy flux',None,*common,'upper left',xFormat='%.1e'),
+                'error': lambda: plotError(ncfile.variables['error'],time,ncfile,s['labelSize'],s['titleSize'],s['axisTicksSize'],
+                                          s['lineWidth'],s['figureSizeHeigth'],s['figureSizeWidth'])}
+
+    figures = []
+    for name,title in REPORT_FIGURES:
+        fig = builders[name]()
+        fileName = name+'.png'
+        fig.savefig(os.path.join(figureDir,fileName),dpi=s['dpi'],bbox_inches='tight')
+        plt.close(fig)
+        figures.append([name,title,fileName])
+    return figures
+
+
+def _writeRunPage(runDir,runName,outputFileName,description,figures):
+    ## HTML page with all the figures of a run
+    lines = ['<!DOCTYPE html>','<html><head><meta charset="utf-8"><title>'+html.escape(runName)+'</title></head><body>',
+             '<p><a href="../index.html">index</a></p>',
+             '<h1>'+html.escape(runName)+'</h1>',
+             '<p>'+html.escape(os.path.abspath(outputFileName))+'</p>',
+             '<p>'+html.escape(description)+'</p>']
+    for name,title,fileName in figures:
+        lines.append('<h2>'+html.escape(title)+'</h2>')
+        lines.append('<img src="'+html.escape(fileName)+'" alt="'+html.escape(name)+'">')
+    lines.append('</body></html>')
+    with open(os.path.join(runDir,'index.html'),'w') as f:
+        f.write('\n'.join(lines))
+
+
+def renderRunReport(outputFileName,runDir,meshFileName=None,nProfiles=6,settings=PLOT_SETTINGS):
+    '''
+    Renders the figures and the HTML page of one output file.
+
+    return:
+
+    run: dictionary with the output file name, the folder of the run, the list
+        of figures and the error message, None if the report was produced.
+    '''
+    run = {'outputFileName': outputFileName, 'runDir': runDir, 'figures': [], 'description': '', 'error': None}
+    try:
+        os.makedirs(runDir,exist_ok=True)
+        data = pd.read_csv(meshFileName) if meshFileName is not None else None
+        ncfile = Dataset(outputFileName,'r')
+        try:
+            run['description'] = getattr(ncfile,'Description_of_the_problem','')
+            run['figures'] = renderFigures(ncfile,data,runDir,nProfiles,settings)
+        finally:
+            ncfile.close()
+        _writeRunPage(runDir,os.path.basename(runDir),outputFileName,run['description'],run['figures'])
+    except Exception:
+        run['error'] = traceback.format_exc()
+        plt.close('all')
+    return run
+
+
+def _renderRunReport(arguments):
+    return renderRunReport(*arguments)
+
+
+def _initWorker():
+    ## the workers only write PNG files: the non-interactive backend is selected
+    ## in them and not at import, so that a notebook keeps its own backend
+    matplotlib.use('Agg')
+
+
+def _runNames(outputFileNames):
+    ## folder names of the runs: file names without extension, made unique
+    names = []
+    for outputFileName in outputFileNames:
+        name = os.path.splitext(os.path.basename(outputFileName))[0]
+        candidate = name
+        i = 1
+        while candidate in names:
+            candidate = name+'_'+str(i)
+            i += 1
+        names.append(candidate)
+    return names
+
+
+def writeIndex(reportDir,runs):
+    '''
+    Writes index.html with one row for each run: a thumbnail of the water
+    suction plot linking the page of the run, or the error message.
+    '''
+    lines = ['<!DOCTYPE html>','<html><head><meta charset="utf-8"><title>Richards 1D report</title>',
+             '<style>table{border-collapse:collapse} td{border:1px solid #ccc;padding:4px;vertical-align:top} img{width:240px}</style>',
+             '</head><body>','<h1>Richards 1D report</h1>',
+             '<p>'+str(len(runs))+' runs, '+str(sum(run['error'] is not None for run in runs))+' failed</p>','<table>']
+    for run in runs:
+        runName = os.path.basename(run['runDir'])
+        link = runName+'/index.html'
+        if run['error'] is None:
+            cell = '<a href="'+html.escape(link)+'"><img src="'+html.escape(runName+'/waterSuction.png')+'"></a>'
+        else:
+            cell = '<pre>'+html.escape(run['error'])+'</pre>'
+        lines.append('<tr><td><a href="'+html.escape(link)+'">'+html.escape(runName)+'</a><br>'
+                     +html.escape(run['description'])+'</td><td>'+cell+'</td></tr>')
+    lines.append('</table></body></html>')
+    fileName = os.path.join(reportDir,'index.html')
+    with open(fileName,'w') as f:
+        f.write('\n'.join(lines))
+    print('*** SUCCESS writing!  '+fileName)
+    return
+
+
+def generateReport(outputFileNames,reportDir,meshFileNames=None,nProfiles=6,settings=PLOT_SETTINGS,nWorkers=None):
+    '''
+    Produces the report of a batch of output files in parallel.
+
+    outputFileNames: list of output NetCDF files
+    reportDir: folder of the report, each run has its own subfolder
+    meshFileNames: list of RichardsMeshGen input .csv files, one for each output file,
+        a single file name if all the simulations share the same grid, or None
+    nWorkers: number of processes, if None the number of CPUs
+
+    return:
+
+    runs: list of dictionaries, see renderRunReport
+    '''
+    if meshFileNames is None or isinstance(meshFileNames,str):
+        meshFileNames = [meshFileNames]*len(outputFileNames)
+    if len(meshFileNames) != len(outputFileNames):
+        raise ValueError('Provide one mesh file for each output file or a single mesh file')
+
+    os.makedirs(reportDir,exist_ok=True)
+    arguments = [(outputFileName,os.path.join(reportDir,runName),meshFileName,nProfiles,settings)
+                 for outputFileName,runName,meshFileName in zip(outputFileNames,_runNames(outputFileNames),meshFileNames)]
+
+    if nWorkers == 1 or len(arguments) == 1:
+        runs = [_renderRunReport(a) for a in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=nWorkers,initializer=_initWorker) as executor:
+            runs = list(executor.map(_renderRunReport,arguments))
+
+    writeIndex(reportDir,runs)
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the figures of Richards 1D output files to a static HTML report')
+    parser.add_argument('outputFileNames', nargs='+', help='output NetCDF files')
+    parser.add_argument('--report-dir', dest='reportDir', default='report', help='folder of the report')
+    parser.add_argument('--mesh', dest='meshFileNames', action='append', default=None,
+                        help='RichardsMeshGen input .csv file, once for all the output files or once for each of them')
+    parser.add_argument('--profiles', dest='nProfiles', type=int, default=6, help='number of profiles in each plot')
+    parser.add_argument('--workers', dest='nWorkers', type=int, default=None, help='number of processes')
+    args = parser.parse_args(argv)
+    matplotlib.use('Agg')
+
+    meshFileNames = args.meshFileNames
+    if meshFileNames is not None and len(meshFileNames) == 1:
+        meshFileNames = meshFileNames[0]
+    runs = generateReport(args.outputFileNames,args.reportDir,meshFileNames,args.nProfiles,PLOT_SETTINGS,args.nWorkers)
+
+    failed = [run for run in runs if run['error'] is not None]
+    for run in failed:
+        print('*** FAILED: '+run['outputFileName']+'\n'+run['error'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
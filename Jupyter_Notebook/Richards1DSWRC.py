@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+
+This is used to evaluate the soil water retention curves (SWRC) of the grid
+files created with RichardsMeshGen on whole arrays of water suction.
+
+The parameters are those stored in the grid NetCDF (par1SWRC ... par8SWRC),
+with the same meaning they have in RichardsMeshGen*.py and in the solver:
+    - Van Genuchten: par1SWRC = n, par2SWRC = alpha
+    - Brooks Corey: par1SWRC = n, par2SWRC = psiD
+    - Kosugi: par1SWRC = psiMedian, par2SWRC = sigma
+    - Romano: par1SWRC = w, par2SWRC = sigma1, par3SWRC = sigma2,
+              par4SWRC = h1, par5SWRC = h2
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import math
+
+import numpy as np
+
+try:
+    from scipy.special import erfc
+except ImportError:
+    def erfc(x):
+        '''
+        Complementary error function, Chebyshev approximation with fractional
+        error lower than 1.2e-7 (Numerical Recipes, erfcc). It is used only when
+        scipy is not available.
+        '''
+        x = np.asarray(x, dtype=float)
+        t = 1.0/(1.0+0.5*np.abs(x))
+        y = t*np.exp(-x*x-1.26551223+t*(1.00002368+t*(0.37409196+t*(0.09678418+
+                t*(-0.18628806+t*(0.27886807+t*(-1.13520398+t*(1.48851587+
+                t*(-0.82215223+t*0.17087277)))))))))
+        return np.where(x >= 0, y, 2.0-y)
+
+
+## names used in the .sim file for solver.soilHydraulicModel
+SWRC_MODELS = ['Van Genuchten', 'Brooks Corey', 'Kosugi', 'Romano']
+
+## gravity acceleration [m/s2] and water density [kg/m3], used for specific storage
+GRAVITY = 9.81
+WATER_DENSITY = 1000.0
+
+
+def detectSWRCModel(longName):
+    '''
+    Returns the name of the SWRC model from the long_name of the variable
+    par1SWRC written by writeGridNetCDF.
+    '''
+    if 'Van Genuchten' in longName:
+        return 'Van Genuchten'
+    elif 'Brooks' in longName:
+        return 'Brooks Corey'
+    elif 'Kosugi' in longName:
+        return 'Kosugi'
+    elif 'Romano' in longName:
+        return 'Romano'
+    else:
+        raise ValueError('Unable to detect the SWRC model from: '+longName)
+
+
+def detectSWRCModelFromColumns(columns):
+    '''
+    Returns the name of the SWRC model from the columns of a RichardsMeshGen
+    input .csv file.
+    '''
+    columns = list(columns)
+    if 'n' in columns and 'alpha' in columns:
+        return 'Van Genuchten'
+    elif 'psiD' in columns:
+        return 'Brooks Corey'
+    elif 'r' in columns and 'sigma' in columns:
+        return 'Kosugi'
+    elif 'w' in columns:
+        return 'Romano'
+    else:
+        raise ValueError('Unable to detect the SWRC model from the columns: '+', '.join(columns))
+
+
+def layerSWRCParameters(data,swrcModel=None):
+    '''
+    Returns the SWRC parameters of the soil layers defined in a RichardsMeshGen
+    input .csv file, with the same conversions used by setParameters.
+
+    data is a pandas dataframe, the layers are the rows of Type 'L' except the last
+    one, that is the bottom of the soil column.
+
+    return:
+
+    parameters: dictionary with one vector for each parameter (thetaS, thetaR,
+        par1SWRC ... par5SWRC, alphaSpecificStorage, betaSpecificStorage), one
+        value for each layer from the top to the bottom, and the SWRC model ('swrcModel').
+    '''
+    if swrcModel is None:
+        swrcModel = detectSWRCModelFromColumns(data.columns)
+    layers = data[data['Type'] == 'L'].iloc[0:-1]
+
+    def column(name):
+        return np.asarray(layers[name], dtype=float)
+
+    nLayers = len(layers)
+    parameters = {'swrcModel': swrcModel,
+                  'thetaS': column('thetaS'),
+                  'thetaR': column('thetaR'),
+                  'alphaSpecificStorage': column('alphaSpecificStorage'),
+                  'betaSpecificStorage': column('betaSpecificStorage'),
+                  'par3SWRC': np.full(nLayers,-999.0),
+                  'par4SWRC': np.full(nLayers,-999.0),
+                  'par5SWRC': np.full(nLayers,-999.0)}
+
+    if swrcModel == 'Van Genuchten':
+        parameters['par1SWRC'] = column('n')
+        parameters['par2SWRC'] = column('alpha')
+    elif swrcModel == 'Brooks Corey':
+        parameters['par1SWRC'] = column('n')
+        parameters['par2SWRC'] = column('psiD')
+    elif swrcModel == 'Kosugi':
+        parameters['par1SWRC'] = -1.49*10**(-5)/column('r')
+        parameters['par2SWRC'] = column('sigma')
+    elif swrcModel == 'Romano':
+        parameters['par1SWRC'] = column('w')
+        parameters['par2SWRC'] = column('sigma1')
+        parameters['par3SWRC'] = column('sigma2')
+        parameters['par4SWRC'] = column('h1')
+        parameters['par5SWRC'] = column('h2')
+    else:
+        raise ValueError('SWRC model not available: '+str(swrcModel)+'. Available models: '+', '.join(SWRC_MODELS))
+
+    return parameters
+
+
+def _lognormal(psi,psiMedian,sigma):
+    ## fraction of pores with suction lower than psi for a lognormal pore size distribution
+    return 0.5*erfc(np.log(psi/psiMedian)/(sigma*math.sqrt(2)))
+
+
+def computeSaturationDegree(psi,swrcModel,par1SWRC,par2SWRC,par3SWRC=None,par4SWRC=None,par5SWRC=None):
+    '''
+    Computes the saturation degree Se for the SWRC model swrcModel.
+
+    psi can be a vector (one value per control volume) or a matrix (time, control volume),
+    parameters are vectors (one value per control volume) and are broadcast
+    along the last dimension.
+
+    return:
+
+    Se: saturation degree [-], 1 for psi >= 0
+    '''
+    psi = np.asarray(psi, dtype=float)
+    ## the formulas are evaluated only for psi < 0
+    psiNeg = np.minimum(psi, -1e-12)
+
+    if swrcModel == 'Van Genuchten':
+        n = np.asarray(par1SWRC)
+        alpha = np.asarray(par2SWRC)
+        m = 1-1/n
+        se = (1+(alpha*np.abs(psiNeg))**n)**(-m)
+    elif swrcModel == 'Brooks Corey':
+        n = np.asarray(par1SWRC)
+        psiD = np.asarray(par2SWRC)
+        se = np.where(psiNeg < psiD, (psiNeg/psiD)**(-n), 1.0)
+    elif swrcModel == 'Kosugi':
+        se = _lognormal(psiNeg, np.asarray(par1SWRC), np.asarray(par2SWRC))
+    elif swrcModel == 'Romano':
+        w = np.asarray(par1SWRC)
+        se = w*_lognormal(psiNeg, np.asarray(par4SWRC), np.asarray(par2SWRC)) + \
+             (1-w)*_lognormal(psiNeg, np.asarray(par5SWRC), np.asarray(par3SWRC))
+    else:
+        raise ValueError('SWRC model not available: '+str(swrcModel)+'. Available models: '+', '.join(SWRC_MODELS))
+
+    return np.where(psi < 0, se, 1.0)
+
+
+def computeWaterContent(psi,swrcModel,thetaS,thetaR,par1SWRC,par2SWRC,par3SWRC=None,par4SWRC=None,par5SWRC=None,alphaSpecificStorage=None,betaSpecificStorage=None):
+    '''
+    Computes the water content theta for the SWRC model swrcModel.
+
+    For psi > 0 the water content increases linearly with the specific storage
+    g*rho*(alphaSpecificStorage + thetaS*betaSpecificStorage), if given.
+
+    return:
+
+    theta: water content [-], same shape of psi
+    '''
+    thetaS = np.asarray(thetaS)
+    thetaR = np.asarray(thetaR)
+    se = computeSaturationDegree(psi,swrcModel,par1SWRC,par2SWRC,par3SWRC,par4SWRC,par5SWRC)
+    theta = thetaR + (thetaS-thetaR)*se
+
+    if alphaSpecificStorage is not None and betaSpecificStorage is not None:
+        specificStorage = GRAVITY*WATER_DENSITY*(np.asarray(alphaSpecificStorage)+thetaS*np.asarray(betaSpecificStorage))
+        theta = theta + specificStorage*np.maximum(psi, 0)
+
+    return theta
+
+
+def gridWaterContent(psi,grid,swrcModel=None):
+    '''
+    Computes the water content of the control volumes of a grid, as read by
+    readRichardsGridNetCDF. psi must not contain the value of the
+    soil surface (last element of psiIC).
+
+    If swrcModel is None it is detected from the grid file.
+    '''
+    if swrcModel is None:
+        swrcModel = grid['swrcModel']
+    return computeWaterContent(psi,swrcModel,grid['thetaS'],grid['thetaR'],
+                               grid['par1SWRC'],grid['par2SWRC'],grid['par3SWRC'],grid['par4SWRC'],grid['par5SWRC'],
+                               grid['alphaSpecificStorage'],grid['betaSpecificStorage'])
+
+
+def _lognormalDerivative(psi,psiMedian,sigma):
+    ## derivative with respect to psi of _lognormal
+    u = np.log(psi/psiMedian)/(sigma*math.sqrt(2))
+    return -np.exp(-u**2)/(math.sqrt(math.pi)*psi*sigma*math.sqrt(2))
+
+
+def computeMoistureCapacity(psi,swrcModel,thetaS,thetaR,par1SWRC,par2SWRC,par3SWRC=None,par4SWRC=None,par5SWRC=None,alphaSpecificStorage=None,betaSpecificStorage=None):
+    '''
+    Computes the moisture capacity d theta/d psi for the SWRC model swrcModel,
+    the derivative of computeWaterContent.
+
+    return:
+
+    capacity: moisture capacity [1/m], same shape of psi
+    '''
+    psi = np.asarray(psi, dtype=float)
+    thetaS = np.asarray(thetaS)
+    thetaR = np.asarray(thetaR)
+    psiNeg = np.minimum(psi, -1e-12)
+
+    if swrcModel == 'Van Genuchten':
+        n = np.asarray(par1SWRC)
+        alpha = np.asarray(par2SWRC)
+        m = 1-1/n
+        x = (alpha*np.abs(psiNeg))**n
+        dSe = m*n*alpha**n*np.abs(psiNeg)**(n-1)*(1+x)**(-m-1)
+    elif swrcModel == 'Brooks Corey':
+        n = np.asarray(par1SWRC)
+        psiD = np.asarray(par2SWRC)
+        dSe = np.where(psiNeg < psiD, -n*(psiNeg/psiD)**(-n-1)/psiD, 0.0)
+    elif swrcModel == 'Kosugi':
+        dSe = _lognormalDerivative(psiNeg, np.asarray(par1SWRC), np.asarray(par2SWRC))
+    elif swrcModel == 'Romano':
+        w = np.asarray(par1SWRC)
+        dSe = w*_lognormalDerivative(psiNeg, np.asarray(par4SWRC), np.asarray(par2SWRC)) + \
+              (1-w)*_lognormalDerivative(psiNeg, np.asarray(par5SWRC), np.asarray(par3SWRC))
+    else:
+        raise ValueError('SWRC model not available: '+str(swrcModel)+'. Available models: '+', '.join(SWRC_MODELS))
+
+    capacity = np.where(psi < 0, (thetaS-thetaR)*dSe, 0.0)
+    if alphaSpecificStorage is not None and betaSpecificStorage is not None:
+        specificStorage = GRAVITY*WATER_DENSITY*(np.asarray(alphaSpecificStorage)+thetaS*np.asarray(betaSpecificStorage))
+        capacity = capacity + np.where(psi >= 0, specificStorage, 0.0)
+
+    return capacity
+
+
+## names used in the .sim file for solver.typeUHCModel
+UHC_MODELS = {'Van Genuchten': 'Mualem Van Genuchten',
+              'Brooks Corey': 'Mualem Brooks Corey',
+              'Kosugi': 'Mualem Kosugi'}
+
+
+def computeHydraulicConductivity(psi,swrcModel,Ks,par1SWRC,par2SWRC,par3SWRC=None,par4SWRC=None,par5SWRC=None):
+    '''
+    Computes the unsaturated hydraulic conductivity with the Mualem model
+    associated to the SWRC model swrcModel (UHC_MODELS):
+        - Van Genuchten: K = Ks Se^0.5 (1-(1-Se^(1/m))^m)^2
+        - Brooks Corey: K = Ks Se^(2.5+2/n)
+        - Kosugi: K = Ks Se^0.5 (0.5 erfc(u + sigma/sqrt(2)))^2, with Se = 0.5 erfc(u)
+
+    return:
+
+    K: hydraulic conductivity [m/s], Ks for psi >= 0
+    '''
+    psi = np.asarray(psi, dtype=float)
+    Ks = np.asarray(Ks)
+    psiNeg = np.minimum(psi, -1e-12)
+
+    if swrcModel == 'Van Genuchten':
+        n = np.asarray(par1SWRC)
+        m = 1-1/n
+        se = computeSaturationDegree(psiNeg,swrcModel,par1SWRC,par2SWRC)
+        k = se**0.5*(1-(1-se**(1/m))**m)**2
+    elif swrcModel == 'Brooks Corey':
+        se = computeSaturationDegree(psiNeg,swrcModel,par1SWRC,par2SWRC)
+        k = se**(2.5+2/np.asarray(par1SWRC))
+    elif swrcModel == 'Kosugi':
+        sigma = np.asarray(par2SWRC)
+        u = np.log(psiNeg/np.asarray(par1SWRC))/(sigma*math.sqrt(2))
+        k = (0.5*erfc(u))**0.5*(0.5*erfc(u+sigma/math.sqrt(2)))**2
+    elif swrcModel == 'Romano':
+        raise ValueError('The Mualem conductivity of the Romano model is not available')
+    else:
+        raise ValueError('SWRC model not available: '+str(swrcModel)+'. Available models: '+', '.join(SWRC_MODELS))
+
+    return np.where(psi < 0, Ks*k, Ks)
+
+
+def gridHydraulicProperties(psi,grid,swrcModel=None):
+    '''
+    Computes water content, moisture capacity and hydraulic conductivity of
+    the control volumes of a grid, as read by readRichardsGridNetCDF.
+
+    return:
+
+    theta: water content [-]
+
+    capacity: moisture capacity [1/m]
+
+    K: hydraulic conductivity [m/s]
+    '''
+    if swrcModel is None:
+        swrcModel = grid['swrcModel']
+    parameters = (grid['par1SWRC'],grid['par2SWRC'],grid['par3SWRC'],grid['par4SWRC'],grid['par5SWRC'])
+    theta = computeWaterContent(psi,swrcModel,grid['thetaS'],grid['thetaR'],*parameters,
+                                grid['alphaSpecificStorage'],grid['betaSpecificStorage'])
+    capacity = computeMoistureCapacity(psi,swrcModel,grid['thetaS'],grid['thetaR'],*parameters,
+                                       grid['alphaSpecificStorage'],grid['betaSpecificStorage'])
+    K = computeHydraulicConductivity(psi,swrcModel,grid['Ks'],*parameters)
+    return [theta,capacity,K]
@@ -0,0 +1,983 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 29 09:18:26 2026
+
+This is a Python implementation of the Richards 1D solver of the OMS component
+Richards1DSolver.CallRichardsSolver, used to run, time and test simulations
+without the OMS console.
+
+It reads the same inputs of simulation/Richards1D_coupled.sim (the grid NetCDF
+created with RichardsMeshGen, the boundary condition time series in the .csv
+format of the OMS readers and the parameters of the solver, with the same
+names) and writes an output NetCDF with the same variables of
+WriteNetCDFRichards1D, so that all the Richards1D*.py modules can read it,
+plus the convergence of the nested Newton at each time step (read with
+Richards1DConvergence.py).
+
+Numerical scheme:
+    Casulli, Vincenzo, and Paola Zanolli.
+    "A nested Newton-type algorithm for finite volume methods solving Richards' equation in mixed form."
+    SIAM Journal on Scientific Computing 32.4 (2010): 2255-2273.
+
+The hydraulic conductivity is evaluated at the previous time step, so that for
+each time step the system is V(psi) + T psi = b, with T a symmetric
+tridiagonal M-matrix. The water content is split in two convex functions
+theta1 - theta2 at psiStar (par6SWRC of the grid) and the nested Newton
+linearizes theta2 in the outer iterations and theta1 in the inner ones.
+
+Available options:
+    - soil hydraulic models: Van Genuchten, Brooks Corey, Kosugi with the
+      Mualem conductivity (see Richards1DSWRC.computeHydraulicConductivity),
+      temperature effects are not modelled ("notemperature")
+    - top boundary condition: Top Neumann (rainfall height [mm] over tTimestep,
+      positive downward into the soil), Top Dirichlet (water suction [m])
+    - bottom boundary condition: Bottom Dirichlet (water suction [m]),
+      Bottom Free Drainage, Bottom Impervious, Bottom Neumann (water height
+      [mm] over tTimestep, positive inflow)
+
+The values of the boundary conditions are written to topBC and bottomBC, with
+the units and long_name of their type (BC_UNITS). Runoff is not modelled: the
+rain that does not infiltrate ponds at the soil surface (psi of the surface)
+and runOff is always 0.
+
+The phases of a run (closure evaluation, assembly, Newton iterations, linear
+solves, I/O) are timed with Richards1DProfiler.py when profile is True.
+
+Long runs can write checkpoints of the state of the solver (checkpointFileName)
+and be restarted from the last one (restart=True), the restarted run continues
+writing into the same output file.
+
+It can be used from the command line:
+
+    python Richards1DSolver.py grid.nc output.nc --top TestAll_2.csv --bottom TestAll_0.csv --start "2017-01-01 00:00" --end "2017-01-02 00:00"
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import json
+import os
+import sys
+import time as timer
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DGrid import readRichardsGridNetCDF, initialPonding
+from Richards1DSWRC import gridHydraulicProperties, gridWaterContent, computeMoistureCapacity, computeHydraulicConductivity
+from Richards1DProfiler import (PHASES, startPhase, stopPhase, count, enableProfiling, resetProfiler, phaseTimes,
+                                profileReport, writeProfileJSON, printProfile)
+
+try:
+    from scipy.linalg import solve_banded
+except ImportError:
+    solve_banded = None
+
+
+TOP_BC_TYPES = ['Top Neumann', 'Top Dirichlet']
+
+BOTTOM_BC_TYPES = ['Bottom Dirichlet', 'Bottom Free Drainage', 'Bottom Impervious', 'Bottom Neumann']
+
+INTERFACE_CONDUCTIVITY_TYPES = ['max', 'min', 'mean', 'weighted average']
+
+## maximum number of iterations of each Newton loop
+MAX_NEWTON_ITERATIONS = 50
+
+## a time step where the Newton method does not converge is split in two, down to
+## timeDelta/2**MAX_TIME_STEP_SPLITS
+MAX_TIME_STEP_SPLITS = 10
+
+## modified Newton (jacobianReuse): the moisture capacity of the inner iterations is
+## evaluated again when the norm of the residual decreases less than this factor in
+## an iteration, or when it was used for MAX_JACOBIAN_AGE iterations
+JACOBIAN_REFRESH_RATIO = 0.1
+MAX_JACOBIAN_AGE = 3
+
+## time steps kept in memory before they are written to the output file
+OUTPUT_BUFFER_SIZE = 1000
+
+## units and long_name of the variables topBC and bottomBC for each boundary condition type
+BC_UNITS = {'Top Neumann': ['mm', 'rainfall heights'],
+            'Top Dirichlet': ['m', 'water suction at the soil surface'],
+            'Bottom Dirichlet': ['m', 'water suction'],
+            'Bottom Neumann': ['mm', 'water heights entering through the bottom'],
+            'Bottom Free Drainage': ['-', 'not used by the bottom boundary condition'],
+            'Bottom Impervious': ['-', 'not used by the bottom boundary condition']}
+
+## parameters of a run that must not change when it is restarted from a checkpoint
+CHECKPOINT_CONFIGURATION = ['gridFileName', 'topBCFileName', 'bottomBCFileName', 'startDate', 'topBCType', 'bottomBCType',
+                            'interfaceHydraulicCondType', 'newtonTolerance', 'nestedNewton', 'tTimestep', 'timeDelta',
+                            'swrcModel', 'maxIterations', 'jacobianReuse']
+
+## variables of the output file with dimensions (time, depth) and (time, dualDepth)
+OUTPUT_DEPTH_VARIABLES = ['psi', 'water_heigth']
+OUTPUT_DUAL_VARIABLES = ['darcyVelocities', 'darcyVelocitiesCapillary', 'darcyVelocitiesGravity', 'poreVelocities',
+                         'celerities', 'kinematicRatio']
+OUTPUT_TIME_VARIABLES = ['error', 'topBC', 'bottomBC', 'runOff']
+
+## convergence of the nested Newton at each output time step, see Richards1DConvergence.py
+OUTPUT_CONVERGENCE_VARIABLES = ['outerIterations', 'innerIterations', 'newtonResidual', 'nonConvexCells']
+
+
+def readOMSTimeSeries(fileName,startDate=None,endDate=None,novalue=-9999):
+    '''
+    Reads a time series in the .csv format of the OMS readers (OmsTimeSeriesIteratorReader):
+    header lines followed by rows ",yyyy-MM-dd HH:mm,value". Only the first
+    column of values is read. Dates are UTC.
+
+    startDate, endDate: strings 'yyyy-MM-dd HH:mm', the rows between them (included) are returned
+    novalue: value of the missing data, replaced by NaN
+
+    return:
+
+    time: unix time [s] of each row
+
+    values: vector of values
+    '''
+    table = pd.read_csv(fileName,header=None,usecols=[0,1,2],names=['key','timestamp','value'],dtype=str,
+                        skip_blank_lines=True)
+    ## data rows have an empty first field
+    table = table[table['key'].isna() & table['timestamp'].notna()]
+    dates = pd.to_datetime(table['timestamp'].str.strip(),format='%Y-%m-%d %H:%M',utc=True)
+    time = np.asarray((dates-pd.Timestamp(0,tz='UTC'))//pd.Timedelta(seconds=1),dtype=np.int64)
+    values = np.array(table['value'].astype(float),dtype=float)
+    values[values == novalue] = np.nan
+
+    selection = np.ones(np.size(time),dtype=bool)
+    if startDate is not None:
+        selection &= time >= _unixTime(startDate)
+    if endDate is not None:
+        selection &= time <= _unixTime(endDate)
+    return [time[selection],values[selection]]
+
+
+def _unixTime(date):
+    ## unix time [s] of a date string 'yyyy-MM-dd HH:mm' in UTC
+    return int(pd.Timestamp(date,tz='UTC').value//10**9)
+
+
+def writeOMSTimeSeries(fileName,time,values,novalue=-9999,author='Richards1DSolver'):
+    '''
+    Writes a time series in the .csv format of the OMS readers, see the
+    files in data/Timeseries.
+
+    time: unix time [s] of each row
+    values: vector of values, NaN are written as novalue
+    '''
+    dates = pd.to_datetime(np.asarray(time),unit='s',utc=True).strftime('%Y-%m-%d %H:%M')
+    values = np.where(np.isnan(values),novalue,values)
+    with open(fileName,'w') as f:
+        f.write('@T,table\n')
+        f.write('Created,'+pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')+'\n')
+        f.write('Author,'+author+'\n')
+        f.write('@H,timestamp,value_1\n')
+        f.write('ID,,1\n')
+        f.write('Type,Date,Double\n')
+        f.write('Format,yyyy-MM-dd HH:mm,\n')
+        for date,value in zip(dates,values):
+            f.write(','+date+','+repr(float(value))+'\n')
+    print('*** SUCCESS writing!  '+fileName)
+    return
+
+
+def _hydraulicProperties(psi,grid,swrcModel):
+    ## gridHydraulicProperties timed as the closure phase
+    startPhase('closure')
+    properties = gridHydraulicProperties(psi,grid,swrcModel)
+    stopPhase()
+    count('closureEvaluations')
+    return properties
+
+
+def _waterContent(psi,grid,swrcModel):
+    ## gridWaterContent timed as the closure phase
+    startPhase('closure')
+    theta = gridWaterContent(psi,grid,swrcModel)
+    stopPhase()
+    count('waterContentEvaluations')
+    return theta
+
+
+def _moistureCapacity(psi,grid,swrcModel):
+    ## moisture capacity of the control volumes timed as the closure phase
+    startPhase('closure')
+    capacity = computeMoistureCapacity(psi,swrcModel,grid['thetaS'],grid['thetaR'],grid['par1SWRC'],grid['par2SWRC'],
+                                       grid['par3SWRC'],grid['par4SWRC'],grid['par5SWRC'],
+                                       grid['alphaSpecificStorage'],grid['betaSpecificStorage'])
+    stopPhase()
+    count('capacityEvaluations')
+    return capacity
+
+
+def interfaceConductivity(K,deltaZ,interfaceType='max'):
+    '''
+    Computes the hydraulic conductivity at the interfaces between adjacent
+    control volumes (solver.interfaceHydraulicCondType).
+
+    return:
+
+    K at the N-1 internal interfaces, from the bottom to the top
+    '''
+    below = K[0:-1]
+    above = K[1:]
+    if interfaceType == 'max':
+        return np.maximum(below,above)
+    elif interfaceType == 'min':
+        return np.minimum(below,above)
+    elif interfaceType == 'mean':
+        return 0.5*(below+above)
+    elif interfaceType == 'weighted average':
+        return (below*deltaZ[0:-1]+above*deltaZ[1:])/(deltaZ[0:-1]+deltaZ[1:])
+    raise ValueError('Interface hydraulic conductivity not available: '+str(interfaceType)+
+                     '. Available types: '+', '.join(INTERFACE_CONDUCTIVITY_TYPES))
+
+
+def _boundaryConductivity(K,psiBoundary,grid,swrcModel,cell,interfaceType):
+    ## conductivity at a boundary with assigned water suction, combined with the one of the adjacent control volume
+    kBoundary = computeHydraulicConductivity(psiBoundary,swrcModel,grid['Ks'][cell],grid['par1SWRC'][cell],grid['par2SWRC'][cell],
+                                             grid['par3SWRC'][cell],grid['par4SWRC'][cell],grid['par5SWRC'][cell])
+    return float(interfaceConductivity(np.array([K[cell],kBoundary]),np.array([grid['deltaZ'][cell]]*2),interfaceType)[0])
+
+
+def solveTridiagonal(lower,diag,upper,rhs):
+    '''
+    Solves a tridiagonal system, with scipy if available or with the Thomas
+    algorithm.
+
+    lower, upper: sub and super diagonal (n-1 elements)
+    '''
+    startPhase('linearSolve')
+    try:
+        return _solveTridiagonal(lower,diag,upper,rhs)
+    finally:
+        stopPhase()
+
+
+def _solveTridiagonal(lower,diag,upper,rhs):
+    n = np.size(diag)
+    if solve_banded is not None:
+        ab = np.zeros((3,n))
+        ab[0,1:] = upper
+        ab[1] = diag
+        ab[2,0:-1] = lower
+        return solve_banded((1,1),ab,rhs)
+
+    a = lower.tolist()
+    b = diag.tolist()
+    c = upper.tolist()
+    d = rhs.tolist()
+    for i in range(1,n):
+        if b[i-1] == 0.0:
+            raise np.linalg.LinAlgError('Singular tridiagonal matrix')
+        w = a[i-1]/b[i-1]
+        b[i] -= w*c[i-1]
+        d[i] -= w*d[i-1]
+    if b[n-1] == 0.0:
+        raise np.linalg.LinAlgError('Singular tridiagonal matrix')
+    x = [0.0]*n
+    x[n-1] = d[n-1]/b[n-1]
+    for i in range(n-2,-1,-1):
+        x[i] = (d[i]-c[i]*x[i+1])/b[i]
+    return np.array(x)
+
+
+def assembleSystem(K,psiTop,psiBottom,qTop,qBottom,grid,swrcModel,dt,topBCType,bottomBCType,interfaceType):
+    '''
+    Assembles the linear part T psi = rhs of the system of a time step, with
+    the conductivity K of the control volumes at the previous time step.
+
+    psiTop, psiBottom: water suction [m] of Dirichlet boundary conditions
+    qTop, qBottom: fluxes [m/s] of Neumann boundary conditions, positive upward
+
+    return:
+
+    lower, diag, upper: tridiagonal matrix T
+
+    rhs: right hand side, gravity and boundary conditions
+
+    kInterfaces: conductivity at the N+1 interfaces, from the bottom to the top
+    '''
+    nCV = np.size(K)
+    spaceDelta = grid['spaceDelta']
+    kInterfaces = np.zeros(nCV+1)
+    startPhase('interfaceConductivity')
+    kInterfaces[1:nCV] = interfaceConductivity(K,grid['deltaZ'],interfaceType)
+    stopPhase()
+
+    if bottomBCType == 'Bottom Dirichlet':
+        kInterfaces[0] = _boundaryConductivity(K,psiBottom,grid,swrcModel,0,interfaceType)
+    elif bottomBCType == 'Bottom Free Drainage':
+        kInterfaces[0] = K[0]
+    elif bottomBCType not in BOTTOM_BC_TYPES:
+        raise ValueError('Bottom boundary condition not available: '+str(bottomBCType)+'. Available types: '+', '.join(BOTTOM_BC_TYPES))
+    if topBCType == 'Top Dirichlet':
+        kInterfaces[nCV] = _boundaryConductivity(K,psiTop,grid,swrcModel,nCV-1,interfaceType)
+    elif topBCType not in TOP_BC_TYPES:
+        raise ValueError('Top boundary condition not available: '+str(topBCType)+'. Available types: '+', '.join(TOP_BC_TYPES))
+
+    a = dt*kInterfaces/spaceDelta[0:nCV+1]
+    ## gravity: each interface carries -K upward, that is out of the control volume below and into the one above
+    rhs = dt*(kInterfaces[1:nCV+1]-kInterfaces[0:nCV])
+    diag = np.zeros(nCV)
+    diag += a[1:nCV+1]*np.append(np.ones(nCV-1),topBCType == 'Top Dirichlet')
+    diag += a[0:nCV]*np.append(bottomBCType == 'Bottom Dirichlet',np.ones(nCV-1))
+    lower = -a[1:nCV].copy()
+    upper = -a[1:nCV].copy()
+
+    if bottomBCType == 'Bottom Dirichlet':
+        rhs[0] += a[0]*psiBottom
+    elif bottomBCType == 'Bottom Neumann':
+        rhs[0] += dt*qBottom
+    if topBCType == 'Top Dirichlet':
+        rhs[nCV-1] += a[nCV]*psiTop
+    else:
+        rhs[nCV-1] -= dt*qTop
+
+    return [lower,diag,upper,rhs,kInterfaces]
+
+
+def _convexSplit(psi,theta,capacity,thetaStar,capacityStar,psiStar):
+    ## theta1 and its derivative: theta below psiStar, its tangent at psiStar above
+    above = psi > psiStar
+    theta1 = np.where(above,thetaStar+capacityStar*(psi-psiStar),theta)
+    capacity1 = np.where(above,capacityStar,capacity)
+    return [theta1,capacity1]
+
+
+def surfacePonding(psi):
+    '''
+    Water ponding at the soil surface: for psi > 0 the water volume of the
+    top control volume grows of psi, the height of the ponding water.
+
+    return:
+
+    ponding: water height [m] added to the volume of each control volume
+
+    dPonding: its derivative with respect to psi
+    '''
+    ponding = np.zeros(np.size(psi))
+    dPonding = np.zeros(np.size(psi))
+    if psi[-1] > 0:
+        ponding[-1] = psi[-1]
+        dPonding[-1] = 1.0
+    return [ponding,dPonding]
+
+
+def _residual(volume,lower,diag,upper,rhs,psi):
+    ## volume + T psi - rhs
+    tPsi = diag*psi
+    tPsi[0:-1] += upper*psi[1:]
+    tPsi[1:] += lower*psi[0:-1]
+    return volume+tPsi-rhs
+
+
+def _modifiedInnerNewton(psi,psiOuter,theta2,capacity2,b,lower,diag,upper,grid,swrcModel,thetaStar,capacityStar,psiStar,
+                         tolerance,maxIterations,jacobian):
+    ## inner iterations of the nested Newton as a modified Newton. The capacity of theta1 does not
+    ## decrease with psi and the inner iterates decrease to the solution, so the capacity of an
+    ## earlier iterate gives a chord method that still converges monotonically. The first inner
+    ## iterate is max(psiOuter, psiStar), where the capacity is capacityStar without evaluating
+    ## the closure, then it is evaluated again when the convergence slows down
+    deltaZ = grid['deltaZ']
+    iterations = 0
+    lastNorm = np.inf
+    capacity = capacityStar
+    age = 0
+    for inner in range(maxIterations):
+        theta = _waterContent(psi,grid,swrcModel)
+        above = psi > psiStar
+        theta1 = np.where(above,thetaStar+capacityStar*(psi-psiStar),theta)
+        [ponding,dPonding] = surfacePonding(psi)
+        f = _residual((theta1-theta2-capacity2*(psi-psiOuter))*deltaZ+ponding,lower,diag,upper,b,psi)
+        norm = np.sqrt(np.sum(f**2))
+        if norm < tolerance:
+            break
+        if age >= MAX_JACOBIAN_AGE or norm > JACOBIAN_REFRESH_RATIO*lastNorm:
+            capacity = _moistureCapacity(psi,grid,swrcModel)
+            age = 0
+            jacobian['evaluations'] += 1
+        else:
+            jacobian['reuses'] += 1
+        age += 1
+        lastNorm = norm
+        iterations += 1
+        capacity1 = np.where(above,capacityStar,capacity)
+        psi = psi-solveTridiagonal(lower,diag+(capacity1-capacity2)*deltaZ+dPonding,upper,f)
+    return [psi,iterations]
+
+
+def nestedNewtonSolve(psi,volumeOld,lower,diag,upper,rhs,grid,swrcModel,psiStar,tolerance=1e-11,nested=1,maxIterations=MAX_NEWTON_ITERATIONS,
+                      jacobian=None):
+    '''
+    Solves V(psi) - volumeOld + T psi = rhs with the nested Newton method of
+    Casulli and Zanolli (nested = 1) or with Newton's method (nested = 0), where
+    V(psi) is theta(psi) deltaZ plus the surface ponding. The hydraulic
+    conductivity is in T, so only water content and moisture capacity are
+    evaluated.
+
+    psi: initial guess, the water suction at the previous time step
+    tolerance: tolerance on the norm of the residual [m] (solver.newtonTolerance)
+    jacobian: if not None, the inner iterations of the nested Newton are a
+        modified Newton that reuses the moisture capacity within each inner
+        solve and evaluates it again when the convergence slows down, the
+        number of evaluations and of reuses is added to the keys evaluations
+        and reuses of this dictionary
+
+    return:
+
+    psi: solution
+
+    outerIterations, innerIterations: number of iterations
+
+    residual: norm of the residual of the solution
+    '''
+    deltaZ = grid['deltaZ']
+    b = rhs+volumeOld
+    outerIterations = 0
+    innerIterations = 0
+    residual = np.inf
+
+    thetaStar = _waterContent(psiStar,grid,swrcModel)
+    capacityStar = _moistureCapacity(psiStar,grid,swrcModel)
+    psi = np.array(psi,dtype=float)
+    for outer in range(maxIterations):
+        theta = _waterContent(psi,grid,swrcModel)
+        [ponding,dPonding] = surfacePonding(psi)
+        f = _residual(theta*deltaZ+ponding,lower,diag,upper,b,psi)
+        residual = np.sqrt(np.sum(f**2))
+        if residual < tolerance:
+            break
+        outerIterations += 1
+
+        if not nested:
+            innerIterations += 1
+            capacity = _moistureCapacity(psi,grid,swrcModel)
+            psi = psi-solveTridiagonal(lower,diag+capacity*deltaZ+dPonding,upper,f)
+            continue
+
+        ## theta2 = theta1 - theta is linearized at the outer iterate, the ponding
+        ## is convex and belongs to the inner problem. The outer iterates must not
+        ## exceed the solution: the first one is min(psi, psiStar), where theta2 = 0,
+        ## and the following ones stay below the solution
+        if outerIterations == 1:
+            psi = np.minimum(psi,psiStar)
+            theta = _waterContent(psi,grid,swrcModel)
+        capacity = _moistureCapacity(psi,grid,swrcModel)
+        [theta1,capacity1] = _convexSplit(psi,theta,capacity,thetaStar,capacityStar,psiStar)
+        theta2 = theta1-theta
+        capacity2 = capacity1-capacity
+        psiOuter = psi
+        psi = np.maximum(psi,psiStar)
+        if jacobian is not None:
+            [psi,iterations] = _modifiedInnerNewton(psi,psiOuter,theta2,capacity2,b,lower,diag,upper,grid,swrcModel,thetaStar,
+                                                    capacityStar,psiStar,tolerance,maxIterations,jacobian)
+            innerIterations += iterations
+            continue
+        for inner in range(maxIterations):
+            theta = _waterContent(psi,grid,swrcModel)
+            capacity = _moistureCapacity(psi,grid,swrcModel)
+            [theta1,capacity1] = _convexSplit(psi,theta,capacity,thetaStar,capacityStar,psiStar)
+            [ponding,dPonding] = surfacePonding(psi)
+            f = _residual((theta1-theta2-capacity2*(psi-psiOuter))*deltaZ+ponding,lower,diag,upper,b,psi)
+            if np.sqrt(np.sum(f**2)) < tolerance:
+                break
+            innerIterations += 1
+            psi = psi-solveTridiagonal(lower,diag+(capacity1-capacity2)*deltaZ+dPonding,upper,f)
+    else:
+        ## not converged: residual of the last iterate
+        theta = _waterContent(psi,grid,swrcModel)
+        f = _residual(theta*deltaZ+surfacePonding(psi)[0],lower,diag,upper,b,psi)
+        residual = np.sqrt(np.sum(f**2))
+
+    return [psi,outerIterations,innerIterations,residual]
+
+
+def interfaceFluxes(psi,kInterfaces,psiTop,psiBottom,qTop,qBottom,grid,topBCType,bottomBCType):
+    '''
+    Computes the Darcy velocities [m/s] at the N+1 interfaces, positive upward,
+    and their capillary and gravity parts.
+
+    return:
+
+    darcy, capillary, gravity
+    '''
+    nCV = np.size(psi)
+    spaceDelta = grid['spaceDelta']
+    capillary = np.zeros(nCV+1)
+    gravity = -kInterfaces.copy()
+    capillary[1:nCV] = -kInterfaces[1:nCV]*(psi[1:]-psi[0:-1])/spaceDelta[1:nCV]
+
+    if bottomBCType == 'Bottom Dirichlet':
+        capillary[0] = -kInterfaces[0]*(psi[0]-psiBottom)/spaceDelta[0]
+    elif bottomBCType == 'Bottom Neumann':
+        capillary[0] = qBottom
+        gravity[0] = 0.0
+    if topBCType == 'Top Dirichlet':
+        capillary[nCV] = -kInterfaces[nCV]*(psiTop-psi[nCV-1])/spaceDelta[nCV]
+    else:
+        capillary[nCV] = qTop
+        gravity[nCV] = 0.0
+
+    return [capillary+gravity,capillary,gravity]
+
+
+def _cellsToInterfaces(values):
+    ## values at the interfaces: mean of the adjacent control volumes
+    interfaces = np.empty(np.size(values)+1)
+    interfaces[1:-1] = 0.5*(values[0:-1]+values[1:])
+    interfaces[0] = values[0]
+    interfaces[-1] = values[-1]
+    return interfaces
+
+
+def waveVelocities(psi,darcy,theta,capacity,K,grid,swrcModel):
+    '''
+    Computes pore velocities (Darcy velocity over thetaS), celerities
+    dK/dtheta and kinematic ratio (celerity over pore velocity, Rasmussen et
+    al. 2000) at the interfaces.
+
+    return:
+
+    poreVelocities, celerities, kinematicRatio
+    '''
+    h = 1e-6*np.maximum(1.0,np.abs(psi))
+    kPlus = _hydraulicProperties(psi+h,grid,swrcModel)[2]
+    kMinus = _hydraulicProperties(psi-h,grid,swrcModel)[2]
+    dK = (kPlus-kMinus)/(2*h)
+    celerity = np.divide(dK,capacity,out=np.zeros(np.size(psi)),where=capacity > 0)
+
+    poreVelocities = darcy/_cellsToInterfaces(grid['thetaS'])
+    celerities = _cellsToInterfaces(celerity)
+    kinematicRatio = np.divide(celerities,np.abs(poreVelocities),out=np.zeros(np.size(darcy)),where=poreVelocities != 0)
+    return [poreVelocities,celerities,kinematicRatio]
+
+
+def createOutputNetCDF(fileName,depths,dualDepths,psiIC,description,topBCType='Top Neumann',bottomBCType='Bottom Dirichlet'):
+    '''
+    Creates the output NetCDF with the dimensions, variables and attributes
+    written by WriteNetCDFRichards1D. The time dimension is unlimited, time
+    steps are written with writeOutputBlock. The units of topBC and bottomBC
+    are those of the boundary condition types (BC_UNITS).
+
+    return:
+
+    ncfile: the open NetCDF file
+    '''
+    ncfile = Dataset(fileName,'w',format='NETCDF3_CLASSIC')
+    ncfile.Description_of_the_problem = description
+    ncfile.createDimension('depth',np.size(depths))
+    ncfile.createDimension('dualDepth',np.size(dualDepths))
+    ncfile.createDimension('time',None)
+
+    def variable(name,datatype,dimensions,units,longName=None):
+        var = ncfile.createVariable(name,datatype,dimensions)
+        var.units = units
+        if longName is not None:
+            var.long_name = longName
+        return var
+
+    variable('depth','f8',('depth',),'m','Soil depth')[:] = depths
+    variable('dual_depth','f8',('dualDepth',),'m','Dual soil depth')[:] = dualDepths
+    variable('time','i4',('time',),'unix convention')
+    variable('psi','f8',('time','depth'),'m','Water suction')
+    variable('psiIC','f8',('depth',),'m','Initial condition for water suction')[:] = psiIC
+    variable('water_heigth','f8',('time','depth'),'m','water height')
+    variable('darcyVelocities','f8',('time','dualDepth'),'m/s','Darcy velocities')
+    variable('darcyVelocitiesCapillary','f8',('time','dualDepth'),'m/s','Darcy velocities due to the gradient of capillary forces ')
+    variable('darcyVelocitiesGravity','f8',('time','dualDepth'),'m/s','Darcy velocities due to the gradient of gravity')
+    variable('poreVelocities','f8',('time','dualDepth'),'m/s','Pore velocities, ratio between the Darcy velocities and porosity')
+    variable('celerities','f8',('time','dualDepth'),'m/s','Celerity of the pressure wave (Rasmussen et al. 2000')
+    variable('kinematicRatio','f8',('time','dualDepth'),'-','Kinematic ratio (Rasmussen et al. 2000)')
+    variable('error','f8',('time',),'m','volume error at each time step')
+    variable('topBC','f8',('time',),*BC_UNITS[topBCType])
+    variable('bottomBC','f8',('time',),*BC_UNITS[bottomBCType])
+    variable('runOff','f8',('time',),'m/s','run off, not modelled: always 0')
+    variable('outerIterations','i4',('time',),'-','outer Newton iterations of the time steps of the scheme')
+    variable('innerIterations','i4',('time',),'-','inner Newton iterations of the time steps of the scheme')
+    variable('newtonResidual','f8',('time',),'m','maximum norm of the Newton residual at the end of the time steps of the scheme')
+    variable('nonConvexCells','i4',('time',),'-','maximum number of control volumes with psi > psiStar, where theta is not convex')
+    return ncfile
+
+
+def writeOutputBlock(ncfile,start,block,nSteps):
+    '''
+    Writes the first nSteps time steps of block, a dictionary of arrays with
+    the time steps along the first dimension, from time index start.
+    '''
+    for name,values in block.items():
+        ncfile.variables[name][start:start+nSteps] = values[0:nSteps]
+    return
+
+
+def _outputBlock(nDepths,nDual,size):
+    ## buffer of the output variables
+    block = {'time': np.zeros(size,dtype=np.int32)}
+    for name in OUTPUT_DEPTH_VARIABLES:
+        block[name] = np.zeros((size,nDepths))
+    for name in OUTPUT_DUAL_VARIABLES:
+        block[name] = np.zeros((size,nDual))
+    for name in OUTPUT_TIME_VARIABLES:
+        block[name] = np.zeros(size)
+    for name in OUTPUT_CONVERGENCE_VARIABLES:
+        block[name] = np.zeros(size)
+    return block
+
+
+def writeCheckpoint(fileName,checkpoint):
+    '''
+    Writes the state of a run to a .npz file. The file is first written
+    with a temporary name and then renamed, so that a run that stops while
+    writing leaves the previous checkpoint.
+
+    checkpoint: dictionary with
+        psi: water suction of the control volumes
+        step: index of the next output time step, from startDate
+        time: unix time [s] of the last output time step written
+        statistics, configuration: dictionaries, see runRichards1D
+    '''
+    temporary = fileName+'.tmp'
+    with open(temporary,'wb') as f:
+        np.savez(f,psi=checkpoint['psi'],step=checkpoint['step'],time=checkpoint['time'],
+                 statistics=json.dumps(checkpoint['statistics']),configuration=json.dumps(checkpoint['configuration']))
+    os.replace(temporary,fileName)
+    return
+
+
+def readCheckpoint(fileName):
+    '''
+    Reads a checkpoint written by writeCheckpoint.
+
+    return:
+
+    checkpoint: dictionary, see writeCheckpoint
+    '''
+    with np.load(fileName) as data:
+        return {'psi': np.array(data['psi']),
+                'step': int(data['step']),
+                'time': int(data['time']),
+                'statistics': json.loads(str(data['statistics'])),
+                'configuration': json.loads(str(data['configuration']))}
+
+
+def runRichards1D(gridFileName,outputFileName,topBCFileName,bottomBCFileName,startDate,endDate,
+                  topBCType='Top Neumann',bottomBCType='Bottom Free Drainage',interfaceHydraulicCondType='max',
+                  newtonTolerance=1e-11,nestedNewton=1,tTimestep=300,timeDelta=300,swrcModel=None,
+                  description='',novalue=-9999,maxIterations=MAX_NEWTON_ITERATIONS,profile=False,profileFileName=None,
+                  checkpointFileName=None,checkpointInterval=OUTPUT_BUFFER_SIZE,restart=False,jacobianReuse=False):
+    '''
+    Runs a simulation, with the parameters of the .sim file.
+
+    gridFileName: grid NetCDF (readNetCDF.richardsGridFilename)
+    outputFileName: output NetCDF (writeNetCDF.fileName)
+    topBCFileName, bottomBCFileName: .csv time series of the boundary conditions,
+        a Bottom Free Drainage or Bottom Impervious simulation can use None
+    startDate, endDate: 'yyyy-MM-dd HH:mm', UTC
+    tTimestep: time step of the time series and of the output [s]
+    timeDelta: time step [s] of the numerical scheme, timeDelta <= tTimestep
+    swrcModel: soil hydraulic model, by default the one of the grid
+    profile: if True the phases of the run are timed with Richards1DProfiler,
+        the time of each phase at each output time step is written to the
+        output file (variables profileTime_<phase>) and the report is added
+        to the statistics and written to profileFileName (.json), if given
+    checkpointFileName: .npz file of the checkpoints, written every
+        checkpointInterval output time steps and at the end of the run, after
+        the time steps computed are written to the output file
+    restart: if True the run starts from the checkpoint in checkpointFileName
+        and appends to outputFileName, the parameters of the run must be those
+        of the checkpoint (CHECKPOINT_CONFIGURATION), endDate can be later
+    jacobianReuse: if True the inner iterations of the nested Newton reuse the
+        moisture capacity across iterations (see nestedNewtonSolve), the number
+        of its evaluations and reuses are added to the statistics
+        (jacobianEvaluations, jacobianReuses)
+
+    return:
+
+    statistics: dictionary with the number of time steps of the scheme
+        (timeSteps) and of the output (outputSteps), the number of outer and
+        inner Newton iterations and of linear systems solved, the number of
+        time steps where the Newton method did not converge (nonConvergedSteps),
+        the maximum volume error [m], the wall time [s] and the profile report
+        (profile)
+
+    A time step where the norm of the residual is not below newtonTolerance
+    after maxIterations is computed again in two halves, with a warning, and a
+    RuntimeError is raised when it is shorter than
+    timeDelta/2**MAX_TIME_STEP_SPLITS: the output has only converged time
+    steps, but with nonConvergedSteps > 0 not all of them are timeDelta long.
+    '''
+    if restart and checkpointFileName is None:
+        raise ValueError('A restart needs checkpointFileName')
+    if jacobianReuse and not nestedNewton:
+        raise ValueError('jacobianReuse is available only with nestedNewton = 1')
+    if topBCType not in TOP_BC_TYPES:
+        raise ValueError('Top boundary condition not available: '+str(topBCType)+'. Available types: '+', '.join(TOP_BC_TYPES))
+    if bottomBCType not in BOTTOM_BC_TYPES:
+        raise ValueError('Bottom boundary condition not available: '+str(bottomBCType)+'. Available types: '+', '.join(BOTTOM_BC_TYPES))
+    arguments = (gridFileName,outputFileName,topBCFileName,bottomBCFileName,startDate,endDate,topBCType,bottomBCType,
+                 interfaceHydraulicCondType,newtonTolerance,nestedNewton,tTimestep,timeDelta,swrcModel,description,novalue,
+                 maxIterations,checkpointFileName,checkpointInterval,restart,jacobianReuse)
+    if not profile:
+        return _runRichards1D(*arguments,profile=False)
+
+    previous = enableProfiling(True)
+    resetProfiler()
+    try:
+        statistics = _runRichards1D(*arguments,profile=True)
+    finally:
+        enableProfiling(previous)
+    statistics['profile'] = profileReport()
+    if profileFileName is not None:
+        writeProfileJSON(profileFileName)
+    return statistics
+
+
+def _runRichards1D(gridFileName,outputFileName,topBCFileName,bottomBCFileName,startDate,endDate,topBCType,bottomBCType,
+                   interfaceHydraulicCondType,newtonTolerance,nestedNewton,tTimestep,timeDelta,swrcModel,description,
+                   novalue,maxIterations,checkpointFileName,checkpointInterval,restart,jacobianReuse,profile):
+    start = timer.perf_counter()
+    configuration = {'gridFileName': gridFileName, 'topBCFileName': topBCFileName, 'bottomBCFileName': bottomBCFileName,
+                     'startDate': startDate, 'topBCType': topBCType, 'bottomBCType': bottomBCType,
+                     'interfaceHydraulicCondType': interfaceHydraulicCondType, 'newtonTolerance': newtonTolerance,
+                     'nestedNewton': nestedNewton, 'tTimestep': tTimestep, 'timeDelta': timeDelta, 'swrcModel': swrcModel,
+                     'maxIterations': maxIterations, 'jacobianReuse': jacobianReuse}
+    startPhase('gridReading')
+    grid = readRichardsGridNetCDF(gridFileName)
+    stopPhase()
+    if swrcModel is None:
+        swrcModel = grid['swrcModel']
+    if timeDelta > tTimestep:
+        raise ValueError('timeDelta ('+str(timeDelta)+' s) must not be larger than tTimestep ('+str(tTimestep)+' s)')
+
+    startPhase('bcReading')
+    [time,topValues] = readOMSTimeSeries(topBCFileName,startDate,endDate,novalue)
+    if np.size(time) > 1 and np.any(np.diff(time) != tTimestep):
+        raise ValueError('The time step of '+topBCFileName+' is not tTimestep ('+str(tTimestep)+' s)')
+    if bottomBCFileName is not None:
+        [bottomTime,bottomValues] = readOMSTimeSeries(bottomBCFileName,startDate,endDate,novalue)
+        if np.size(bottomTime) != np.size(time) or np.any(bottomTime != time):
+            raise ValueError('The boundary condition time series '+topBCFileName+' and '+bottomBCFileName+' have different dates')
+    else:
+        bottomValues = np.zeros(np.size(time))
+    ## missing rainfall is no rainfall, missing water suction is the previous one
+    if topBCType == 'Top Neumann':
+        topValues = np.nan_to_num(topValues)
+    else:
+        topValues = pd.Series(topValues).ffill().to_numpy()
+    if bottomBCType == 'Bottom Neumann':
+        bottomValues = np.nan_to_num(bottomValues)
+    else:
+        bottomValues = pd.Series(bottomValues).ffill().to_numpy()
+    stopPhase()
+
+    nCV = np.size(grid['deltaZ'])
+    deltaZ = grid['deltaZ']
+    psiStar = grid['par6SWRC']
+    psi = np.array(grid['psiIC'][0:nCV])
+    statistics = {'timeSteps': 0, 'outputSteps': 0, 'outerIterations': 0, 'innerIterations': 0,
+                  'linearSolves': 0, 'nonConvergedSteps': 0, 'maxError': 0.0, 'wallTime': 0.0}
+    jacobian = None
+    if jacobianReuse:
+        jacobian = {'evaluations': 0, 'reuses': 0}
+        statistics.update({'jacobianEvaluations': 0, 'jacobianReuses': 0})
+    written = 0
+    if restart:
+        checkpoint = readCheckpoint(checkpointFileName)
+        changed = [name for name in CHECKPOINT_CONFIGURATION if checkpoint['configuration'].get(name) != configuration[name]]
+        if changed:
+            raise ValueError('The parameters '+', '.join(changed)+' of the run are not those of the checkpoint '+checkpointFileName)
+        written = checkpoint['step']
+        if written > np.size(time) or time[written-1] != checkpoint['time']:
+            raise ValueError('The boundary conditions do not contain the time step of the checkpoint '+checkpointFileName)
+        psi = checkpoint['psi']
+        statistics.update(checkpoint['statistics'])
+        if jacobianReuse:
+            jacobian['evaluations'] = statistics['jacobianEvaluations']
+            jacobian['reuses'] = statistics['jacobianReuses']
+    ## wall time of the previous runs of a restarted simulation
+    previousWallTime = statistics['wallTime']
+    [theta,capacity,K] = _hydraulicProperties(psi,grid,swrcModel)
+    ## ponding water of the previous time step, the initial one is the ponding
+    ## of psiIC at the soil surface and enters the column at the first time step
+    ponding = surfacePonding(psi)[0]
+    if not restart:
+        ponding[-1] = initialPonding(grid['psiIC'])
+
+    startPhase('writing')
+    if restart:
+        ncfile = Dataset(outputFileName,'a')
+    else:
+        ncfile = createOutputNetCDF(outputFileName,grid['eta'],grid['etaDual'],grid['psiIC'],description,topBCType,
+                                    bottomBCType)
+    block = _outputBlock(nCV+1,nCV+1,OUTPUT_BUFFER_SIZE)
+    if profile:
+        for phase in PHASES:
+            if 'profileTime_'+phase not in ncfile.variables:
+                var = ncfile.createVariable('profileTime_'+phase,'f8',('time',))
+                var.units = 's'
+                var.long_name = 'time spent in the phase '+phase+' (Richards1DProfiler) since the previous time step'
+            block['profileTime_'+phase] = np.zeros(OUTPUT_BUFFER_SIZE)
+        lastTimes = phaseTimes()
+    stopPhase()
+    try:
+        for step in range(written,np.size(time)):
+            qTop = -topValues[step]/1000/tTimestep
+            qBottom = bottomValues[step]/1000/tTimestep
+            psiTop = topValues[step]
+            psiBottom = bottomValues[step]
+            error = 0.0
+            elapsed = 0.0
+            convergence = {name: 0 for name in OUTPUT_CONVERGENCE_VARIABLES}
+            stepDelta = timeDelta
+            while elapsed < tTimestep:
+                dt = min(stepDelta,tTimestep-elapsed)
+                startPhase('assembly')
+                [lower,diag,upper,rhs,kInterfaces] = assembleSystem(K,psiTop,psiBottom,qTop,qBottom,grid,swrcModel,dt,
+                                                                     topBCType,bottomBCType,interfaceHydraulicCondType)
+                volumeOld = theta*deltaZ+ponding
+                stopPhase()
+                startPhase('newton')
+                [psiNew,outer,inner,residual] = nestedNewtonSolve(psi,volumeOld,lower,diag,upper,rhs,grid,swrcModel,psiStar,
+                                                                  newtonTolerance,nestedNewton,maxIterations,jacobian)
+                stopPhase()
+                linearSolves = inner if nestedNewton else outer
+                statistics['outerIterations'] += outer
+                statistics['innerIterations'] += inner
+                statistics['linearSolves'] += linearSolves
+                convergence['outerIterations'] += outer
+                convergence['innerIterations'] += inner
+                if profile:
+                    count('outerIterations',outer)
+                    count('innerIterations',inner)
+                    count('linearSolves',linearSolves)
+                if not residual < newtonTolerance:
+                    ## the time step is computed again in two halves from the previous state
+                    statistics['nonConvergedSteps'] += 1
+                    if profile:
+                        count('nonConvergedSteps')
+                    if dt <= timeDelta/2**MAX_TIME_STEP_SPLITS:
+                        raise RuntimeError('The Newton method did not converge at '+str(pd.to_datetime(time[step],unit='s'))
+                                           +' with a time step of '+str(dt)+' s (residual '+str(residual)+')')
+                    warnings.warn('The Newton method did not converge at '+str(pd.to_datetime(time[step],unit='s'))
+                                  +' with a time step of '+str(dt)+' s (residual '+str(residual)+'): the time step is split in two')
+                    stepDelta = dt/2
+                    continue
+                psi = psiNew
+                [theta,capacity,kNew] = _hydraulicProperties(psi,grid,swrcModel)
+                startPhase('fluxes')
+                [darcy,capillary,gravity] = interfaceFluxes(psi,kInterfaces,psiTop,psiBottom,qTop,qBottom,grid,topBCType,bottomBCType)
+                ponding = surfacePonding(psi)[0]
+                error += np.sum(theta*deltaZ+ponding-volumeOld)-dt*(darcy[0]-darcy[nCV])
+                stopPhase()
+                K = kNew
+                elapsed += dt
+                statistics['timeSteps'] += 1
+                if jacobianReuse:
+                    statistics['jacobianEvaluations'] = jacobian['evaluations']
+                    statistics['jacobianReuses'] = jacobian['reuses']
+                convergence['newtonResidual'] = max(convergence['newtonResidual'],residual)
+                convergence['nonConvexCells'] = max(convergence['nonConvexCells'],int(np.count_nonzero(psi > psiStar)))
+                if profile:
+                    count('timeSteps')
+
+            ## water suction at the soil surface: the boundary condition or the ponding
+            ## height, 0 when the top control volume is unsaturated (no ponding)
+            if topBCType == 'Top Dirichlet':
+                psiSurface = psiTop
+            else:
+                psiSurface = max(psi[nCV-1],0.0)
+            startPhase('fluxes')
+            [poreVelocities,celerities,kinematicRatio] = waveVelocities(psi,darcy,theta,capacity,K,grid,swrcModel)
+            stopPhase()
+            startPhase('buffering')
+            row = step-written
+            block['time'][row] = time[step]
+            block['psi'][row] = np.append(psi,psiSurface)
+            block['water_heigth'][row] = np.append(theta,max(psiSurface,0.0))
+            block['darcyVelocities'][row] = darcy
+            block['darcyVelocitiesCapillary'][row] = capillary
+            block['darcyVelocitiesGravity'][row] = gravity
+            block['poreVelocities'][row] = poreVelocities
+            block['celerities'][row] = celerities
+            block['kinematicRatio'][row] = kinematicRatio
+            block['error'][row] = error
+            block['topBC'][row] = topValues[step]
+            block['bottomBC'][row] = bottomValues[step]
+            block['runOff'][row] = 0.0
+            for name in OUTPUT_CONVERGENCE_VARIABLES:
+                block[name][row] = convergence[name]
+            statistics['maxError'] = max(statistics['maxError'],abs(error))
+            if profile:
+                ## time of the phases since the previous output time step, the
+                ## writing of a full buffer is reported at the next one
+                times = phaseTimes()
+                for phase in PHASES:
+                    block['profileTime_'+phase][row] = times[phase]-lastTimes[phase]
+                lastTimes = times
+            stopPhase()
+            checkpointDue = checkpointFileName is not None and (step+1) % checkpointInterval == 0
+            if row == OUTPUT_BUFFER_SIZE-1 or checkpointDue:
+                startPhase('writing')
+                writeOutputBlock(ncfile,written,block,row+1)
+                written += row+1
+                if checkpointDue:
+                    ## the checkpoint is written when the output file has all its time steps
+                    ncfile.sync()
+                    statistics['wallTime'] = previousWallTime+timer.perf_counter()-start
+                    writeCheckpoint(checkpointFileName,{'psi': psi, 'step': written, 'time': int(time[step]),
+                                                        'statistics': statistics, 'configuration': configuration})
+                stopPhase()
+        startPhase('writing')
+        writeOutputBlock(ncfile,written,block,np.size(time)-written)
+    finally:
+        ncfile.close()
+        stopPhase()
+
+    statistics['outputSteps'] = int(np.size(time))
+    statistics['wallTime'] = previousWallTime+timer.perf_counter()-start
+    if checkpointFileName is not None and np.size(time) > 0:
+        writeCheckpoint(checkpointFileName,{'psi': psi, 'step': int(np.size(time)), 'time': int(time[-1]),
+                                            'statistics': statistics, 'configuration': configuration})
+    print('*** SUCCESS writing!  '+outputFileName)
+    return statistics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve Richards equation 1D with the parameters of the .sim file')
+    parser.add_argument('gridFileName', help='grid NetCDF file created with RichardsMeshGen')
+    parser.add_argument('outputFileName', help='output NetCDF file')
+    parser.add_argument('--top', dest='topBCFileName', required=True, help='.csv time series of the top boundary condition')
+    parser.add_argument('--bottom', dest='bottomBCFileName', default=None, help='.csv time series of the bottom boundary condition')
+    parser.add_argument('--start', dest='startDate', required=True, help='start date yyyy-MM-dd HH:mm')
+    parser.add_argument('--end', dest='endDate', required=True, help='end date yyyy-MM-dd HH:mm')
+    parser.add_argument('--top-bc-type', dest='topBCType', default='Top Neumann', choices=TOP_BC_TYPES)
+    parser.add_argument('--bottom-bc-type', dest='bottomBCType', default='Bottom Free Drainage', choices=BOTTOM_BC_TYPES)
+    parser.add_argument('--interface-conductivity', dest='interfaceHydraulicCondType', default='max', choices=INTERFACE_CONDUCTIVITY_TYPES)
+    parser.add_argument('--newton-tolerance', dest='newtonTolerance', type=float, default=1e-11)
+    parser.add_argument('--nested-newton', dest='nestedNewton', type=int, default=1, choices=[0,1])
+    parser.add_argument('--t-timestep', dest='tTimestep', type=int, default=300, help='time step of the time series [s]')
+    parser.add_argument('--time-delta', dest='timeDelta', type=float, default=300, help='time step of the numerical scheme [s]')
+    parser.add_argument('--jacobian-reuse', dest='jacobianReuse', action='store_true',
+                        help='modified Newton: reuse the moisture capacity in the inner iterations')
+    parser.add_argument('--description', default='', help='description of the simulation')
+    parser.add_argument('--checkpoint', dest='checkpointFileName', default=None, help='.npz file of the checkpoints')
+    parser.add_argument('--checkpoint-interval', dest='checkpointInterval', type=int, default=OUTPUT_BUFFER_SIZE,
+                        help='output time steps between two checkpoints')
+    parser.add_argument('--restart', action='store_true', help='restart from the checkpoint and append to the output file')
+    parser.add_argument('--profile', action='store_true', help='time the phases of the run (Richards1DProfiler)')
+    parser.add_argument('--profile-output', dest='profileFileName', default=None, help='.json file of the profile report')
+    args = vars(parser.parse_args(argv))
+    args['profile'] = args['profile'] or args['profileFileName'] is not None
+
+    statistics = runRichards1D(**args)
+    report = statistics.pop('profile',None)
+    print(', '.join('{}: {}'.format(k,v) for k,v in statistics.items()))
+    if report is not None:
+        printProfile()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
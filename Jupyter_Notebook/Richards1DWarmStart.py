@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov  2 09:26:51 2026
+
+This is used to warm start a simulation from the state reached by another
+one (e.g. a spin-up): it writes a new grid NetCDF whose initial condition
+psiIC is the water suction of an output file at a given time.
+
+Only the time step needed is read from the output file. The geometry and the
+parameters are those of a grid file, that is copied as a whole and then only
+psiIC is overwritten. If the grid has different control volumes from the
+output file the profile is remapped conservatively: the water content of the
+output is averaged over the new control volumes, so that the water stored in
+the soil column does not change, and it is converted back to water suction
+with the SWRC of the new grid.
+
+It can be used from the command line:
+
+    python Richards1DWarmStart.py spinup.nc grid.nc gridWarm.nc --date "2018-01-01 00:00"
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DGrid import readRichardsGridNetCDF
+from Richards1DSWRC import computeSaturationDegree, GRAVITY, WATER_DENSITY
+
+
+## bounds [m] of the water suction of the unsaturated control volumes when the SWRC is inverted
+PSI_MIN = -1e6
+PSI_MAX = -1e-12
+
+## bisection iterations of the inversion of the SWRC, on log(-psi)
+INVERSION_ITERATIONS = 60
+
+
+def snapshotIndex(time,date=None):
+    '''
+    Finds the time step of an output file to use as initial condition.
+
+    time: unix time [s] of the time steps (variable time of the output file)
+    date: 'yyyy-MM-dd HH:mm' UTC, the last time step before or at date is
+        used, if None the last time step
+
+    return:
+
+    index of the time step
+    '''
+    if date is None:
+        return np.size(time)-1
+    unixTime = int(pd.Timestamp(date,tz='UTC').value//10**9)
+    index = int(np.searchsorted(time,unixTime,side='right'))-1
+    if index < 0:
+        raise ValueError('The output file starts after '+str(date))
+    return index
+
+
+def readOutputSnapshot(outputFileName,date=None):
+    '''
+    Reads the water suction and the water content of one time step of an
+    output file.
+
+    return:
+
+    time: unix time [s] of the time step read
+
+    psi: water suction of the control volumes and of the soil surface (variable psi)
+
+    theta: water content of the control volumes
+
+    dualDepths: coordinates of the interfaces of the control volumes (dual_depth)
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+    time = ncfile.variables['time'][:]
+    index = snapshotIndex(time,date)
+    dualDepths = np.array(ncfile.variables['dual_depth'][:],dtype=float)
+    nCV = np.size(dualDepths)-1
+    psi = np.array(ncfile.variables['psi'][index,:],dtype=float)
+    theta = np.array(ncfile.variables['water_heigth'][index,0:nCV],dtype=float)
+    ncfile.close()
+    return [int(time[index]),psi,theta,dualDepths]
+
+
+def _invertSaturationDegree(se,grid,swrcModel):
+    ## water suction with saturation degree se < 1, bisection on log(-psi)
+    low = np.full(np.size(se),np.log(-PSI_MAX))
+    high = np.full(np.size(se),np.log(-PSI_MIN))
+    for i in range(INVERSION_ITERATIONS):
+        middle = 0.5*(low+high)
+        wetter = computeSaturationDegree(-np.exp(middle),swrcModel,grid['par1SWRC'],grid['par2SWRC'],grid['par3SWRC'],
+                                         grid['par4SWRC'],grid['par5SWRC']) > se
+        ## Se decreases with -psi
+        low = np.where(wetter,middle,low)
+        high = np.where(wetter,high,middle)
+    return -np.exp(0.5*(low+high))
+
+
+def remapProfile(psi,theta,dualDepths,grid,swrcModel=None):
+    '''
+    Remaps a profile of water suction onto the control volumes of a grid,
+    conserving the water stored in the soil column.
+
+    The water content is integrated over the intersections of the control
+    volumes of the profile and of the grid. For each control volume of the
+    grid the mean water content is converted to water suction with its
+    SWRC. Saturated control volumes take the water suction of the specific
+    storage, if any, otherwise the water suction of the profile at their
+    centroid, not negative.
+
+    psi: water suction of the control volumes and of the soil surface
+    theta: water content of the control volumes
+    dualDepths: coordinates of the interfaces of the control volumes of the profile
+    grid: grid read with readRichardsGridNetCDF
+
+    return:
+
+    psiIC: water suction of the control volumes of the grid and of the soil surface
+    '''
+    if swrcModel is None:
+        swrcModel = grid['swrcModel']
+    if not np.allclose([dualDepths[0],dualDepths[-1]],[grid['etaDual'][0],grid['etaDual'][-1]]):
+        raise ValueError('The soil column of the output file and of the grid have different bottom or surface')
+
+    ## cumulative water volume from the bottom, linear within each control volume
+    water = np.concatenate(([0.0],np.cumsum(theta*np.diff(dualDepths))))
+    thetaNew = np.diff(np.interp(grid['etaDual'],dualDepths,water))/grid['deltaZ']
+
+    se = (thetaNew-grid['thetaR'])/(grid['thetaS']-grid['thetaR'])
+    saturated = se >= 1
+    psiIC = np.empty(np.size(grid['deltaZ'])+1)
+    unsaturated = ~saturated
+    if np.any(unsaturated):
+        unsaturatedGrid = {name: grid[name][unsaturated] for name in ['par1SWRC','par2SWRC','par3SWRC','par4SWRC','par5SWRC']}
+        psiIC[0:-1][unsaturated] = _invertSaturationDegree(np.maximum(se[unsaturated],0.0),unsaturatedGrid,swrcModel)
+    if np.any(saturated):
+        centroids = 0.5*(dualDepths[0:-1]+dualDepths[1:])
+        psiSaturated = np.maximum(np.interp(grid['eta'][0:-1],centroids,psi[0:-1]),0.0)
+        specificStorage = GRAVITY*WATER_DENSITY*(grid['alphaSpecificStorage']+grid['thetaS']*grid['betaSpecificStorage'])
+        storage = saturated & (specificStorage > 0)
+        psiSaturated[storage] = (thetaNew[storage]-grid['thetaS'][storage])/specificStorage[storage]
+        psiIC[0:-1][saturated] = psiSaturated[saturated]
+    psiIC[-1] = psi[-1]
+    return psiIC
+
+
+def writeGridFromOutput(outputFileName,gridFileName,newGridFileName,date=None,swrcModel=None):
+    '''
+    Writes a copy of a grid NetCDF with psiIC equal to the water suction of
+    an output file at a given time, remapped if the control volumes differ.
+
+    outputFileName: output NetCDF of Richards 1D
+    gridFileName: grid NetCDF with the geometry and the parameters of the new grid
+    newGridFileName: grid NetCDF written
+    date: 'yyyy-MM-dd HH:mm' UTC, see snapshotIndex
+
+    return:
+
+    time: unix time [s] of the time step of the output used
+    '''
+    [time,psi,theta,dualDepths] = readOutputSnapshot(outputFileName,date)
+
+    ncfile = Dataset(gridFileName,'r')
+    etaDual = np.array(ncfile.variables['etaDual'][:],dtype=float)
+    ncfile.close()
+    if np.size(etaDual) == np.size(dualDepths) and np.allclose(etaDual,dualDepths):
+        psiIC = psi
+    else:
+        psiIC = remapProfile(psi,theta,dualDepths,readRichardsGridNetCDF(gridFileName),swrcModel)
+
+    shutil.copyfile(gridFileName,newGridFileName)
+    ncfile = Dataset(newGridFileName,'r+')
+    ncfile.variables['psiIC'][:] = psiIC
+    ncfile.variables['psiIC'].long_name = 'initial condition for water suction, from '+str(outputFileName)+' at '+ \
+        pd.Timestamp(time,unit='s',tz='UTC').strftime('%Y-%m-%d %H:%M')
+    ncfile.close()
+    print('*** SUCCESS writing!  '+newGridFileName)
+    return time
+
+
+def _writeGridFromOutput(arguments):
+    return writeGridFromOutput(*arguments)
+
+
+def writeGridsFromOutputs(outputFileNames,gridFileNames,newGridFileNames,date=None,swrcModel=None,nWorkers=None):
+    '''
+    Runs writeGridFromOutput on a batch of output files in parallel.
+
+    gridFileNames: one grid file for all the output files or a list, one for each of them
+    nWorkers: number of processes, if None the number of CPUs
+
+    return:
+
+    list with the unix time [s] of the time step used for each output file
+    '''
+    if isinstance(gridFileNames,str):
+        gridFileNames = [gridFileNames]*len(outputFileNames)
+    arguments = [(outputFileName,gridFileName,newGridFileName,date,swrcModel)
+                 for outputFileName,gridFileName,newGridFileName in zip(outputFileNames,gridFileNames,newGridFileNames)]
+    if nWorkers == 1 or len(arguments) == 1:
+        return [_writeGridFromOutput(a) for a in arguments]
+    with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+        return list(executor.map(_writeGridFromOutput,arguments))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a grid NetCDF with the initial condition taken from an output file')
+    parser.add_argument('outputFileName', help='output NetCDF file')
+    parser.add_argument('gridFileName', help='grid NetCDF file with the geometry and the parameters')
+    parser.add_argument('newGridFileName', help='grid NetCDF file written')
+    parser.add_argument('--date', default=None, help='date yyyy-MM-dd HH:mm of the initial condition, the last time step if not given')
+    parser.add_argument('--swrc', dest='swrcModel', default=None, help='SWRC model, detected from the grid file if not given')
+    args = parser.parse_args(argv)
+
+    writeGridFromOutput(args.outputFileName,args.gridFileName,args.newGridFileName,args.date,args.swrcModel)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:05:17 2026
+
+This is used to check the mass balance of Richards 1D simulations.
+
+For every time step of an output file the water stored in the soil column
+(water content of the control volumes plus ponding at soil surface) is compared
+with the water that entered the column through the boundaries:
+
+    storage(t) - storage(0) = rainfall - runOff + bottomFlux
+
+The initial storage is computed from psiIC with the SWRC of the grid and the
+ponding of Richards1DGrid.initialPonding, the one the solver starts from, the
+following ones from the water content written by the solver.
+Output files are read in chunks of time steps so that long simulations are
+never loaded in memory, and a batch of files can be checked in parallel.
+
+It can be used from the command line as a gate on production runs:
+
+    python Richards1DWaterBalance.py output1.nc output2.nc --grid grid.nc --tolerance 1e-3
+
+the exit status is 1 if the relative error of at least one file exceeds the tolerance.
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+from Richards1DGrid import readRichardsGridNetCDF, initialPonding
+from Richards1DSWRC import gridWaterContent
+from Richards1DProfiler import startPhase, stopPhase
+
+
+def timeChunks(nTime,chunkSize):
+    '''
+    Yields the (start, stop) indices of consecutive chunks of time steps.
+    '''
+    for start in range(0,nTime,chunkSize):
+        yield start, min(start+chunkSize,nTime)
+
+
+def timeStepLengths(time):
+    '''
+    Computes the length [s] of the time step ending at each output time.
+    The first time step is assumed to be as long as the second one.
+    '''
+    time = np.asarray(time, dtype=float)
+    dt = np.empty_like(time)
+    if np.size(time) > 1:
+        dt[1:] = np.diff(time)
+        dt[0] = dt[1]
+    else:
+        dt[:] = np.nan
+    return dt
+
+
+def controlVolumeLengths(dualDepths):
+    '''
+    Computes the length of each control volume from the coordinates of the
+    control volume interfaces (dual_depth in the output file).
+    '''
+    return np.abs(np.diff(np.asarray(dualDepths, dtype=float)))
+
+
+def waterStorage(theta,psiSurface,deltaZ):
+    '''
+    Computes the water stored in the soil column [m]: water content of the
+    control volumes plus the ponding at soil surface.
+
+    theta: matrix (time, control volume) or vector of water content
+    psiSurface: water suction at soil surface, its positive part is the ponding depth
+    deltaZ: control volumes length
+    '''
+    return np.dot(theta,deltaZ) + np.maximum(psiSurface,0)
+
+
+def computeWaterBalance(outputFileName,gridFileName,swrcModel=None,chunkSize=10000):
+    '''
+    Computes the water balance of a simulation at every time step.
+
+    outputFileName: output NetCDF file of Richards 1D
+    gridFileName: grid NetCDF file used for the simulation
+    swrcModel: SWRC model, if None it is detected from the grid file
+    chunkSize: number of time steps read at once
+
+    return:
+
+    waterBalance: dataframe indexed by time (unix convention) with columns
+        storage: water stored in the soil column [m]
+        storageChange: storage - initial storage [m]
+        rainfall: cumulative rainfall height [m], the cumulative flux through
+            the soil surface (positive downward) with a Dirichlet top boundary condition
+        runOff: cumulative runoff [m]
+        bottomFlux: cumulative flux through the bottom, positive if inflow [m]
+        netInflow: rainfall - runOff + bottomFlux [m]
+        balanceError: storageChange - netInflow [m]
+        relativeError: balanceError over the total water exchanged through the boundaries [-]
+        solverError: cumulative absolute value of the volume error of the solver [m]
+        ponding: ponding depth at soil surface [m]
+
+    initialStorage: water stored in the soil column at the initial condition [m]
+
+    airVolume: volume of air in the soil column at the initial condition [m]
+    '''
+    grid = readRichardsGridNetCDF(gridFileName)
+
+    ncfile = Dataset(outputFileName,'r')
+    ncfile.set_auto_mask(False)
+
+    time = ncfile.variables['time'][:]
+    nTime = np.size(time)
+    dt = timeStepLengths(time)
+    deltaZ = controlVolumeLengths(ncfile.variables['dual_depth'][:])
+    nCV = np.size(deltaZ)
+    if nCV != np.size(grid['deltaZ']):
+        ncfile.close()
+        raise ValueError('The output file '+outputFileName+' has '+str(nCV)+' control volumes, the grid file '
+                         +gridFileName+' has '+str(np.size(grid['deltaZ'])))
+
+    ## initial condition: the last element is the soil surface
+    psiIC = ncfile.variables['psiIC'][:]
+    thetaIC = gridWaterContent(psiIC[0:nCV],grid,swrcModel)
+    initialStorage = waterStorage(thetaIC,initialPonding(psiIC),deltaZ)
+    airVolume = np.sum((grid['thetaS']-thetaIC)*deltaZ)
+
+    ## topBC is the rainfall height in mm over each time step, with a Dirichlet
+    ## top boundary condition it is water suction and the inflow is the flux through the soil surface
+    rainfallBC = getattr(ncfile.variables['topBC'],'units','mm') == 'mm'
+
+    storage = np.empty(nTime)
+    rainfall = np.empty(nTime)
+    runOff = np.empty(nTime)
+    bottomFlux = np.empty(nTime)
+    solverError = np.empty(nTime)
+    ponding = np.empty(nTime)
+
+    try:
+        for start,stop in timeChunks(nTime,chunkSize):
+            startPhase('reading')
+            try:
+                theta = ncfile.variables['water_heigth'][start:stop,0:nCV]
+                psiSurface = ncfile.variables['psi'][start:stop,nCV]
+                topBC = ncfile.variables['topBC'][start:stop]
+                ## Darcy velocities at the bottom and at the soil surface
+                darcy = ncfile.variables['darcyVelocities'][start:stop,[0,nCV]]
+                chunkRunOff = ncfile.variables['runOff'][start:stop]
+                error = ncfile.variables['error'][start:stop]
+            finally:
+                stopPhase()
+            storage[start:stop] = waterStorage(theta,psiSurface,deltaZ)
+            ponding[start:stop] = np.maximum(psiSurface,0)
+            if rainfallBC:
+                rainfall[start:stop] = topBC/1000
+            else:
+                rainfall[start:stop] = -darcy[:,1]*dt[start:stop]
+            runOff[start:stop] = chunkRunOff*dt[start:stop]
+            bottomFlux[start:stop] = darcy[:,0]*dt[start:stop]
+            solverError[start:stop] = np.abs(error)
+    finally:
+        ncfile.close()
+
+    rainfall = np.cumsum(rainfall)
+    runOff = np.cumsum(runOff)
+    bottomFlux = np.cumsum(bottomFlux)
+    storageChange = storage-initialStorage
+    netInflow = rainfall-runOff+bottomFlux
+    balanceError = storageChange-netInflow
+    exchanged = np.abs(rainfall)+np.abs(runOff)+np.abs(bottomFlux)
+    relativeError = np.full(nTime,np.nan)
+    np.divide(balanceError,exchanged,out=relativeError,where=exchanged>0)
+
+    waterBalance = pd.DataFrame({'storage': storage,
+                                 'storageChange': storageChange,
+                                 'rainfall': rainfall,
+                                 'runOff': runOff,
+                                 'bottomFlux': bottomFlux,
+                                 'netInflow': netInflow,
+                                 'balanceError': balanceError,
+                                 'relativeError': relativeError,
+                                 'solverError': np.cumsum(solverError),
+                                 'ponding': ponding},
+                                index=pd.Index(time,name='time'))
+
+    return [waterBalance,initialStorage,airVolume]
+
+
+def summarizeWaterBalance(outputFileName,gridFileName,swrcModel=None,chunkSize=10000,tolerance=1e-3,absoluteTolerance=1e-6):
+    '''
+    Computes the water balance of a simulation and returns its summary as a dictionary.
+
+    The check is passed if the final balance error is lower than absoluteTolerance [m]
+    or the final relative error is lower than tolerance [-].
+
+    For simulations with impervious bottom estimatedPonding is the ponding depth
+    expected at the end of the simulation: cumulative rainfall minus the volume
+    of air available at the initial condition minus runoff.
+    '''
+    [waterBalance,initialStorage,airVolume] = computeWaterBalance(outputFileName,gridFileName,swrcModel,chunkSize)
+    last = waterBalance.iloc[-1]
+    passed = bool(abs(last['balanceError']) <= absoluteTolerance or abs(last['relativeError']) <= tolerance)
+
+    return {'outputFileName': outputFileName,
+            'gridFileName': gridFileName,
+            'timeSteps': len(waterBalance),
+            'initialStorage': initialStorage,
+            'finalStorage': last['storage'],
+            'storageChange': last['storageChange'],
+            'rainfall': last['rainfall'],
+            'runOff': last['runOff'],
+            'bottomFlux': last['bottomFlux'],
+            'balanceError': last['balanceError'],
+            'maxBalanceError': waterBalance['balanceError'].abs().max(),
+            'relativeError': last['relativeError'],
+            'solverError': last['solverError'],
+            'airVolume': airVolume,
+            'finalPonding': last['ponding'],
+            'estimatedPonding': max(last['rainfall']-last['runOff']-airVolume,0),
+            'passed': passed}
+
+
+def _summarizeWaterBalance(arguments):
+    return summarizeWaterBalance(*arguments)
+
+
+def auditWaterBalance(outputFileNames,gridFileNames,swrcModel=None,chunkSize=10000,tolerance=1e-3,absoluteTolerance=1e-6,nWorkers=None):
+    '''
+    Checks the water balance of a batch of output files in parallel.
+
+    outputFileNames: list of output NetCDF files
+    gridFileNames: list of grid NetCDF files, one for each output file,
+        or a single file name if all the simulations share the same grid
+    nWorkers: number of processes, if None the number of CPUs
+
+    return:
+
+    summary: dataframe with one row for each output file, see summarizeWaterBalance
+    '''
+    if isinstance(gridFileNames,str):
+        gridFileNames = [gridFileNames]*len(outputFileNames)
+    if len(gridFileNames) != len(outputFileNames):
+        raise ValueError('Provide one grid file for each output file or a single grid file')
+
+    arguments = [(outputFileName,gridFileName,swrcModel,chunkSize,tolerance,absoluteTolerance)
+                 for outputFileName,gridFileName in zip(outputFileNames,gridFileNames)]
+
+    if nWorkers == 1 or len(arguments) == 1:
+        rows = [_summarizeWaterBalance(a) for a in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            rows = list(executor.map(_summarizeWaterBalance,arguments))
+
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the water balance of Richards 1D output files')
+    parser.add_argument('outputFileNames', nargs='+', help='output NetCDF files')
+    parser.add_argument('--grid', dest='gridFileNames', action='append', required=True,
+                        help='grid NetCDF file, once for all the output files or once for each of them')
+    parser.add_argument('--swrc', dest='swrcModel', default=None, help='SWRC model, detected from the grid file if not given')
+    parser.add_argument('--tolerance', type=float, default=1e-3, help='maximum relative error [-]')
+    parser.add_argument('--absolute-tolerance', dest='absoluteTolerance', type=float, default=1e-6, help='maximum absolute error [m]')
+    parser.add_argument('--chunk-size', dest='chunkSize', type=int, default=10000, help='number of time steps read at once')
+    parser.add_argument('--workers', dest='nWorkers', type=int, default=None, help='number of processes')
+    parser.add_argument('--summary', default=None, help='write the summary table to this .csv file')
+    args = parser.parse_args(argv)
+
+    gridFileNames = args.gridFileNames[0] if len(args.gridFileNames) == 1 else args.gridFileNames
+    summary = auditWaterBalance(args.outputFileNames,gridFileNames,args.swrcModel,args.chunkSize,
+                                args.tolerance,args.absoluteTolerance,args.nWorkers)
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(summary)
+    if args.summary is not None:
+        summary.to_csv(args.summary,index=False)
+
+    return 0 if summary['passed'].all() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
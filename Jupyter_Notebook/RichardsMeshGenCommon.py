@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 26 08:51:33 2026
+
+This is used by RichardsMeshGen*.py for the parts that do not depend on the SWRC
+model: the geometry of stretched and adaptive grids and the bokeh plots of the
+parameters of the grid.
+
+Besides the uniform control volumes of each layer of buildData, the grid can be
+built with the modes of MESH_MODES:
+    - stretched: in each layer the control volumes grow geometrically, with
+      ratio, from the soil surface and from the interfaces between layers,
+      where infiltration fronts are sharp, until they are maxSizeRatio times
+      the smallest one
+    - adaptive: the total number of control volumes is first divided among the
+      layers in proportion to their thickness over the range of water suction
+      where their water content changes (see frontLengths), so that layers with
+      a steep SWRC have more control volumes, and then stretched
+
+The parameters of a grid are usually piecewise constant, one value for each
+soil layer. They are collapsed into one segment for each run of control
+volumes with the same values, so that the size of the plot depends on the
+number of layers and not on the number of control volumes. All the tabs share
+the same ColumnDataSource.
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import numpy as np
+
+from Richards1DSWRC import layerSWRCParameters, computeMoistureCapacity
+
+
+MESH_MODES = ['uniform', 'stretched', 'adaptive']
+
+## water suction [m] where the moisture capacity of a layer is evaluated to find its maximum
+CAPACITY_PSI = -np.logspace(-4,4,801)
+
+## a parameter is collapsed into segments if it has at most this fraction of runs per control volume
+MAX_RUNS_FRACTION = 0.5
+
+
+def parameterRuns(values):
+    '''
+    Returns the index of the first control volume of each run of equal
+    values, for a vector or for a matrix (parameter, control volume): in this
+    case a run ends where at least one of the parameters changes.
+    '''
+    values = np.atleast_2d(np.asarray(values,dtype=float))
+    changes = np.any(values[:,1:] != values[:,:-1],axis=0)
+    return np.concatenate([[0],np.flatnonzero(changes)+1])
+
+
+def parameterSources(eta,parameters):
+    '''
+    Splits the parameters in groups that share the same ColumnDataSource data.
+
+    eta: coordinates of the control volumes centroids, the parameter values
+        are given at eta[0:np.size(values)]
+    parameters: dictionary name: vector of values
+
+    return:
+
+    sources: list of [names, data], where data is a dictionary of columns:
+        yStart, yEnd (coordinates of the first and last control volume of each
+        segment) and one column for each name. Parameters with the same length
+        that are piecewise constant share the same segments, the others are
+        given one segment (of length zero) for each control volume.
+    '''
+    eta = np.asarray(eta,dtype=float)
+    groups = {}
+    for name,values in parameters.items():
+        values = np.asarray(values,dtype=float)
+        collapse = np.size(parameterRuns(values)) <= MAX_RUNS_FRACTION*np.size(values)
+        groups.setdefault((np.size(values),collapse),[]).append(name)
+
+    sources = []
+    for (size,collapse),names in groups.items():
+        matrix = np.vstack([np.asarray(parameters[name],dtype=float) for name in names])
+        start = parameterRuns(matrix) if collapse else np.arange(size)
+        end = np.append(start[1:]-1,size-1)
+        data = {'yStart': eta[start], 'yEnd': eta[end]}
+        for i,name in enumerate(names):
+            data[name] = matrix[i,start]
+        sources.append([names,data])
+    return sources
+
+
+def stretchedSizes(length,nCells,refineBottom,refineTop,ratio=1.1,maxSizeRatio=50.0,halfBottom=False,halfTop=False):
+    '''
+    Computes the lengths of the control volumes of a segment of the soil column,
+    from the bottom to the top. The lengths grow geometrically with ratio from
+    the refined ends, up to maxSizeRatio times the smallest one. halfBottom and
+    halfTop halve the control volume at that end, for measurement points
+    that are the centroid of a control volume shared with the next segment.
+    '''
+    k = np.arange(nCells)
+    distance = np.full(nCells,np.inf)
+    if refineBottom:
+        distance = np.minimum(distance,k)
+    if refineTop:
+        distance = np.minimum(distance,nCells-1-k)
+    weights = np.ones(nCells)
+    refined = np.isfinite(distance)
+    weights[refined] = np.minimum(ratio**distance[refined],maxSizeRatio)
+    weights[~refined] = np.max(weights) if np.any(refined) else 1.0
+    if halfBottom:
+        weights[0] *= 0.5
+    if halfTop:
+        weights[-1] *= 0.5
+    return length*weights/np.sum(weights)
+
+
+def buildStretchedData(data,ratio=1.1,maxSizeRatio=50.0,refineBottom=False):
+    '''
+    Creates the geometry of the 1D grid with the control volumes of each
+    layer stretched from the soil surface and from the interfaces between
+    layers, see stretchedSizes. With ratio = 1 the control volumes of each
+    segment are uniform. The uniform buildData of the RichardsMeshGen modules
+    differs next to a measurement point, where its control volumes are a
+    fraction of a percent larger than the others of the segment (about 1e-5 m
+    with 160 control volumes per meter).
+
+    data is a pandas dataframe, with the N control volumes of each segment of
+    the soil column between two rows.
+    refineBottom: stretch also from the bottom of the soil column, e.g. for a
+        water table at the bottom
+
+    return:
+
+    eta, etaDual, length, spaceDelta, z, zDual as buildData
+    '''
+    coordinates = np.asarray(data['eta'],dtype=float)
+    types = list(data['Type'])
+    nRows = len(types)
+    ## the soil surface and the interfaces between layers are refined
+    refined = [i == 0 or (types[i] == 'L' and i < nRows-1) for i in range(nRows)]
+    refined[nRows-1] = refineBottom
+
+    etaDual = [coordinates[nRows-1]]
+    for i in range(nRows-1,0,-1):
+        sizes = stretchedSizes(coordinates[i-1]-coordinates[i],int(data['N'].iloc[i-1]),refined[i],refined[i-1],ratio,maxSizeRatio,
+                               halfBottom=types[i] == 'M',halfTop=types[i-1] == 'M')
+        interfaces = coordinates[i]+np.cumsum(sizes)
+        interfaces[-1] = coordinates[i-1]
+        ## a measurement point is the centroid of a control volume, not an interface
+        if types[i-1] == 'M':
+            interfaces = interfaces[0:-1]
+        etaDual.extend(interfaces)
+    etaDual = np.array(etaDual)
+
+    length = np.diff(etaDual)
+    eta = 0.5*(etaDual[0:-1]+etaDual[1:])
+    for i in range(nRows):
+        if types[i] == 'M':
+            eta[np.searchsorted(etaDual,coordinates[i])-1] = coordinates[i]
+
+    spaceDelta = np.concatenate(([eta[0]-etaDual[0]],np.diff(eta),[etaDual[-1]-eta[-1]]))
+    eta = np.append(eta,coordinates[0])
+    z = eta-coordinates[nRows-1]
+    zDual = etaDual-coordinates[nRows-1]
+    return [eta,etaDual,length,spaceDelta,z,zDual]
+
+
+def frontLengths(data,swrcModel=None):
+    '''
+    Computes for each segment of the soil column between two rows of data the
+    range of water suction where the water content changes, (thetaS -
+    thetaR) over the maximum moisture capacity of its layer. The smaller it
+    is, the steeper the SWRC and the sharper the wetting fronts.
+
+    return:
+
+    vector of lengths [m], one for each segment from the top to the bottom
+    '''
+    parameters = layerSWRCParameters(data,swrcModel)
+    lengths = []
+    for layer in range(np.size(parameters['thetaS'])):
+        capacity = computeMoistureCapacity(CAPACITY_PSI,parameters['swrcModel'],parameters['thetaS'][layer],parameters['thetaR'][layer],
+                                           parameters['par1SWRC'][layer],parameters['par2SWRC'][layer],parameters['par3SWRC'][layer],
+                                           parameters['par4SWRC'][layer],parameters['par5SWRC'][layer])
+        lengths.append((parameters['thetaS'][layer]-parameters['thetaR'][layer])/np.max(capacity))
+    ## the parameters of a segment are those of the last layer above it
+    layerOfSegment = np.cumsum(np.asarray(data['Type'] == 'L'))[0:-1]-1
+    return np.asarray(lengths)[layerOfSegment]
+
+
+def adaptiveCellNumbers(data,nCells=None,swrcModel=None,minCells=2):
+    '''
+    Divides nCells control volumes among the segments of the soil column
+    in proportion to their thickness over their frontLengths, with at least
+    minCells for each segment.
+
+    nCells: total number of control volumes, by default the sum of the column N
+
+    return:
+
+    vector with the number of control volumes of each segment, from the top,
+    to use as the column N of data
+    '''
+    thickness = -np.diff(np.asarray(data['eta'],dtype=float))
+    nSegments = np.size(thickness)
+    if nCells is None:
+        nCells = int(np.sum(np.asarray(data['N'],dtype=float)[0:nSegments]))
+    if nCells < minCells*nSegments:
+        raise ValueError('nCells must be at least '+str(minCells*nSegments))
+    weights = thickness/frontLengths(data,swrcModel)
+    share = minCells+(nCells-minCells*nSegments)*weights/np.sum(weights)
+    cells = np.floor(share).astype(int)
+    ## largest remainders
+    cells[np.argsort(cells-share)[0:nCells-np.sum(cells)]] += 1
+    return cells
+
+
+def meshCellNumbers(data,mode='uniform',nCells=None,swrcModel=None):
+    '''
+    Returns the number of control volumes of each segment of the grid of a
+    mode, the column N of data for the uniform and stretched modes,
+    adaptiveCellNumbers for the adaptive one. data is not modified: use
+    data.assign(N=meshCellNumbers(...)) with setInitialCondition.
+
+    return:
+
+    vector N, with the value of the bottom row of data as the last element
+    '''
+    if mode == 'adaptive':
+        return np.append(adaptiveCellNumbers(data,nCells,swrcModel),data['N'].iloc[-1])
+    return np.asarray(data['N'])
+
+
+def buildMeshData(data,mode='uniform',ratio=1.1,maxSizeRatio=50.0,refineBottom=False,nCells=None,swrcModel=None):
+    '''
+    Creates the geometry of the 1D grid with one of MESH_MODES, with the
+    control volumes of meshCellNumbers. The uniform mode is buildStretchedData
+    with ratio = 1, see its note on measurement points. data is not modified.
+
+    return:
+
+    eta, etaDual, length, spaceDelta, z, zDual as buildData
+    '''
+    if mode not in MESH_MODES:
+        raise ValueError('Mesh mode not available: '+str(mode)+'. Available modes: '+', '.join(MESH_MODES))
+    data = data.copy()
+    data['N'] = meshCellNumbers(data,mode,nCells,swrcModel)
+    if mode == 'uniform':
+        return buildStretchedData(data,1.0)
+    return buildStretchedData(data,ratio,maxSizeRatio,refineBottom)
+
+
+def buildParameterTabs(parameters,eta,labelSize,titleSize,axisTicksSize,lineWidth,tabs=None):
+    '''
+    Builds the bokeh tabs with the profiles of the parameters of a grid.
+
+    parameters: list of [name, values, tab title, plot title, x axis label], one for each tab
+    tabs: names or tab titles of the tabs to build, by default all of them.
+        Only the selected parameters are embedded in the plot.
+
+    return:
+
+    bokeh Tabs
+    '''
+    from bokeh.plotting import figure
+    from bokeh.models import ColumnDataSource, HoverTool
+    from bokeh.models.widgets import Panel, Tabs
+
+    if tabs is not None:
+        parameters = [p for p in parameters if p[0] in tabs or p[2] in tabs]
+    sources = parameterSources(eta,{p[0]: p[1] for p in parameters})
+    sourceOf = {}
+    for names,data in sources:
+        source = ColumnDataSource(data=data)
+        for name in names:
+            sourceOf[name] = source
+
+    panels = []
+    for i,(name,values,tabTitle,plotTitle,xLabel) in enumerate(parameters):
+        color = 'blue' if i == 0 else 'red'
+        hover = HoverTool(tooltips=[(name, '@'+name), ('\u03b7 [m]', '@yStart{0.000} to @yEnd{0.000}')])
+        p = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
+                   title="Mouse over the dots")
+        p.segment(x0=name, y0='yStart', x1=name, y1='yEnd', source=sourceOf[name], color=color, line_width=max(lineWidth,1))
+        p.scatter(x=name, y='yStart', source=sourceOf[name], color=color, line_width=lineWidth)
+        p.scatter(x=name, y='yEnd', source=sourceOf[name], color=color, line_width=lineWidth)
+        p.xaxis.axis_label = xLabel
+        p.xaxis.axis_label_text_font_size = str(labelSize) + "px"
+        p.yaxis.axis_label = '\u03b7 [m]'
+        p.yaxis.axis_label_text_font_size = str(labelSize) + "px"
+        p.xaxis.major_label_text_font_size = str(axisTicksSize) + "px"
+        p.yaxis.major_label_text_font_size = str(axisTicksSize) + "px"
+        p.title.text = plotTitle
+        p.title.align = "center"
+        p.title.text_font_size = str(titleSize) + "px"
+        panels.append(Panel(child=p, title=tabTitle))
+
+    return Tabs(tabs=panels)
+
+
+def buildMeshPlot(data,eta,etaDual,labelSize,titleSize,legendSize,lineWidth):
+    '''
+    Builds the bokeh plot of the grid geometry: control volumes centroids and
+    interfaces, soil layers and measurement points of the .csv file.
+
+    return:
+
+    bokeh figure
+    '''
+    from bokeh.plotting import figure
+    from bokeh.models import ColumnDataSource, HoverTool
+
+    hover = HoverTool(tooltips=[
+        ("(x,y)", "($x, $y)"),
+    ])
+
+    p1 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
+           title="Mouse over the dots",x_range=(-0.7, 0.7),output_backend="webgl")
+    centroids = ColumnDataSource(data={'x': np.zeros(np.size(eta)), 'eta': np.asarray(eta,dtype=float)})
+    interfaces = ColumnDataSource(data={'x': np.zeros(np.size(etaDual)), 'eta': np.asarray(etaDual,dtype=float)})
+    p1.scatter(x='x', y='eta', source=centroids, color="blue", marker='circle', legend_label='Centroids')
+    p1.scatter(x='x', y='eta', source=interfaces, color="fuchsia", marker='cross', legend_label='CV interface')
+
+    ## the last row is the bottom of the soil column
+    coordinates = np.asarray(data['eta'],dtype=float)
+    isLayer = np.array(data['Type'] == 'L')
+    isLayer[-1] = True
+    for mask,color,label in [(isLayer,'red','layer'),(np.asarray(data['Type'] == 'M'),'green','meas. point')]:
+        if np.any(mask):
+            lines = ColumnDataSource(data={'y': coordinates[mask]})
+            p1.segment(x0=-0.2, y0='y', x1=0.2, y1='y', source=lines, color=color, line_width=lineWidth, legend_label=label)
+
+    p1.yaxis.axis_label = '\u03b7 [m]'
+    p1.yaxis.axis_label_text_font_size = str(labelSize) + "px"
+    p1.title.text = 'Grid geometry'
+    p1.title.align = "center"
+    p1.title.text_font_size = str(titleSize) + "px"
+
+    p1.legend.location = "top_left"
+    p1.legend.label_text_font_size = str(legendSize) + "px"
+    p1.legend.click_policy="hide"
+    return p1
+
+
+def buildProfilePlot(x,eta,xLabel,title,labelSize,titleSize):
+    '''
+    Builds the bokeh plot of a profile, e.g. the initial condition, drawn with
+    the WebGL backend from a single ColumnDataSource.
+
+    return:
+
+    bokeh figure
+    '''
+    from bokeh.plotting import figure
+    from bokeh.models import ColumnDataSource, HoverTool
+
+    hover = HoverTool(tooltips=[
+        ("(x,y)", "($x, $y)"),
+    ])
+
+    p1 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
+           title="Mouse over the dots",output_backend="webgl")
+    source = ColumnDataSource(data={'x': np.asarray(x,dtype=float), 'eta': np.asarray(eta,dtype=float)})
+    p1.scatter(x='x', y='eta', source=source, color="blue")
+
+    p1.xaxis.axis_label = xLabel
+    p1.xaxis.axis_label_text_font_size = str(labelSize) + "px"
+    p1.yaxis.axis_label = '\u03b7 [m]'
+    p1.yaxis.axis_label_text_font_size = str(labelSize) + "px"
+    p1.title.text = title
+    p1.title.align = "center"
+    p1.title.text_font_size = str(titleSize) + "px"
+    return p1
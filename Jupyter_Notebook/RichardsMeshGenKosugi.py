@@ -7,23 +7,16 @@ This is used to create Richards 1D mesh using Kosugi SWRC
 @author: Niccolo` Tubini and Riccardo Rigon
 @license: creative commons 4.0
 """
-import pandas as pd
 import numpy as np
 
-from netCDF4 import Dataset
+from RichardsMeshGenCommon import buildParameterTabs, buildMeshPlot, buildProfilePlot, buildMeshData
+from RichardsNotebook import outputNotebook
 
-from bokeh.io import output_notebook,output_file, show
-from bokeh.plotting import figure
-from bokeh.layouts import gridplot
-from bokeh.models.widgets import Panel, Tabs
-#from bokeh.io import output_file, show
-#from bokeh.plotting import figure
-from bokeh.models import BoxSelectTool
-from bokeh.models import HoverTool
+## netCDF4 and bokeh are imported by the functions that use them, so that
+## building a mesh does not pay for the plotting libraries
 
-output_notebook()
 
-def buildData(data):
+def buildData(data,mode='uniform',ratio=1.1,maxSizeRatio=50.0,refineBottom=False,nCells=None):
     '''
     This function creates the geometry of 1D grid for a finite volume numerical 
     scheme.
@@ -53,7 +46,14 @@ def buildData(data):
     zDual: vertical coordinate of control volumes interfaces positive upward with 
         origin set at soil column bottom.  
         
+    mode: 'uniform' control volumes in each layer, or 'stretched' and
+        'adaptive' (ratio, maxSizeRatio, refineBottom, nCells), see
+        RichardsMeshGenCommon. data is not modified: in the adaptive mode the
+        number of control volumes of each segment is
+        RichardsMeshGenCommon.meshCellNumbers.
     '''
+    if mode != 'uniform':
+        return buildMeshData(data,mode,ratio,maxSizeRatio,refineBottom,nCells,'Kosugi')
     
     ## list containing centroids coordinates
     eta = [] 
@@ -115,37 +115,12 @@ def buildData(data):
 
 
 def showMesh(data,z,eta,etaDual,labelSize,titleSize,legendSize,axisTicksSize,lineWidth):
-    x=np.zeros(np.size(z))
+    from bokeh.io import show
+    outputNotebook()
 
-    hover = HoverTool(tooltips=[
-        ("(x,y)", "($x, $y)"),
-    ])
-
-    p1 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-           title="Mouse over the dots",x_range=(-0.7, 0.7))
-    p1.scatter(x,eta, color="blue", marker='circle',legend='Centroids')
-    p1.scatter(x,etaDual, color="fuchsia", marker='cross',legend='CV interface')
-    for i in range(0,np.size(data.index)):
-        if data['Type'][i] == 'L':
-            c = 'red'
-            l = 'layer'
-        elif data['Type'][i] == 'M':
-            c = 'green'
-            l = 'meas. point'
-        
-        p1.line([-0.2,0.2], [data['eta'][i],data['eta'][i]], color=c,line_width=lineWidth,legend=l)
-    p1.line([-0.2,0.2], [data['eta'][data['eta'].size-1],data['eta'][data['eta'].size-1]], color="red",line_width=lineWidth,legend='layer')
-
-    p1.yaxis.axis_label = '\u03b7 [m]'
-    p1.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p1.title.text = 'Grid geometry'
-    p1.title.align = "center"
-    p1.title.text_font_size = str(titleSize) + "px"
+    show(buildMeshPlot(data,eta,etaDual,labelSize,titleSize,legendSize,lineWidth))
+    return
 
-    p1.legend.location = "top_left"
-    p1.legend.label_text_font_size = str(legendSize) + "px"
-    p1.legend.click_policy="hide"
-    show(p1)     
 
 
 ## This at the ends just gived the coordinate of the measured point and the value of psi measured
@@ -232,46 +207,18 @@ def setInitialCondition(data,eta,z,icType):
 
 ## plot initial condition
 def showInitialCondition(psiIC,eta,icType,labelSize,titleSize,legendSize,axisTicksSize,lineWidth):
-    hover = HoverTool(tooltips=[
-        ("(x,y)", "($x, $y)"),
-    ])
-
-    p1 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-           title="Mouse over the dots")
-    p1.scatter(psiIC,eta, color="blue")
-
-    p1.xaxis.axis_label = '\u03C8 [m]'
-    p1.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-
-    p1.yaxis.axis_label = '\u03b7 [m]'
-    p1.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p1.title.text = 'Initial condition for \u03C8: '+icType
-    p1.title.align = "center"
-    p1.title.text_font_size = str(titleSize) + "px"
-    show(p1)
+    from bokeh.io import show
+    outputNotebook()
+
+    show(buildProfilePlot(psiIC,eta,'\u03C8 [m]','Initial condition for \u03C8: '+icType,labelSize,titleSize))
     return    
     
 ## plot total head 
 def showTotalHead(psiIC,z,eta,icType,labelSize,titleSize,legendSize,axisTicksSize,lineWidth):
-    hover = HoverTool(tooltips=[
-        ("(x,y)", "($x, $y)"),
-    ])
-
-    p1 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-           title="Mouse over the dots")
-    p1.scatter(psiIC+z,eta, color="blue")
-
-    p1.xaxis.axis_label = 'h [m]'
-    p1.xaxis.axis_label_text_font_size = str(labelSize) + "px"
+    from bokeh.io import show
+    outputNotebook()
 
-    p1.yaxis.axis_label = '\u03b7  [m]'
-    p1.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p1.title.text = 'Total hydraulic head:'+icType
-    p1.title.align = "center"
-    p1.title.text_font_size = str(titleSize) + "px"
-
-
-    show(p1)
+    show(buildProfilePlot(np.asarray(psiIC)+np.asarray(z),eta,'h [m]','Total hydraulic head:'+icType,labelSize,titleSize))
     return
 
 ## set parameters
@@ -357,128 +304,33 @@ This function allows to plot the distribution of SWRC parameters in the soil col
 These plots are drawn with bokeh library https://bokeh.pydata.org/en/latest/
 and they are interactive.
 '''
-def showParameters(thetaS,thetaR,Ks,alphaSpecificStorage,betaSpecificStorage, psiMedian,sigma, psiStar,et,eta,labelSize,titleSize,axisTicksSize,lineWidth):
-    hover = HoverTool(tooltips=[
-            ("(x,y)", "($x, $y)"),
-    ])
-
-    p1 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots")
-    
-    p1.scatter(thetaS, eta[0:np.size(eta)-1], color="blue", line_width=lineWidth)
-    p1.xaxis.axis_label = ' water content at saturation [-]'
-    p1.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p1.yaxis.axis_label = '\u03b7 [m]'
-    p1.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p1.title.text = 'Water content at saturation'
-    p1.title.align = "center"
-    p1.title.text_font_size = str(titleSize) + "px"
-    tab1 = Panel(child=p1, title="Theta_s")
-    
-    p2 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots")
-    p2.scatter(thetaR, eta[0:np.size(eta)-1],line_width=lineWidth, color="red")
-    p2.xaxis.axis_label = 'residual water content [-]'
-    p2.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p2.yaxis.axis_label = '\u03b7 [m]'
-    p2.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p2.title.text = 'Residual water content'
-    p2.title.align = "center"
-    p2.title.text_font_size = str(titleSize) + "px"
-    tab2 = Panel(child=p2, title="Theta_r")
-    
-    p3 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots" )
-    p3.scatter(Ks, eta[0:np.size(eta)-1],line_width=lineWidth, color="red")
-    p3.xaxis.axis_label = 'Ks [m/s]'
-    p3.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p3.yaxis.axis_label = '\u03b7 [m]'
-    p3.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p3.title.text = 'Saturated hydraulic conductivity'
-    p3.title.align = "center"
-    p3.title.text_font_size = str(titleSize) + "px"
-    tab3= Panel(child=p3, title="Ks")
-    
-    p4 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots" )
-    p4.scatter(psiMedian, eta[0:np.size(eta)-1],line_width=lineWidth, color="red")
-    p4.xaxis.axis_label = ' \u03C8_m [m] '
-    p4.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p4.yaxis.axis_label = '\u03b7 [m]'
-    p4.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p4.title.text = 'Suction distribution \n psi median'
-    p4.title.align = "center"
-    p4.title.text_font_size = str(titleSize) + "px"
-    tab4= Panel(child=p4, title="r")
-    
-    p5 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots" )
-    p5.scatter(sigma, eta[0:np.size(eta)-1],line_width=lineWidth, color="red")
-    p5.xaxis.axis_label = '\u03C3 [m] '
-    p5.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p5.yaxis.axis_label = '\u03b7 [m]'
-    p5.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p5.title.text = 'Suction distribution \n standard deviation'
-    p5.title.align = "center"
-    p5.title.text_font_size = str(titleSize) + "px"
-    tab5= Panel(child=p5, title="\u03C3")
-    
-    p6 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots" )
-    p6.scatter(psiStar, eta[0:np.size(eta)-1],line_width=lineWidth, color="red")
-    p6.xaxis.axis_label = '\u03C8* [m] '
-    p6.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p6.yaxis.axis_label = '\u03b7 [m]'
-    p6.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p6.title.text = 'Kosugi \u03C8*'
-    p6.title.align = "center"
-    p6.title.text_font_size = str(titleSize) + "px"
-    tab6= Panel(child=p6, title="\u03C8*")
-   
-    p7 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots" )
-    p7.scatter(alphaSpecificStorage, eta[0:np.size(eta)-1],line_width=lineWidth, color="red")
-    p7.xaxis.axis_label = '\u03b1 [1/Pa]'
-    p7.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p7.yaxis.axis_label = '\u03b7 [m]'
-    p7.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p7.title.text = 'Compressibility of soil'
-    p7.title.align = "center"
-    p7.title.text_font_size = str(titleSize) + "px"
-    tab7= Panel(child=p7, title="\u03b1")
-    
-    p8 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots" )
-    p8.scatter(betaSpecificStorage, eta[0:np.size(eta)-1],line_width=lineWidth, color="red")
-    p8.xaxis.axis_label = '\u03b2 [1/Pa]'
-    p8.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p8.yaxis.axis_label = '\u03b7 [m]'
-    p8.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p8.title.text = 'Compressibility of water'
-    p8.title.align = "center"
-    p8.title.text_font_size = str(titleSize) + "px"
-    tab8= Panel(child=p8, title="\u03b2")
-    
-    p9 = figure(plot_width=600, plot_height=600,tools=['pan,wheel_zoom,box_zoom,reset',hover],
-            title="Mouse over the dots" )
-    p9.scatter(et, eta,line_width=lineWidth, color="red")
-    p9.xaxis.axis_label = 'et coeff. [1/s]'
-    p9.xaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p9.yaxis.axis_label = '\u03b7 [m]'
-    p9.yaxis.axis_label_text_font_size = str(labelSize) + "px"
-    p9.title.text = 'Source sink term'
-    p9.title.align = "center"
-    p9.title.text_font_size = str(titleSize) + "px"
-    tab9= Panel(child=p9, title="et")
-    
-    tabs = Tabs(tabs=[ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 ])
-    show(tabs)
-    return
+def showParameters(thetaS,thetaR,Ks,alphaSpecificStorage,betaSpecificStorage, psiMedian,sigma, psiStar,et,eta,labelSize,titleSize,axisTicksSize,lineWidth,tabs=None):
+    '''
+    Shows the parameters of the grid, one tab for each parameter. Layers with
+    constant parameters are drawn as segments, see RichardsMeshGenCommon.
+
+    tabs: names of the parameters (or tab titles) to show, by default all of them
+    '''
+    from bokeh.io import show
+    outputNotebook()
+
+    parameters = [['thetaS', thetaS, "Theta_s", 'Water content at saturation', ' water content at saturation [-]'],
+                  ['thetaR', thetaR, "Theta_r", 'Residual water content', 'residual water content [-]'],
+                  ['Ks', Ks, "Ks", 'Saturated hydraulic conductivity', 'Ks [m/s]'],
+                  ['psiMedian', psiMedian, "r", 'Suction distribution \n psi median', ' \u03C8_m [m] '],
+                  ['sigma', sigma, "\u03C3", 'Suction distribution \n standard deviation', '\u03C3 [m] '],
+                  ['psiStar', psiStar, "\u03C8*", 'Kosugi \u03C8*', '\u03C8* [m] '],
+                  ['alphaSpecificStorage', alphaSpecificStorage, "\u03b1", 'Compressibility of soil', '\u03b1 [1/Pa]'],
+                  ['betaSpecificStorage', betaSpecificStorage, "\u03b2", 'Compressibility of water', '\u03b2 [1/Pa]'],
+                  ['et', et, "et", 'Source sink term', 'et coeff. [1/s]']]
+    show(buildParameterTabs(parameters,eta,labelSize,titleSize,axisTicksSize,lineWidth,tabs))
     
 '''
 Save all grid data in a NetCDF file
 '''
 def writeGridNetCDF(eta,etaDual,z,zDual,spaceDelta,deltaZ,psiIC,thetaS,thetaR,Ks,alphaSpecificStorage,betaSpecificStorage,psiMedian,sigma,par3SWRC,par4SWRC,par5SWRC,psiStar,par7SWRC,par8SWRC,et,outputFileName,outputTitle,outputInstitution,outputSummary,folderPath,outputDate,inputFileName):
+    from netCDF4 import Dataset
+
     # the output array to write will be nx x ny
     dim = np.size(eta);
     dim1 = np.size(thetaS)
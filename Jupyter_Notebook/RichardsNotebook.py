@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov  9 09:12:40 2026
+
+This is used by RichardsMeshGen*.py and Richards1DOutput.py to send the bokeh
+plots to the notebook. It imports nothing else of the repository, so that the
+output reader does not load the mesh generator and vice versa.
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+
+
+_notebookOutput = False
+
+def outputNotebook():
+    '''
+    Sends bokeh output to the notebook, the first time it is called and only
+    when running inside IPython: in scripts output_notebook replaces the
+    __main__ module and breaks multiprocessing.
+    '''
+    global _notebookOutput
+    if _notebookOutput:
+        return
+    try:
+        get_ipython
+    except NameError:
+        return
+    from bokeh.io import output_notebook
+    output_notebook()
+    _notebookOutput = True
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 30 10:12:35 2026
+
+This is used to choose timeDelta, grid resolution and newtonTolerance: the
+solver is run on cases with a known answer at several resolutions and the
+error is reported against the wall time, so that the cheapest configuration
+meeting an accuracy target can be picked.
+
+The cases are a homogeneous soil column (loam, Van Genuchten, Carsel and
+Parrish 1988) with the water table at the bottom (Bottom Dirichlet psi = 0)
+and a constant flux at the top (Top Neumann):
+    - hydrostatic: no flux, from a constant initial condition the column
+      drains to hydrostatic equilibrium psi = -z
+    - steadyInfiltration: rainfall 0.2 Ks, the steady profile solves
+      dpsi/dz = q/K(psi) - 1
+    - steadyEvaporation: evaporation from the water table, the same equation
+      with q < 0
+The steady profiles are computed by quadrature (steadyProfile), and the
+steadyError of a run is the maximum difference between psi at the end of the
+run and the steady profile. The analytical solutions of the linearized
+equation (Warrick 1975, Srivastava and Yeh 1991) need the exponential
+(Gardner) model, that is not available in the grid files, so the transient
+accuracy is measured against the run with the finest grid, the shortest
+timeDelta and the smallest newtonTolerance: transientError is the maximum
+difference of psi, interpolated on the centroids of the coarsest grid, over
+all the output time steps.
+
+For each case and resolution the grid NetCDF is written with
+RichardsMeshGenVanGenuchten.py and the boundary conditions with
+Richards1DSolver.writeOMSTimeSeries, the runs are done in parallel. With more
+than one process the wall times include the contention of the processes:
+use --workers 1 for accurate timings.
+
+    python benchmarks/benchmarkAnalytical.py --cells 20 40 80 160 --time-deltas 900 3600 21600 86400 --target 1e-3 --plot errorCost.png
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from netCDF4 import Dataset
+
+## folder of the modules
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,MODULE_DIR)
+
+from Richards1DSolver import runRichards1D, writeOMSTimeSeries, _unixTime
+from Richards1DSWRC import computeHydraulicConductivity
+
+## loam, Carsel and Parrish 1988
+SOIL = {'thetaS': 0.43, 'thetaR': 0.078, 'Ks': 2.89e-6, 'alphaSpecificStorage': 0.0, 'betaSpecificStorage': 0.0,
+        'n': 1.56, 'alpha': 3.6}
+
+START_DATE = '2017-01-01 00:00'
+
+## name: depth of the column [m], duration [days], time step of the boundary conditions and of the
+## output [s], flux at the top [m/s] positive downward, initial condition and its water suction [m]
+## (at the bottom for the hydrostatic one). The durations are long enough to reach the steady state
+ANALYTICAL_CASES = {
+    'hydrostatic': {'depth': 1.0, 'days': 180, 'tTimestep': 86400, 'flux': 0.0, 'icType': 'constant', 'psiIC': -0.5},
+    'steadyInfiltration': {'depth': 1.0, 'days': 180, 'tTimestep': 86400, 'flux': 0.2*SOIL['Ks'],
+                           'icType': 'hydrostatic', 'psiIC': 0.0},
+    'steadyEvaporation': {'depth': 1.0, 'days': 180, 'tTimestep': 86400, 'flux': -3e-9, 'icType': 'hydrostatic', 'psiIC': 0.0},
+}
+
+CELLS = [20, 40, 80]
+
+TIME_DELTAS = [3600, 21600, 86400]
+
+NEWTON_TOLERANCES = [1e-11]
+
+## integration steps of the steady profiles
+PROFILE_STEPS = 20000
+
+
+def steadyProfile(flux,z,psiBottom=0.0,soil=SOIL,nSteps=PROFILE_STEPS):
+    '''
+    Computes the steady water suction profile of a homogeneous column with
+    assigned water suction at the bottom and constant flux, integrating
+    dpsi/dz = flux/K(psi) - 1 from the bottom with the Runge-Kutta method.
+
+    flux: flux at the top [m/s], positive downward
+    z: heights above the bottom [m] where the profile is returned
+
+    return:
+
+    psi at z
+    '''
+    height = np.max(z)
+    h = height/nSteps
+
+    def slope(psi):
+        K = computeHydraulicConductivity(psi,'Van Genuchten',soil['Ks'],soil['n'],soil['alpha'],0,0,0)
+        return flux/K-1
+
+    psi = np.empty(nSteps+1)
+    psi[0] = psiBottom
+    for i in range(nSteps):
+        k1 = slope(psi[i])
+        k2 = slope(psi[i]+0.5*h*k1)
+        k3 = slope(psi[i]+0.5*h*k2)
+        k4 = slope(psi[i]+h*k3)
+        psi[i+1] = psi[i]+h/6*(k1+2*k2+2*k3+k4)
+    if not np.all(np.isfinite(psi)):
+        raise ValueError('No steady profile: the flux '+str(flux)+' m/s exceeds the capacity of the soil column')
+    return np.interp(z,np.linspace(0,height,nSteps+1),psi)
+
+
+def caseMeshData(case,nCells,soil=SOIL):
+    '''
+    Creates the input of RichardsMeshGenVanGenuchten for a case: one layer of
+    nCells control volumes.
+
+    return:
+
+    data: pandas dataframe with the columns of the .csv files
+    '''
+    data = {'Type': ['L', 'L'], 'eta': [0.0, -ANALYTICAL_CASES[case]['depth']], 'N': [nCells, -999],
+            'psi': [0.0, ANALYTICAL_CASES[case]['psiIC']]}
+    for name,value in soil.items():
+        data[name] = [value, np.nan]
+    data['et'] = [0.0, np.nan]
+    return pd.DataFrame(data)
+
+
+def writeCaseGrid(case,nCells,gridFileName):
+    '''
+    Writes the grid NetCDF of a case with the functions of the notebook
+    1_RichardsMeshGen_VanGenuchten_SWRC.
+    '''
+    import RichardsMeshGenVanGenuchten as meshGen
+    data = caseMeshData(case,nCells)
+    [eta,etaDual,deltaZ,spaceDelta,z,zDual] = meshGen.buildData(data)
+    eta = np.asarray(eta)
+    psiIC = meshGen.setInitialCondition(data,eta,z,ANALYTICAL_CASES[case]['icType'])
+    parameters = meshGen.setParameters(data,eta)
+    meshGen.writeGridNetCDF(eta,etaDual,z,zDual,spaceDelta,deltaZ,psiIC,*parameters,gridFileName,
+                            'Benchmark case '+case,'','','',pd.Timestamp.now().strftime('%Y-%m-%d'),'benchmarkAnalytical')
+    return
+
+
+def writeCaseForcing(case,topFileName,bottomFileName):
+    '''
+    Writes the boundary conditions of a case: the flux at the top as rainfall
+    height [mm] over tTimestep, water suction 0 at the bottom.
+    '''
+    tTimestep = ANALYTICAL_CASES[case]['tTimestep']
+    start = _unixTime(START_DATE)
+    time = start+tTimestep*np.arange(int(ANALYTICAL_CASES[case]['days']*86400/tTimestep)+1)
+    writeOMSTimeSeries(topFileName,time,np.full(np.size(time),ANALYTICAL_CASES[case]['flux']*1000*tTimestep))
+    writeOMSTimeSeries(bottomFileName,time,np.zeros(np.size(time)))
+    return
+
+
+def _endDate(case):
+    return (pd.Timestamp(START_DATE)+pd.Timedelta(days=ANALYTICAL_CASES[case]['days'])).strftime('%Y-%m-%d %H:%M')
+
+
+def runConfiguration(case,nCells,timeDelta,newtonTolerance,gridFileName,topFileName,bottomFileName,outputFileName):
+    '''
+    Runs a case with a configuration and computes the steadyError.
+
+    return:
+
+    dictionary with the configuration, the statistics of the run and the steadyError
+    '''
+    statistics = runRichards1D(gridFileName,outputFileName,topFileName,bottomFileName,START_DATE,_endDate(case),
+                               topBCType='Top Neumann',bottomBCType='Bottom Dirichlet',newtonTolerance=newtonTolerance,
+                               tTimestep=ANALYTICAL_CASES[case]['tTimestep'],timeDelta=timeDelta,description='Benchmark case '+case)
+    ncfile = Dataset(outputFileName,'r')
+    try:
+        psi = np.asarray(ncfile.variables['psi'][-1,0:nCells])
+        depth = np.asarray(ncfile.variables['depth'][0:nCells])
+    finally:
+        ncfile.close()
+    exact = steadyProfile(ANALYTICAL_CASES[case]['flux'],depth+ANALYTICAL_CASES[case]['depth'])
+    result = {'case': case, 'nCells': nCells, 'timeDelta': timeDelta, 'newtonTolerance': newtonTolerance,
+              'outputFileName': outputFileName, 'steadyError': float(np.max(np.abs(psi-exact)))}
+    result.update(statistics)
+    return result
+
+
+def _runConfiguration(arguments):
+    return runConfiguration(*arguments)
+
+
+def _centroidProfiles(outputFileName,depths):
+    ## psi of all the time steps interpolated on depths
+    ncfile = Dataset(outputFileName,'r')
+    try:
+        nCV = ncfile.dimensions['depth'].size-1
+        eta = np.asarray(ncfile.variables['depth'][0:nCV])
+        psi = np.asarray(ncfile.variables['psi'][:,0:nCV])
+    finally:
+        ncfile.close()
+    ## np.interp needs increasing coordinates, eta is from the bottom to the top
+    return np.array([np.interp(depths,eta,p) for p in psi])
+
+
+def transientErrors(results):
+    '''
+    Adds the transientError to the results: for each case, the maximum
+    difference of psi from the run with the finest grid, the shortest
+    timeDelta and the smallest newtonTolerance (the reference run), on the
+    centroids of the coarsest grid.
+    '''
+    for case in set(r['case'] for r in results):
+        runs = [r for r in results if r['case'] == case]
+        reference = min(runs,key=lambda r: (-r['nCells'],r['timeDelta'],r['newtonTolerance']))
+        coarsest = min(runs,key=lambda r: r['nCells'])
+        ncfile = Dataset(coarsest['outputFileName'],'r')
+        depths = np.asarray(ncfile.variables['depth'][0:coarsest['nCells']])
+        ncfile.close()
+        referenceProfiles = _centroidProfiles(reference['outputFileName'],depths)
+        for r in runs:
+            r['transientError'] = float(np.max(np.abs(_centroidProfiles(r['outputFileName'],depths)-referenceProfiles)))
+            r['reference'] = r is reference
+    return results
+
+
+def benchmarkAnalytical(cases=None,cells=CELLS,timeDeltas=TIME_DELTAS,newtonTolerances=NEWTON_TOLERANCES,nWorkers=None,workDir=None):
+    '''
+    Runs the cases with all the combinations of number of cells, timeDelta
+    and newtonTolerance.
+
+    nWorkers: number of processes, if None the number of CPUs
+    workDir: folder of the grid, boundary condition and output files, if
+        None they are written to a temporary folder that is deleted at the end
+
+    return:
+
+    results: list of dictionaries, one for each run, with steadyError and transientError
+    '''
+    cases = list(ANALYTICAL_CASES) if cases is None else cases
+    temporary = workDir is None
+    if temporary:
+        workDir = tempfile.mkdtemp(prefix='benchmarkAnalytical_')
+    else:
+        os.makedirs(workDir,exist_ok=True)
+
+    try:
+        arguments = []
+        for case in cases:
+            topFileName = os.path.join(workDir,case+'_top.csv')
+            bottomFileName = os.path.join(workDir,case+'_bottom.csv')
+            writeCaseForcing(case,topFileName,bottomFileName)
+            for nCells in cells:
+                gridFileName = os.path.join(workDir,case+'_'+str(nCells)+'.nc')
+                writeCaseGrid(case,nCells,gridFileName)
+                for timeDelta in timeDeltas:
+                    for newtonTolerance in newtonTolerances:
+                        outputFileName = os.path.join(workDir,'{}_{}_{}_{:g}_output.nc'.format(case,nCells,timeDelta,newtonTolerance))
+                        arguments.append((case,nCells,timeDelta,newtonTolerance,gridFileName,topFileName,bottomFileName,outputFileName))
+
+        if nWorkers == 1:
+            results = [_runConfiguration(a) for a in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+                results = list(executor.map(_runConfiguration,arguments))
+        transientErrors(results)
+    finally:
+        if temporary:
+            shutil.rmtree(workDir,ignore_errors=True)
+    return results
+
+
+def cheapestConfiguration(results,case,target,error='steadyError'):
+    '''
+    Returns the run of a case with the smallest wall time among the ones with
+    error (steadyError or transientError) not larger than target, None if no
+    run meets the target. The reference run of the transientError and the runs
+    with time steps split because the Newton method did not converge
+    (nonConvergedSteps), that did not use their timeDelta, are excluded.
+    '''
+    runs = [r for r in results if r['case'] == case and r[error] <= target and r['nonConvergedSteps'] == 0
+            and not (error == 'transientError' and r['reference'])]
+    if not runs:
+        return None
+    return min(runs,key=lambda r: r['wallTime'])
+
+
+def plotErrorCost(results,fileName):
+    '''
+    Draws steadyError and transientError against the wall time, one panel for
+    each case, and saves the figure.
+    '''
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    cases = sorted(set(r['case'] for r in results))
+    fig, axes = plt.subplots(2,len(cases),figsize=(5*len(cases),8),squeeze=False)
+    for j,case in enumerate(cases):
+        runs = [r for r in results if r['case'] == case]
+        for i,error in enumerate(['steadyError', 'transientError']):
+            ax = axes[i][j]
+            for timeDelta in sorted(set(r['timeDelta'] for r in runs)):
+                line = sorted([r for r in runs if r['timeDelta'] == timeDelta and not r['reference']],key=lambda r: r['nCells'])
+                ax.loglog([r['wallTime'] for r in line],[max(r[error],1e-16) for r in line],marker='o',
+                          label='timeDelta '+str(timeDelta)+' s')
+                for r in line:
+                    ax.annotate(str(r['nCells']),(r['wallTime'],max(r[error],1e-16)),fontsize=8)
+            ax.set_title(case)
+            ax.set_xlabel('Wall time [s]')
+            ax.set_ylabel(error+' [m]')
+            ax.grid(which='both')
+            ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(fileName)
+    plt.close(fig)
+    print('*** SUCCESS writing!  '+fileName)
+    return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Error against wall time of the solver on cases with a known solution')
+    parser.add_argument('--cases', nargs='+', default=None, choices=list(ANALYTICAL_CASES), help='cases to run (default all)')
+    parser.add_argument('--cells', nargs='+', type=int, default=CELLS, help='numbers of control volumes')
+    parser.add_argument('--time-deltas', dest='timeDeltas', nargs='+', type=float, default=TIME_DELTAS, help='timeDelta [s]')
+    parser.add_argument('--newton-tolerances', dest='newtonTolerances', nargs='+', type=float, default=NEWTON_TOLERANCES)
+    parser.add_argument('--workers', dest='nWorkers', type=int, default=None, help='number of processes')
+    parser.add_argument('--work-dir', dest='workDir', default=None, help='keep grid, boundary condition and output files in this folder')
+    parser.add_argument('--target', type=float, default=None, help='accuracy target [m] for the cheapest configuration')
+    parser.add_argument('--plot', default=None, help='save the error against wall time figure to this file')
+    parser.add_argument('--output', default=None, help='write the results to this .json file')
+    args = parser.parse_args(argv)
+
+    results = benchmarkAnalytical(args.cases,args.cells,args.timeDeltas,args.newtonTolerances,args.nWorkers,args.workDir)
+    print('\n{:20s} {:>6s} {:>8s} {:>9s} {:>9s} {:>8s} {:>12s} {:>12s} {:>14s}'.format(
+          'case','cells','dt [s]','tolerance','time [s]','Newton','nonConverged','steadyError','transientError'))
+    for r in results:
+        print('{:20s} {:6d} {:8g} {:9.0e} {:9.2f} {:8d} {:12d} {:12.2e} {:>14s}'.format(
+              r['case'],r['nCells'],r['timeDelta'],r['newtonTolerance'],r['wallTime'],
+              r['outerIterations']+r['innerIterations'],r['nonConvergedSteps'],r['steadyError'],
+              'reference' if r['reference'] else '{:.2e}'.format(r['transientError'])))
+    if args.target is not None:
+        print('\nCheapest configurations with error <= {:g} m:'.format(args.target))
+        for case in sorted(set(r['case'] for r in results)):
+            for error in ['steadyError', 'transientError']:
+                best = cheapestConfiguration(results,case,args.target,error)
+                print('{:20s} {:15s} {}'.format(case,error,'none' if best is None else
+                      'cells {} timeDelta {:g} s newtonTolerance {:g} ({:.2f} s)'.format(
+                      best['nCells'],best['timeDelta'],best['newtonTolerance'],best['wallTime'])))
+    if args.plot is not None:
+        plotErrorCost(results,args.plot)
+    if args.output is not None:
+        with open(args.output,'w') as f:
+            json.dump(results,f,indent=2)
+        print('*** SUCCESS writing!  '+args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 09:14:08 2026
+
+This is used to measure the time needed to import the Python modules of the
+project in a fresh interpreter, as a batch worker does.
+
+For each module two times are measured:
+    - lazy: import of the module alone, that is what a worker calling only
+      buildData or readRichardsOutputNetCDF pays
+    - eager: import of the module plus the plotting libraries (matplotlib and
+      bokeh) that the module used to import at load time
+
+Each measure is the median of several runs in a new process.
+
+    python benchmarks/benchmarkImportTime.py --repeat 5 --output importTime.json
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+## folder of the modules
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ['RichardsMeshGenVanGenuchten', 'RichardsMeshGenBrooksCorey', 'RichardsMeshGenKosugi',
+           'RichardsMeshGenRomano', 'Richards1DOutput']
+
+## plotting libraries imported at load time before they were made lazy
+PLOTTING_IMPORTS = ['import matplotlib.pyplot, matplotlib.ticker, matplotlib.dates',
+                    'import bokeh.plotting, bokeh.io, bokeh.layouts, bokeh.models, bokeh.models.widgets']
+
+_TIMER = '''
+import time
+start = time.perf_counter()
+{statements}
+print(time.perf_counter()-start)
+'''
+
+
+def importTime(statements,repeat=5):
+    '''
+    Returns the median time [s] needed to execute the import statements in a
+    new Python process, started in the folder of the modules.
+    '''
+    code = _TIMER.format(statements='\n'.join(statements))
+    times = []
+    for i in range(repeat):
+        result = subprocess.run([sys.executable,'-c',code],cwd=MODULE_DIR,capture_output=True,text=True,check=True)
+        times.append(float(result.stdout.strip().split('\n')[-1]))
+    return statistics.median(times)
+
+
+def benchmarkImportTime(modules=MODULES,repeat=5):
+    '''
+    Measures the lazy and eager import time of each module.
+
+    return:
+
+    results: list of dictionaries with module, lazy [s], eager [s] and ratio (lazy/eager)
+    '''
+    results = []
+    for module in modules:
+        lazy = importTime(['import '+module],repeat)
+        eager = importTime(['import '+module]+PLOTTING_IMPORTS,repeat)
+        results.append({'module': module, 'lazy': lazy, 'eager': eager, 'ratio': lazy/eager})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the import time of the Python modules')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs of each measure')
+    parser.add_argument('--output', default=None, help='write the results to this .json file')
+    args = parser.parse_args(argv)
+
+    results = benchmarkImportTime(MODULES,args.repeat)
+    for r in results:
+        print('{:30s} lazy {:7.3f} s   eager {:7.3f} s   ratio {:5.2f}'.format(r['module'],r['lazy'],r['eager'],r['ratio']))
+    if args.output is not None:
+        with open(args.output,'w') as f:
+            json.dump(results,f,indent=2)
+        print('*** SUCCESS writing!  '+args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 28 10:02:47 2026
+
+This is used to measure how the grid generation of RichardsMeshGen*.py scales
+with the number of control volumes and of soil layers.
+
+For each SWRC module, number of cells and number of layers a synthetic input
+.csv file is written in the format of data/RichardMeshGen_input
+(Type,eta,N,psi,thetaS,...) and the stages of the notebooks are run in a new
+Python process:
+    - buildData
+    - setInitialCondition
+    - setParameters
+    - writeGridNetCDF
+
+For each stage the wall time and the peak memory (tracemalloc, measured in a
+second run of the stage so that tracing does not slow down the timed one) are
+recorded. A case that exceeds the time budget is stopped: the stages that did
+not finish have status 'timeout', and the larger grids with the same module
+and number of layers are skipped.
+
+The summary reports the scaling exponent between consecutive grid sizes:
+about 1 for linear stages, about 2 for quadratic ones.
+
+    python benchmarks/benchmarkMeshGen.py --cells 40 400 4000 40000 1000000 --layers 1 10 100 500 --output meshGen.json
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+## folder of the modules
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ['RichardsMeshGenVanGenuchten', 'RichardsMeshGenBrooksCorey', 'RichardsMeshGenKosugi', 'RichardsMeshGenRomano']
+
+STAGES = ['buildData', 'setInitialCondition', 'setParameters', 'writeGridNetCDF']
+
+CELLS = [40, 400, 4000, 40000, 1000000]
+
+LAYERS = [1, 10, 100, 500]
+
+## depth of the synthetic soil column [m]
+COLUMN_DEPTH = 10.0
+
+## parameters of the two soils that alternate in the synthetic layers, from the examples in data/RichardMeshGen_input
+SOIL_PARAMETERS = {'thetaS': [0.5, 0.38], 'thetaR': [0.07, 0.02], 'Ks': [0.000023, 0.003697],
+                   'alphaSpecificStorage': [0, 0], 'betaSpecificStorage': [0, 0]}
+
+SWRC_PARAMETERS = {'RichardsMeshGenVanGenuchten': {'n': [1.16, 1.7], 'alpha': [5.88, 1.47]},
+                   'RichardsMeshGenBrooksCorey': {'n': [1.5, 1.5], 'psiD': [-0.3496, -0.1]},
+                   'RichardsMeshGenKosugi': {'r': [0.00004323, 0.0001], 'sigma': [0.6, 0.8]},
+                   'RichardsMeshGenRomano': {'w': [0.4, 0.4], 'sigma1': [1, 1], 'sigma2': [0.5, 0.5],
+                                             'h1': [-1.25, -1.25], 'h2': [-0.04, -0.04]}}
+
+## prefix of the lines written by the process that runs a case
+_RESULT_PREFIX = 'BENCHMARK '
+
+_CASE = '''
+import sys
+sys.path.insert(0,{benchmarkDir!r})
+from benchmarkMeshGen import runCase
+runCase({module!r},{inputFileName!r},{outputFileName!r},{icType!r},{memory!r})
+'''
+
+
+def syntheticMeshData(module,nCells,nLayers,depth=COLUMN_DEPTH,psiTop=-2.0,psiBottom=0.0):
+    '''
+    Creates the input of RichardsMeshGen for a soil column of nCells control
+    volumes split in nLayers layers of equal thickness, alternating two soils.
+
+    return:
+
+    data: pandas dataframe with the columns of the .csv files of module
+    '''
+    if nLayers > nCells:
+        raise ValueError('The number of layers ('+str(nLayers)+') exceeds the number of cells ('+str(nCells)+')')
+    eta = -depth*np.arange(nLayers+1)/nLayers
+    ## cells of each layer, the last row is the bottom of the column
+    N = np.full(nLayers+1,-999,dtype=int)
+    N[0:nLayers] = nCells//nLayers
+    N[0:nCells%nLayers] += 1
+    psi = psiBottom+(eta[-1]-eta)
+    psi[0] = psiTop
+
+    data = {'Type': ['L']*(nLayers+1), 'eta': eta, 'N': N, 'psi': psi}
+    soil = np.arange(nLayers+1)%2
+    for name,values in list(SOIL_PARAMETERS.items())+list(SWRC_PARAMETERS[module].items()):
+        data[name] = np.asarray(values)[soil]
+    data['et'] = np.zeros(nLayers+1)
+    data = pd.DataFrame(data)
+    ## the parameters of the bottom row are not used
+    data.iloc[nLayers,4:] = np.nan
+    return data
+
+
+def _report(result):
+    print(_RESULT_PREFIX+json.dumps(result),flush=True)
+
+
+def _runStage(stage,function,arguments,memory):
+    ## runs a stage and writes its wall time [s], then its peak memory [bytes] measured in a second run
+    start = time.perf_counter()
+    result = function(*arguments)
+    _report({'stage': stage, 'time': time.perf_counter()-start})
+    if memory:
+        tracemalloc.start()
+        function(*arguments)
+        _report({'stage': stage, 'peakMemory': tracemalloc.get_traced_memory()[1]})
+        tracemalloc.stop()
+    return result
+
+
+def runCase(module,inputFileName,outputFileName,icType='hydrostatic',memory=True):
+    '''
+    Runs the stages of the grid generation for one input file, as the notebooks
+    do, and writes the results of each stage to stdout as soon as they are
+    available.
+    '''
+    meshGen = __import__(module)
+    data = pd.read_csv(inputFileName)
+
+    [eta,etaDual,deltaZ,spaceDelta,z,zDual] = _runStage('buildData',meshGen.buildData,[data],memory)
+    eta = np.asarray(eta)
+    psiIC = _runStage('setInitialCondition',meshGen.setInitialCondition,[data,eta,z,icType],memory)
+    parameters = _runStage('setParameters',meshGen.setParameters,[data,eta],memory)
+    arguments = [eta,etaDual,z,zDual,spaceDelta,deltaZ,psiIC]+list(parameters)+[
+                 outputFileName,'benchmark','','','',time.strftime('%Y-%m-%d'),os.path.basename(inputFileName)]
+    _runStage('writeGridNetCDF',meshGen.writeGridNetCDF,arguments,memory)
+    return
+
+
+def _parseCase(output):
+    ## results of the stages written by runCase, also when the process was stopped
+    if isinstance(output,bytes):
+        output = output.decode(errors='replace')
+    return [json.loads(line[len(_RESULT_PREFIX):]) for line in (output or '').splitlines() if line.startswith(_RESULT_PREFIX)]
+
+
+def benchmarkCase(module,nCells,nLayers,workDir,icType='hydrostatic',timeBudget=60,memory=True):
+    '''
+    Writes the synthetic input file and runs the stages in a new process,
+    stopped after timeBudget seconds.
+
+    return:
+
+    results: list of dictionaries with module, nCells, nLayers, stage, time [s],
+        peakMemory [bytes] and status ('ok', 'timeout' or 'error')
+    '''
+    caseName = module+'_'+str(nCells)+'_'+str(nLayers)
+    inputFileName = os.path.join(workDir,caseName+'.csv')
+    syntheticMeshData(module,nCells,nLayers).to_csv(inputFileName,index=False)
+    code = _CASE.format(benchmarkDir=os.path.dirname(os.path.abspath(__file__)),module=module,inputFileName=inputFileName,
+                        outputFileName=os.path.join(workDir,caseName+'.nc'),icType=icType,memory=memory)
+
+    status = 'ok'
+    try:
+        process = subprocess.run([sys.executable,'-c',code],cwd=MODULE_DIR,capture_output=True,text=True,timeout=timeBudget)
+        stages = _parseCase(process.stdout)
+        if process.returncode != 0:
+            status = 'error'
+            print(process.stderr,file=sys.stderr)
+    except subprocess.TimeoutExpired as e:
+        stages = _parseCase(e.stdout)
+        status = 'timeout'
+
+    results = []
+    for stage in STAGES:
+        result = {'module': module, 'nCells': nCells, 'nLayers': nLayers, 'stage': stage,
+                  'time': None, 'peakMemory': None, 'status': status}
+        for s in stages:
+            if s['stage'] == stage:
+                result.update(s)
+        if result['time'] is not None:
+            result['status'] = 'ok'
+        results.append(result)
+    return results
+
+
+def benchmarkMeshGen(modules=MODULES,cells=CELLS,layers=LAYERS,icType='hydrostatic',timeBudget=60,memory=True,csvDir=None):
+    '''
+    Runs benchmarkCase for all the modules, grid sizes and numbers of layers.
+    Grid sizes are run in increasing order: after a case that did not finish,
+    the larger grids with the same module and number of layers are skipped.
+
+    csvDir: folder where the synthetic input files and grids are kept, if None
+        they are written to a temporary folder that is deleted at the end
+
+    return:
+
+    results: list of dictionaries, see benchmarkCase. Skipped cases have status 'skipped'.
+    '''
+    temporary = csvDir is None
+    workDir = tempfile.mkdtemp(prefix='meshGen_') if temporary else csvDir
+    os.makedirs(workDir,exist_ok=True)
+
+    results = []
+    try:
+        for module in modules:
+            for nLayers in layers:
+                stopped = False
+                for nCells in sorted(cells):
+                    if nLayers > nCells:
+                        continue
+                    if stopped:
+                        results.extend({'module': module, 'nCells': nCells, 'nLayers': nLayers, 'stage': stage,
+                                        'time': None, 'peakMemory': None, 'status': 'skipped'} for stage in STAGES)
+                        continue
+                    case = benchmarkCase(module,nCells,nLayers,workDir,icType,timeBudget,memory)
+                    results.extend(case)
+                    stopped = any(r['status'] != 'ok' or (memory and r['peakMemory'] is None) for r in case)
+                    print('{:28s} cells {:8d} layers {:4d}  '.format(module,nCells,nLayers)
+                          +'  '.join('{} {}'.format(r['stage'],'{:.3f} s'.format(r['time']) if r['time'] is not None else r['status'])
+                                     for r in case),flush=True)
+    finally:
+        if temporary:
+            shutil.rmtree(workDir,ignore_errors=True)
+    return results
+
+
+def scalingExponents(results):
+    '''
+    Computes the exponent p of time ~ nCells^p between consecutive grid sizes
+    with the same module, number of layers and stage.
+
+    return:
+
+    exponents: list of dictionaries with module, nLayers, stage, nCells (of the
+        larger grid) and exponent
+    '''
+    exponents = []
+    done = [r for r in results if r['status'] == 'ok' and r['time'] is not None and r['time'] > 0]
+    keys = sorted({(r['module'],r['nLayers'],r['stage']) for r in done})
+    for module,nLayers,stage in keys:
+        series = sorted([r['nCells'],r['time']] for r in done
+                        if r['module'] == module and r['nLayers'] == nLayers and r['stage'] == stage)
+        for [n1,t1],[n2,t2] in zip(series[:-1],series[1:]):
+            exponents.append({'module': module, 'nLayers': nLayers, 'stage': stage, 'nCells': n2,
+                              'exponent': math.log(t2/t1)/math.log(n2/n1)})
+    return exponents
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure time and memory of the grid generation of RichardsMeshGen')
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='RichardsMeshGen modules')
+    parser.add_argument('--cells', nargs='+', type=int, default=CELLS, help='numbers of control volumes')
+    parser.add_argument('--layers', nargs='+', type=int, default=LAYERS, help='numbers of soil layers')
+    parser.add_argument('--ic-type', dest='icType', default='hydrostatic',
+                        help='type of initial condition: hydrostatic, constant or piecewise-hydrostatic')
+    parser.add_argument('--time-budget', dest='timeBudget', type=float, default=60, help='maximum time [s] of each case')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='do not measure the peak memory')
+    parser.add_argument('--csv-dir', dest='csvDir', default=None, help='keep the synthetic input files in this folder')
+    parser.add_argument('--output', default=None, help='write the results to this .json file')
+    args = parser.parse_args(argv)
+
+    results = benchmarkMeshGen(args.modules,args.cells,args.layers,args.icType,args.timeBudget,args.memory,args.csvDir)
+    exponents = scalingExponents(results)
+    print('\nScaling exponents (time ~ cells^p):')
+    for e in exponents:
+        print('{:28s} layers {:4d} {:20s} up to {:8d} cells  p = {:5.2f}'.format(e['module'],e['nLayers'],e['stage'],e['nCells'],e['exponent']))
+    if args.output is not None:
+        with open(args.output,'w') as f:
+            json.dump({'results': results, 'scalingExponents': exponents},f,indent=2)
+        print('*** SUCCESS writing!  '+args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
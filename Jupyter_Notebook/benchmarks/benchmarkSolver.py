@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 29 15:41:03 2026
+
+This is used to detect performance and accuracy regressions of the solver when
+its settings or its code change.
+
+Each canonical case (the boundary condition time series of data/Timeseries on
+the grid of data/Grid_NetCDF) is run with a fixed configuration of the solver
+(SOLVER_CONFIGURATION) by each available engine (ENGINES) and for each run the
+wall time, the number of time steps, the number of outer and inner Newton
+iterations and the `error` series are recorded.
+
+The results are compared with the reference outputs stored in
+benchmarks/references (one .npz file for each case and engine, written with
+--update-references): psi and water content every REFERENCE_STRIDE time
+steps, the whole `error` series and the statistics of the run. A case is
+flagged as an accuracy regression if psi or water content differ from the
+reference more than the tolerances, and as a performance regression if the
+Newton iterations grow more than the tolerance or the time steps grow. Wall
+times are only comparable on the same machine: their ratio to the reference
+is reported, and it is checked only when asked (--wall-time-tolerance), e.g.
+when the references were written on the machine running the benchmark.
+
+Cases run one at a time, so that the timings are not disturbed.
+
+    python benchmarks/benchmarkSolver.py --output solver.json
+    python benchmarks/benchmarkSolver.py --cases Tr10_30min TestAll_-1 --update-references
+    python benchmarks/benchmarkSolver.py --wall-time-tolerance 0.5
+
+@author: Niccolo` Tubini and Riccardo Rigon
+@license: creative commons 4.0
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from netCDF4 import Dataset
+
+## folder of the modules
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,MODULE_DIR)
+
+from Richards1DSolver import runRichards1D
+
+DATA_DIR = os.path.join(os.path.dirname(MODULE_DIR),'data')
+
+REFERENCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),'references')
+
+GRID_FILE_NAME = os.path.join(DATA_DIR,'Grid_NetCDF','Clay_noPonding_VG.nc')
+
+## solver engines: name and function with the arguments of Richards1DSolver.runRichards1D.
+## The Java engine (lib/1DRichards-na.jar) runs in the OMS console and is not available here
+ENGINES = {'python': runRichards1D}
+
+## solver parameters of simulation/Richards1D_coupled.sim
+SOLVER_CONFIGURATION = {'interfaceHydraulicCondType': 'max', 'newtonTolerance': 1e-11, 'nestedNewton': 1,
+                        'tTimestep': 300, 'timeDelta': 300}
+
+_ONE_DAY = ['2017-01-01 00:00', '2017-01-01 23:55']
+_TWO_DAYS = ['2017-01-01 00:00', '2017-01-02 23:55']
+_ONE_MONTH = ['2017-01-01 00:00', '2017-02-01 00:00']
+_SEVEN_DAYS = ['2018-03-05 00:00', '2018-03-11 19:15']
+
+## name: top and bottom time series, boundary condition types, start and end dates
+CANONICAL_CASES = {
+    'TestAll_-1': ['TestAll_-1.csv', 'TestAll_0.csv', 'Top Dirichlet', 'Bottom Dirichlet'] + _ONE_DAY,
+    'TestAll_-10': ['TestAll_-10.csv', 'TestAll_0.csv', 'Top Dirichlet', 'Bottom Dirichlet'] + _ONE_DAY,
+    'TestAll_-20': ['TestAll_-20.csv', 'TestAll_0.csv', 'Top Dirichlet', 'Bottom Dirichlet'] + _ONE_DAY,
+    'TestAll_-50': ['TestAll_-50.csv', 'TestAll_0.csv', 'Top Dirichlet', 'Bottom Dirichlet'] + _ONE_DAY,
+    'TestAll_0': ['TestAll_0.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _ONE_MONTH,
+    'TestAll_05': ['TestAll_05.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _ONE_MONTH,
+    'TestAll_2': ['TestAll_2.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _ONE_MONTH,
+    'TestAll_4': ['TestAll_4.csv', None, 'Top Neumann', 'Bottom Impervious'] + _ONE_MONTH,
+    'TestAll_2_Gradino3ore': ['TestAll_2_Gradino3ore.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _ONE_MONTH,
+    'TestAll_2_Gradino12ore': ['TestAll_2_Gradino12ore.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _ONE_MONTH,
+    'TestAll_2_BottomNeumann': ['TestAll_2.csv', 'TestAll_2_BottomNeumann.csv', 'Top Neumann', 'Bottom Neumann'] + _ONE_MONTH,
+    'Tr10_10ore': ['Tr10_10ore.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _TWO_DAYS,
+    'Tr10_15min': ['Tr10_15min.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _TWO_DAYS,
+    'Tr10_30min': ['Tr10_30min.csv', None, 'Top Neumann', 'Bottom Free Drainage'] + _TWO_DAYS,
+    'Trento7gg': ['Trento7gg.csv', 'Trento7ggBottom.csv', 'Top Neumann', 'Bottom Dirichlet'] + _SEVEN_DAYS,
+    'Rovereto7gg': ['Rovereto7gg.csv', 'Rovereto7ggBottom.csv', 'Top Neumann', 'Bottom Dirichlet'] + _SEVEN_DAYS,
+}
+
+## psi and water content of the references are stored every REFERENCE_STRIDE time steps
+REFERENCE_STRIDE = 12
+
+## maximum differences from the reference: psi [m], water content [-], and relative growth of Newton iterations and
+## wall time (checked only when asked)
+PSI_TOLERANCE = 1e-6
+THETA_TOLERANCE = 1e-8
+ITERATION_TOLERANCE = 0.1
+WALL_TIME_TOLERANCE = 0.5
+
+
+def runCase(case,engine,outputFileName,gridFileName=GRID_FILE_NAME,configuration=SOLVER_CONFIGURATION):
+    '''
+    Runs a canonical case with an engine.
+
+    return:
+
+    statistics: dictionary of the run, see Richards1DSolver.runRichards1D
+    '''
+    [topBC,bottomBC,topBCType,bottomBCType,startDate,endDate] = CANONICAL_CASES[case]
+    timeseriesDir = os.path.join(DATA_DIR,'Timeseries')
+    return ENGINES[engine](gridFileName,outputFileName,os.path.join(timeseriesDir,topBC),
+                           None if bottomBC is None else os.path.join(timeseriesDir,bottomBC),startDate,endDate,
+                           topBCType=topBCType,bottomBCType=bottomBCType,description='Benchmark case '+case,
+                           **configuration)
+
+
+def readRunOutput(outputFileName,stride=REFERENCE_STRIDE):
+    '''
+    Reads the part of an output file that is compared with the references.
+
+    return:
+
+    dictionary with time, psi and water content every stride time steps, and
+    the whole error series
+    '''
+    ncfile = Dataset(outputFileName,'r')
+    try:
+        output = {'time': np.ma.getdata(ncfile.variables['time'][::stride]),
+                  'psi': np.ma.getdata(ncfile.variables['psi'][::stride,:]),
+                  'water_heigth': np.ma.getdata(ncfile.variables['water_heigth'][::stride,:]),
+                  'error': np.ma.getdata(ncfile.variables['error'][:])}
+    finally:
+        ncfile.close()
+    return output
+
+
+def referenceFileName(case,engine,referenceDir=REFERENCE_DIR):
+    return os.path.join(referenceDir,engine+'_'+case+'.npz')
+
+
+def writeReference(fileName,output,statistics):
+    '''
+    Stores the output of readRunOutput and the statistics of a run as reference.
+    '''
+    os.makedirs(os.path.dirname(os.path.abspath(fileName)),exist_ok=True)
+    np.savez_compressed(fileName,statistics=json.dumps(statistics),**output)
+    print('*** SUCCESS writing!  '+fileName)
+    return
+
+
+def readReference(fileName):
+    '''
+    return:
+
+    output: dictionary with the arrays stored by writeReference
+
+    statistics: dictionary with the statistics of the reference run
+    '''
+    with np.load(fileName) as reference:
+        output = {name: reference[name] for name in reference.files if name != 'statistics'}
+        statistics = json.loads(str(reference['statistics']))
+    return [output,statistics]
+
+
+def compareWithReference(output,statistics,reference,referenceStatistics,psiTolerance=PSI_TOLERANCE,
+                         thetaTolerance=THETA_TOLERANCE,iterationTolerance=ITERATION_TOLERANCE,
+                         wallTimeTolerance=None):
+    '''
+    Compares a run with its reference.
+
+    wallTimeTolerance: relative growth of the wall time flagged as a
+        performance regression, if None the wall time is not checked
+
+    return:
+
+    dictionary with the maximum differences of psi, water content and error,
+    the ratios of Newton iterations, time steps and wall time to the
+    reference, and the status: 'ok', 'accuracy regression',
+    'performance regression' or 'different time steps'
+    '''
+    comparison = {}
+    if np.size(output['time']) != np.size(reference['time']) or np.any(output['time'] != reference['time']):
+        comparison['status'] = 'different time steps'
+        return comparison
+
+    comparison['psiDifference'] = float(np.max(np.abs(output['psi']-reference['psi'])))
+    comparison['thetaDifference'] = float(np.max(np.abs(output['water_heigth']-reference['water_heigth'])))
+    comparison['errorDifference'] = float(np.max(np.abs(output['error']-reference['error'])))
+    iterations = statistics['outerIterations']+statistics['innerIterations']
+    referenceIterations = referenceStatistics['outerIterations']+referenceStatistics['innerIterations']
+    comparison['iterationRatio'] = iterations/max(referenceIterations,1)
+    comparison['timeStepRatio'] = statistics['timeSteps']/max(referenceStatistics['timeSteps'],1)
+    comparison['wallTimeRatio'] = statistics['wallTime']/referenceStatistics['wallTime']
+
+    if comparison['psiDifference'] > psiTolerance or comparison['thetaDifference'] > thetaTolerance:
+        comparison['status'] = 'accuracy regression'
+    elif (comparison['iterationRatio'] > 1+iterationTolerance or comparison['timeStepRatio'] > 1
+          or (wallTimeTolerance is not None and comparison['wallTimeRatio'] > 1+wallTimeTolerance)):
+        comparison['status'] = 'performance regression'
+    else:
+        comparison['status'] = 'ok'
+    return comparison
+
+
+def benchmarkSolver(cases=None,engines=None,referenceDir=REFERENCE_DIR,updateReferences=False,outputDir=None,
+                    gridFileName=GRID_FILE_NAME,configuration=SOLVER_CONFIGURATION,wallTimeTolerance=None):
+    '''
+    Runs the canonical cases with the engines and compares them with the references.
+
+    cases, engines: names of the cases and of the engines, by default all of them
+    updateReferences: if True the runs are stored as the new references
+    outputDir: folder where the output files are kept, if None they are
+        written to a temporary folder that is deleted at the end
+    wallTimeTolerance: see compareWithReference, only for references written on the same machine
+
+    return:
+
+    results: list of dictionaries, one for each case and engine
+    '''
+    cases = list(CANONICAL_CASES) if cases is None else cases
+    engines = list(ENGINES) if engines is None else engines
+    temporary = outputDir is None
+    if temporary:
+        outputDir = tempfile.mkdtemp(prefix='benchmarkSolver_')
+    else:
+        os.makedirs(outputDir,exist_ok=True)
+
+    results = []
+    try:
+        for engine in engines:
+            for case in cases:
+                result = {'case': case, 'engine': engine}
+                outputFileName = os.path.join(outputDir,engine+'_'+case+'.nc')
+                try:
+                    statistics = runCase(case,engine,outputFileName,gridFileName,configuration)
+                except Exception as e:
+                    result['status'] = 'failed: '+str(e)
+                    results.append(result)
+                    print('{:8s} {:26s} {}'.format(engine,case,result['status']))
+                    continue
+                output = readRunOutput(outputFileName)
+                result.update(statistics)
+                result['errorSum'] = float(np.sum(output['error']))
+
+                fileName = referenceFileName(case,engine,referenceDir)
+                if updateReferences:
+                    writeReference(fileName,output,statistics)
+                    result['status'] = 'reference updated'
+                elif not os.path.isfile(fileName):
+                    result['status'] = 'no reference'
+                else:
+                    [reference,referenceStatistics] = readReference(fileName)
+                    result.update(compareWithReference(output,statistics,reference,referenceStatistics,
+                                                       wallTimeTolerance=wallTimeTolerance))
+                results.append(result)
+                print('{:8s} {:26s} {:8.2f} s  steps {:6d}  outer {:7d}  inner {:7d}  max |error| {:9.2e}  {}'.format(
+                      engine,case,result['wallTime'],result['timeSteps'],result['outerIterations'],
+                      result['innerIterations'],result['maxError'],result['status']))
+    finally:
+        if temporary:
+            shutil.rmtree(outputDir,ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the canonical cases through the solver and compare them with the references')
+    parser.add_argument('--cases', nargs='+', default=None, choices=list(CANONICAL_CASES), help='cases to run (default all)')
+    parser.add_argument('--engines', nargs='+', default=None, choices=list(ENGINES), help='solver engines (default all)')
+    parser.add_argument('--reference-dir', dest='referenceDir', default=REFERENCE_DIR, help='folder of the reference files')
+    parser.add_argument('--update-references', dest='updateReferences', action='store_true',
+                        help='store the runs as the new references')
+    parser.add_argument('--output-dir', dest='outputDir', default=None, help='keep the output files in this folder')
+    parser.add_argument('--output', default=None, help='write the results to this .json file')
+    parser.add_argument('--wall-time-tolerance', dest='wallTimeTolerance', type=float, nargs='?', default=None,
+                        const=WALL_TIME_TOLERANCE, help='flag a wall time growth larger than this fraction (default '+
+                        str(WALL_TIME_TOLERANCE)+' if given without value), only for references written on this machine')
+    args = parser.parse_args(argv)
+
+    results = benchmarkSolver(args.cases,args.engines,args.referenceDir,args.updateReferences,args.outputDir,
+                              wallTimeTolerance=args.wallTimeTolerance)
+    if args.output is not None:
+        with open(args.output,'w') as f:
+            json.dump({'configuration': SOLVER_CONFIGURATION, 'results': results},f,indent=2)
+        print('*** SUCCESS writing!  '+args.output)
+    regressions = [r for r in results if r['status'] not in ['ok', 'no reference', 'reference updated']]
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())